@@ -0,0 +1,187 @@
+"""
+Offline pipeline benchmark.
+
+Drives /process and /generate through the ASGI app (no network, no Groq) with
+recorded LLM responses and injected latency, at controlled concurrency, and
+reports throughput, p50/p95/p99 latency and peak RSS per scenario.
+
+Usage (from the resume/ directory):
+    python -m benchmarks.bench_pipeline --concurrency 1,8 --requests 40 --latency-ms 300
+    python -m benchmarks.bench_pipeline --endpoints generate --sizes large --json results.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import resource
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from benchmarks.corpus import make_corpus
+from benchmarks.fake_llm import FakeGroqClient, DEFAULT_RECORDINGS
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def offline_env():
+    """Environment defaults for a benchmark process; set before the service is imported."""
+    # LLMClient refuses to start without a key; the fake client never uses it.
+    os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+    # The corpus repeats resumes, so per-item caches would turn every scenario into a
+    # cache benchmark. Measure the uncached pipeline unless asked otherwise.
+    os.environ.setdefault("CACHE_MAX_ENTRIES", "0")
+
+
+def install_fake_llm(latency_ms: float, ms_per_token: float, jitter: float, recordings: str = DEFAULT_RECORDINGS,
+                     provider_rpm: float = 0.0, tail_probability: float = 0.0, tail_multiplier: float = 10.0):
+    """Swap the service's Groq client for the recorded-response stand-in."""
+    import server
+    fake = FakeGroqClient(recordings, latency_ms=latency_ms, ms_per_token=ms_per_token, jitter=jitter,
+                          provider_rpm=provider_rpm, tail_probability=tail_probability,
+                          tail_multiplier=tail_multiplier)
+    server.get_llm().client = fake
+    # Uploads run after the response is sent; offline there are no GCS credentials to upload with
+    server.upload_resume_to_gcs = lambda *args, **kwargs: None
+    return server.app, fake
+
+
+def _request_for(endpoint: str, resume, n: int):
+    body = resume.model_dump(mode="json")
+    if endpoint == "process":
+        return "/process", body
+    return f"/{endpoint}", {"resume": body, "user_id": "bench", "resume_id": f"bench_{n}"}
+
+
+async def run_scenario(app, endpoint: str, corpus: list, concurrency: int, total: int) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def one(n: int):
+            nonlocal errors
+            _, resume = corpus[n % len(corpus)]
+            path, body = _request_for(endpoint, resume, n)
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(path, json=body)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(one(n) for n in range(total)))
+        wall = time.perf_counter() - wall_start
+
+    return {
+        "endpoint": endpoint,
+        "sizes": sorted({size for size, _ in corpus}),
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / wall, 2) if wall > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def print_table(results: List[Dict[str, Any]]):
+    header = (f"{'endpoint':<20} {'sizes':<20} {'conc':>5} {'reqs':>5} {'err':>4} {'429s':>5} {'rps':>8} "
+              f"{'p50':>9} {'p95':>9} {'p99':>9} {'rss MB':>8}")
+    print("\n" + header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['endpoint']:<20} {','.join(r['sizes']):<20} {r['concurrency']:>5} {r['requests']:>5} "
+              f"{r['errors']:>4} {r.get('upstream_429s', 0):>5} {r['throughput_rps']:>8} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9} "
+              f"{r['peak_rss_mb']:>8}")
+    print()
+
+
+def run_benchmark(endpoints: List[str], sizes: List[str], concurrencies: List[int], requests: int,
+                  latency_ms: float = 0.0, ms_per_token: float = 0.0, jitter: float = 0.0,
+                  per_size: int = 3, recordings: str = DEFAULT_RECORDINGS, quiet: bool = True,
+                  provider_rpm: float = 0.0, tail_probability: float = 0.0,
+                  tail_multiplier: float = 10.0) -> List[Dict[str, Any]]:
+    app, fake = install_fake_llm(latency_ms, ms_per_token, jitter, recordings, provider_rpm,
+                                 tail_probability, tail_multiplier)
+    results = []
+    for endpoint in endpoints:
+        for size in sizes:
+            corpus = make_corpus([size], per_size)
+            for concurrency in concurrencies:
+                # The service logs heavily to stdout; keep the report readable
+                sink = io.StringIO() if quiet else sys.stdout
+                rate_limited_before = fake.rate_limited
+                with contextlib.redirect_stdout(sink):
+                    result = asyncio.run(run_scenario(app, endpoint, corpus, concurrency, requests))
+                result["upstream_429s"] = fake.rate_limited - rate_limited_before
+                results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark for the resume pipeline")
+    parser.add_argument("--endpoints", default="process", help="Comma list: process,generate,process-and-generate")
+    parser.add_argument("--sizes", default="small,medium,large", help="Comma list of corpus sizes")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma list of concurrency levels")
+    parser.add_argument("--requests", type=int, default=32, help="Requests per scenario")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Injected base latency per LLM call")
+    parser.add_argument("--ms-per-token", type=float, default=1.0, help="Injected latency per output token")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Random +/- fraction applied to latency")
+    parser.add_argument("--provider-rpm", type=float, default=0.0,
+                        help="Simulate a provider requests/min ceiling (fake answers 429 with retry-after)")
+    parser.add_argument("--tail-prob", type=float, default=0.0,
+                        help="Fraction of LLM calls that are stragglers (to exercise hedging/deadlines)")
+    parser.add_argument("--tail-mult", type=float, default=10.0, help="Straggler latency multiplier")
+    parser.add_argument("--recordings", default=DEFAULT_RECORDINGS, help="Recorded responses JSON")
+    parser.add_argument("--json", dest="json_path", help="Also write results to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show service logs while running")
+    args = parser.parse_args()
+
+    offline_env()
+    results = run_benchmark(
+        endpoints=args.endpoints.split(","),
+        sizes=args.sizes.split(","),
+        concurrencies=[int(c) for c in args.concurrency.split(",")],
+        requests=args.requests,
+        latency_ms=args.latency_ms,
+        ms_per_token=args.ms_per_token,
+        jitter=args.jitter,
+        recordings=args.recordings,
+        quiet=not args.verbose,
+        provider_rpm=args.provider_rpm,
+        tail_probability=args.tail_prob,
+        tail_multiplier=args.tail_mult,
+    )
+    print_table(results)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"Results written to: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
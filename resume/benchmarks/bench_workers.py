@@ -0,0 +1,179 @@
+"""
+Multi-worker scaling benchmark.
+
+Starts `uvicorn server:app --workers N` for each N (with the recorded-response
+LLM stand-in in every worker and the shared SQLite cache), drives it over
+real HTTP at a fixed concurrency, and reports throughput and latency per
+worker count, with the speedup over the first count.
+
+Usage (from the resume/ directory):
+    python -m benchmarks.bench_workers --workers 1,2,4 --endpoint generate --requests 200
+    python -m benchmarks.bench_workers --endpoint process --latency-ms 0 --json workers.json
+
+/generate with the native PDF backend (the default here) is CPU bound, so it
+shows how well the workers use the cores. /process with --latency-ms 0 does
+the same for the pipeline's own overhead. Near-linear scaling needs at least
+as many free cores as workers.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_pipeline import _request_for, offline_env, percentile
+from benchmarks.corpus import make_corpus
+
+SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def create_app():
+    """uvicorn --factory entry point: the service with the LLM stand-in (settings from BENCH_* variables)."""
+    from benchmarks.bench_pipeline import install_fake_llm
+    offline_env()
+    app, _ = install_fake_llm(latency_ms=float(os.getenv("BENCH_LATENCY_MS", "0")),
+                              ms_per_token=float(os.getenv("BENCH_MS_PER_TOKEN", "0")), jitter=0.0)
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers: int, port: int, latency_ms: float, cache_db: str) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "GROQ_API_KEY": env.get("GROQ_API_KEY", "offline-benchmark"),
+        "WEB_CONCURRENCY": str(workers),
+        "CACHE_BACKEND": "sqlite",
+        "CACHE_DB_PATH": cache_db,
+        "PDF_BACKEND": env.get("PDF_BACKEND", "native"),
+        "WARMUP_ON_STARTUP": "0",
+        "BENCH_LATENCY_MS": str(latency_ms),
+        # The Groq account limits are split across workers; they would cap throughput, not the cores
+        "GROQ_RPM": env.get("GROQ_RPM", "0"),
+        "GROQ_TPM": env.get("GROQ_TPM", "0"),
+    })
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.bench_workers:create_app", "--factory",
+         "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=SERVICE_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(base_url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Service at {base_url} did not start within {timeout}s")
+
+
+async def drive(base_url: str, endpoint: str, corpus: list, concurrency: int, total: int) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits) as client:
+        async def one(n: int):
+            nonlocal errors
+            _, resume = corpus[n % len(corpus)]
+            path, body = _request_for(endpoint, resume, n)
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(path, json=body)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        # Warm every worker (imports, templates, fonts) before measuring
+        await asyncio.gather(*(one(n) for n in range(concurrency * 2)))
+        latencies.clear()
+        errors = 0
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(one(n) for n in range(total)))
+        wall = time.perf_counter() - wall_start
+
+    return {
+        "throughput_rps": round(total / wall, 2) if wall > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "errors": errors,
+    }
+
+
+def run_benchmark(worker_counts: List[int], endpoint: str, sizes: List[str], concurrency: int, requests: int,
+                  latency_ms: float = 0.0) -> List[Dict[str, Any]]:
+    corpus = make_corpus(sizes, 3)
+    results = []
+    for workers in worker_counts:
+        port = _free_port()
+        with tempfile.TemporaryDirectory() as tmp:
+            server = start_server(workers, port, latency_ms, os.path.join(tmp, "cache.sqlite3"))
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                asyncio.run(wait_ready(base_url))
+                result = asyncio.run(drive(base_url, endpoint, corpus, concurrency, requests))
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+        result.update({"workers": workers, "endpoint": endpoint, "concurrency": concurrency, "requests": requests})
+        base = results[0]["throughput_rps"] if results else result["throughput_rps"]
+        base_workers = results[0]["workers"] if results else workers
+        result["speedup"] = round(result["throughput_rps"] / base, 2) if base else 0.0
+        result["efficiency"] = round(result["speedup"] * base_workers / workers, 2)
+        results.append(result)
+    return results
+
+
+def print_table(results: List[Dict[str, Any]]):
+    header = f"{'workers':>7} {'endpoint':<10} {'conc':>5} {'reqs':>5} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'speedup':>8} {'eff':>5}"
+    print("\n" + header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['workers']:>7} {r['endpoint']:<10} {r['concurrency']:>5} {r['requests']:>5} {r['errors']:>4} "
+              f"{r['throughput_rps']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['speedup']:>8} {r['efficiency']:>5}")
+    print(f"\n{os.cpu_count()} CPU(s) available\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of the service across uvicorn worker counts")
+    parser.add_argument("--workers", default=f"1,2,{max(2, os.cpu_count() or 1)}", help="Comma list of worker counts")
+    parser.add_argument("--endpoint", default="generate", choices=["process", "generate", "process-and-generate"])
+    parser.add_argument("--sizes", default="medium", help="Comma list of corpus sizes")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per worker count")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Injected latency per LLM call")
+    parser.add_argument("--json", dest="json_path", help="Also write results to this file")
+    args = parser.parse_args()
+
+    worker_counts = sorted({int(w) for w in args.workers.split(",")})
+    results = run_benchmark(worker_counts, args.endpoint, args.sizes.split(","), args.concurrency, args.requests,
+                            args.latency_ms)
+    print_table(results)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"Results written to: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Synthetic resume corpus for benchmarks.
+
+Sizes vary the number of experience/project entries and how sparse they are,
+since sparse entries are what drive ExpanderAgent calls.
+"""
+
+import random
+from typing import Dict, List
+
+from src.schemas.resume_schema import (
+    Resume, PersonalInfo, EducationItem, ExperienceItem, ProjectItem,
+    SkillCategory, CertificationItem, CustomSection, CustomItem,
+)
+
+SKILLS = ["Python", "Go", "JavaScript", "SQL", "FastAPI", "React", "Django",
+          "AWS", "Docker", "Git", "PostgreSQL", "Redis"]
+
+JOB_DESCRIPTION = (
+    "About us: we are a fast-growing fintech company on a mission to make payments simple. "
+    "We are looking for a Backend Engineer with 3+ years of experience building services in Python "
+    "and FastAPI. You will design REST APIs, own services in production, work with PostgreSQL and "
+    "Redis, deploy with Docker on AWS, and mentor other engineers. Strong communication skills and "
+    "ownership are required. A B.S. in Computer Science or a related field is preferred. "
+    "We are an equal opportunity employer and offer great benefits."
+)
+
+# name -> (experience entries, project entries, custom items, existing bullets per entry)
+SIZES: Dict[str, tuple] = {
+    "small": (1, 1, 0, 1),
+    "medium": (3, 3, 2, 1),
+    "large": (6, 6, 4, 2),
+}
+
+
+def make_resume(size: str = "medium", seed: int = 0, with_jd: bool = True) -> Resume:
+    n_exp, n_proj, n_custom, n_bullets = SIZES[size]
+    rng = random.Random(seed)
+    return Resume(
+        personal_info=PersonalInfo(
+            name=f"Candidate {seed}",
+            email=f"candidate{seed}@example.com",
+            phone="555-0100",
+            linkedin="https://linkedin.com/in/candidate",
+            github="https://github.com/candidate",
+        ),
+        education=[
+            EducationItem(institution="State University", degree="B.S. Computer Science",
+                          start_date="2014", end_date="2018", gpa="3.7")
+        ],
+        experience=[
+            ExperienceItem(
+                company=f"Company {i}",
+                role=rng.choice(["Software Engineer", "Backend Engineer", "Platform Engineer"]),
+                start_date=str(2018 + i),
+                end_date="Present" if i == 0 else str(2019 + i),
+                location="Remote",
+                details=[f"Worked on service {i}.{b} using {rng.choice(SKILLS)}" for b in range(n_bullets)],
+            )
+            for i in range(n_exp)
+        ],
+        projects=[
+            ProjectItem(
+                name=f"Project {i}",
+                technologies=rng.sample(SKILLS, 3),
+                details=[f"Built component {i}.{b}" for b in range(n_bullets)],
+            )
+            for i in range(n_proj)
+        ],
+        skills=[SkillCategory(category="Skills", skills=rng.sample(SKILLS, 6))],
+        certifications=[CertificationItem(name="AWS Certified Developer", issuer="Amazon", date="2022")],
+        languages=["English"],
+        custom_sections=[
+            CustomSection(title="Awards", items=[CustomItem(name=f"Award {i}", date="2021") for i in range(n_custom)])
+        ] if n_custom else [],
+        job_description=JOB_DESCRIPTION if with_jd else None,
+        summary="Backend engineer focused on reliable, fast services.",
+    )
+
+
+def make_corpus(sizes: List[str], per_size: int) -> List[tuple]:
+    """Returns (size, Resume) pairs."""
+    return [(size, make_resume(size, seed=n)) for size in sizes for n in range(per_size)]
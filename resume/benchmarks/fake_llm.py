@@ -0,0 +1,168 @@
+"""
+Offline stand-in for the Groq SDK used by LLMClient.
+
+FakeGroqClient replays recorded responses (benchmarks/recordings.json) keyed by
+the pipeline stage that issued the call, with configurable injected latency.
+It replaces only `LLMClient.client`, so everything LLMClient does around the
+upstream call (usage accounting, metrics, ...) still runs under benchmark.
+
+RecordingGroqClient wraps a real Groq client and captures responses into the
+same format, so recordings can be refreshed against the live API.
+"""
+
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import httpx
+from groq import RateLimitError, APITimeoutError
+
+from src.utils import metrics
+from src.utils.llm_client import SMALL_MODEL
+from src.utils.rate_limiter import TokenBucket
+
+DEFAULT_RECORDINGS = os.path.join(os.path.dirname(__file__), "recordings.json")
+
+# Relative latency per model (the small routed model is several times faster)
+DEFAULT_MODEL_LATENCY_SCALE = {SMALL_MODEL: 0.25}
+
+
+def _estimate_tokens(text: str) -> int:
+    # ~4 characters per token is close enough for latency/cost modelling
+    return max(1, len(text) // 4)
+
+
+def _make_response(content: str, prompt_tokens: int, completion_tokens: int):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+    )
+
+
+class _FakeCompletions:
+    def __init__(self, owner: "FakeGroqClient"):
+        self._owner = owner
+
+    def create(self, model: str, messages: List[Dict[str, str]], **kwargs):
+        return self._owner.complete(model, messages, **kwargs)
+
+
+class FakeGroqClient:
+    """
+    Replays recorded responses with injected latency.
+
+    latency_ms:       fixed time-to-first-token per call
+    ms_per_token:     extra latency per completion token (output dominates real calls)
+    jitter:           +/- fraction of random variation applied to the total
+    provider_rpm:     simulate the provider's requests/min ceiling by answering 429
+                      with retry-after once it is exceeded (0 disables)
+    provider_burst:   requests allowed back to back before that ceiling applies
+                      (default: a minute's worth)
+    model_latency_scale: per-model multiplier on the injected latency
+    tail_probability: fraction of calls that are stragglers (heavy latency tail)
+    tail_multiplier:  how much slower a straggler is than a normal call
+    responses:        stage -> responses to replay instead of reading recordings_path
+
+    A `timeout` passed to create() is honoured: calls that would take longer
+    sleep for the timeout and raise APITimeoutError, like the real SDK.
+    """
+
+    def __init__(self, recordings_path: str = DEFAULT_RECORDINGS, latency_ms: float = 0.0,
+                 ms_per_token: float = 0.0, jitter: float = 0.0, seed: Optional[int] = 0,
+                 provider_rpm: float = 0.0, model_latency_scale: Optional[Dict[str, float]] = None,
+                 tail_probability: float = 0.0, tail_multiplier: float = 10.0,
+                 provider_burst: Optional[float] = None, responses: Optional[Dict[str, list]] = None):
+        if responses is None:
+            with open(recordings_path, "r") as f:
+                responses = json.load(f)
+        self.recordings: Dict[str, list] = responses
+        self.latency_ms = latency_ms
+        self.ms_per_token = ms_per_token
+        self.jitter = jitter
+        self.tail_probability = tail_probability
+        self.tail_multiplier = tail_multiplier
+        self.model_latency_scale = DEFAULT_MODEL_LATENCY_SCALE if model_latency_scale is None else model_latency_scale
+        self._rng = random.Random(seed)
+        self._cycles = {stage: itertools.cycle(responses) for stage, responses in self.recordings.items()}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.rate_limited = 0
+        self.timed_out = 0
+        self._provider_bucket = TokenBucket(provider_rpm) if provider_rpm else None
+        if self._provider_bucket is not None and provider_burst is not None:
+            self._provider_bucket.capacity = self._provider_bucket.tokens = float(provider_burst)
+        self.chat = SimpleNamespace(completions=_FakeCompletions(self))
+
+    def _next_response(self, stage: str, user_prompt: str):
+        with self._lock:
+            self.calls += 1
+            cycle = self._cycles.get(stage) or self._cycles.get("default")
+            if cycle is None:
+                raise KeyError(f"No recorded response for stage '{stage}'")
+            recorded = next(cycle)
+            jitter = self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+            if self.tail_probability and self._rng.random() < self.tail_probability:
+                jitter = (1 + jitter) * self.tail_multiplier - 1
+        if isinstance(recorded, dict) and "echo_between" in recorded:
+            # Rewrite-style stages: echo the slice of the prompt the model would rewrite
+            start_marker, end_marker = recorded["echo_between"]
+            return user_prompt.split(start_marker, 1)[-1].split(end_marker, 1)[0].strip(), jitter
+        return recorded, jitter
+
+    def _check_provider_ceiling(self):
+        if self._provider_bucket is None:
+            return
+        wait = self._provider_bucket.try_acquire(1)
+        if wait > 0:
+            with self._lock:
+                self.rate_limited += 1
+            request = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+            response = httpx.Response(429, headers={"retry-after": f"{wait:.3f}"}, request=request)
+            raise RateLimitError("Rate limit reached (simulated)", response=response, body=None)
+
+    def complete(self, model: str, messages: List[Dict[str, str]], **kwargs):
+        self._check_provider_ceiling()
+        system_prompt = messages[0]["content"] if messages else ""
+        user_prompt = messages[-1]["content"] if messages else ""
+        content, jitter = self._next_response(metrics.current_stage(), user_prompt)
+        prompt_tokens = _estimate_tokens(system_prompt + user_prompt)
+        completion_tokens = _estimate_tokens(content)
+        scale = self.model_latency_scale.get(model, 1.0)
+        delay = (self.latency_ms + self.ms_per_token * completion_tokens) * scale * (1 + jitter) / 1000
+        timeout = kwargs.get("timeout")
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            with self._lock:
+                self.timed_out += 1
+            raise APITimeoutError(request=httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions"))
+        if delay > 0:
+            time.sleep(delay)
+        return _make_response(content, prompt_tokens, completion_tokens)
+
+
+class RecordingGroqClient:
+    """Wraps a real Groq client and records responses per stage."""
+
+    def __init__(self, client, recordings_path: str = DEFAULT_RECORDINGS):
+        self._client = client
+        self.recordings_path = recordings_path
+        self.recordings: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        response = self._client.chat.completions.create(**kwargs)
+        with self._lock:
+            self.recordings.setdefault(metrics.current_stage(), []).append(response.choices[0].message.content)
+        return response
+
+    def save(self):
+        with self._lock:
+            with open(self.recordings_path, "w") as f:
+                json.dump(self.recordings, f, indent=4)
+        print(f"Recorded responses saved to: {self.recordings_path}")
@@ -1,5 +1,6 @@
 import os
 import json
+import argparse
 from config import GROQ_API_KEY
 from src.utils.llm_client import LLMClient
 from src.agents.intake_agent import IntakeAgent
@@ -52,10 +53,26 @@ def get_dummy_resume():
     )
 
 def main():
+    parser = argparse.ArgumentParser(description="Build a tailored resume PDF from a JSON profile")
+    parser.add_argument("--profile", default="data/profile.json", help="Path to the profile JSON")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and regenerate whenever the profile or template changes")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between file checks in --watch mode")
+    args = parser.parse_args()
+
     # 1. Setup (API key now comes from config.py)
     llm = LLMClient(model_name="llama-3.3-70b-versatile")
+    profile_path = args.profile
+
+    if args.watch:
+        from src.watch import ResumeWatcher
+        if not os.path.exists(profile_path):
+            print(f"Profile not found at {profile_path}. Run once without --watch to create one.")
+            return
+        ResumeWatcher(profile_path, llm, interval=args.interval).run()
+        return
+
     intake_agent = IntakeAgent(llm, system_prompt="You are an Intake Agent.")
-    profile_path = "data/profile.json"
 
     # 2. Intake Phase (JSON-First)
     print("--- 1. INTAKE ---")
@@ -157,10 +174,15 @@ def main():
     # 4. Generation Phase
     print("\n--- 4. GENERATION ---")
     generator = ResumeGenerator()
-    tex_path = generator.generate_tex(resume, filename="my_resume")
-    print(f"Generated TeX: {tex_path}")
-    
-    pdf_path = generator.generate_pdf(tex_path)
+    if generator.backend == "native":
+        pdf_path = os.path.join(generator.output_dir, "my_resume.pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(generator.render_pdf(resume))
+    else:
+        tex_path = generator.generate_tex(resume, filename="my_resume")
+        print(f"Generated TeX: {tex_path}")
+
+        pdf_path = generator.generate_pdf(tex_path)
     if pdf_path:
         print(f"Generated PDF: {pdf_path}")
     else:
@@ -1,28 +1,45 @@
 import os
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+import time
+_IMPORT_STARTED = time.perf_counter()
+import threading
+import hmac
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
-from fastapi.responses import FileResponse
+from fastapi.responses import PlainTextResponse, Response
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import json
+import base64
 import traceback
+import uuid
 
 # from config import GROQ_API_KEY (Removed to avoid ModuleNotFoundError on Railway)
 from src.utils.llm_client import LLMClient
-from src.agents.jd_parser_agent import JDParserAgent
-from src.agents.expander_agent import ExpanderAgent
-from src.agents.skills_categorizer import SkillsCategorizer
-from src.agents.enhancer_agent import EnhancerAgent
-from src.agents.skills_analyzer import SkillsAnalyzer
+from src.pipeline import ResumePipeline
 from src.generators.resume_generator import ResumeGenerator
 from src.schemas.resume_schema import Resume
-from src.utils.cloud_storage import upload_resume_to_gcs
+from src.schemas.parsed_jd_schema import JobPosting
+from src.utils.cloud_storage import upload_resume_to_gcs, deferred_count
+from src.utils import metrics, usage, startup, idempotency
+from src.utils.cache import fingerprint
+from src.utils.deadline import deadline_scope
+from src.utils.circuit_breaker import CircuitOpenError, all_breakers
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup.record_cold_start(_IMPORT_STARTED)
+    # Heavy SDKs are imported lazily; load them in the background once we are serving
+    if os.getenv("WARMUP_ON_STARTUP", "1") != "0":
+        startup.start_warm_up([get_llm])
+    yield
+
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS for frontend integration
 app.add_middleware(
@@ -31,128 +48,345 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Resume-Degraded", "X-Pdf-Pages", "X-Pdf-Compiles", "X-Layout-Level", "Idempotent-Replayed"],
 )
 
-# Initialize LLM Client (API key now comes from config.py)
-llm = LLMClient(model_name="llama-3.3-70b-versatile")
+# LLM Client (API key comes from the environment or config.py), built on first use
+# so a slow SDK import or a missing key does not hold up start-up and health checks
+_llm: Optional[LLMClient] = None
+_llm_lock = threading.Lock()
+
+def get_llm() -> LLMClient:
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                _llm = LLMClient(model_name="llama-3.3-70b-versatile")
+    return _llm
+
+# Optional per-user token quota. 0 disables enforcement. The ledger is cumulative and per
+# process, so with uvicorn --workers N a user can spend up to N x USER_TOKEN_QUOTA.
+USER_TOKEN_QUOTA = int(os.getenv("USER_TOKEN_QUOTA", "0"))
+
+# Shared secret the Node proxy sends (X-Internal-Token) along with the user it authenticated
+# (X-User-Id). X-User-Id is trusted only with it; without INTERNAL_API_TOKEN no user is.
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN", "")
+
+# Saved resumes, one JSON file per resume id
+SAVED_RESUMES_DIR = "data/saved_resumes"
+
+# Default /process latency budget; X-Latency-Budget-Ms overrides per request. 0 means no budget.
+PROCESS_BUDGET_MS = int(os.getenv("PROCESS_BUDGET_MS", "0"))
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Collects per-stage timings for the request and emits one JSON log line."""
+    trace = metrics.start_trace(request.method, request.url.path)
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Use the route template (e.g. /resumes/{resume_id}) to keep label cardinality bounded;
+        # unmatched paths (404s, scanners) all share one label
+        route = request.scope.get("route")
+        trace.path = route.path if route is not None else "unmatched"
+        metrics.log_request(trace, status)
 
 @app.get("/")
 async def root():
     return {"message": "Resume Builder API is running"}
 
+@app.get("/health")
+async def health():
+    """Liveness plus dependency circuit state; `degraded` while any circuit is not closed."""
+    circuits = all_breakers()
+    healthy = all(c["state"] == "closed" for c in circuits.values())
+    return {"status": "ok" if healthy else "degraded", "circuits": circuits,
+            "deferred_uploads": deferred_count()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus-style metrics: stage timers, LLM tokens/cost, compile times, cache hit rates."""
+    return PlainTextResponse(metrics.registry.render_prometheus(), media_type="text/plain; version=0.0.4")
+
 class ProcessResponse(BaseModel):
     resume: Resume
     analysis: Optional[Dict[str, Any]] = None
+    usage: Optional[Dict[str, Any]] = None
+    # Items each stage had to send to the LLM; everything else came from the per-item cache
+    recomputed: Optional[Dict[str, List[str]]] = None
+    # Set when the latency budget forced stages to be skipped: {"skipped": [...], "budget_ms", "elapsed_ms"}
+    degraded: Optional[Dict[str, Any]] = None
 
 class GenerateRequest(BaseModel):
     resume: Resume
     user_id: str
     resume_id: str
 
+class JobIndexRequest(BaseModel):
+    jobs: List[JobPosting]
+
+class MatchJobsRequest(BaseModel):
+    resume: Resume
+    # Either a previously built index (POST /match/jobs/index) or the postings themselves
+    index_id: Optional[str] = None
+    jobs: Optional[List[JobPosting]] = None
+    top_k: int = 10
+
+def _authenticated_user(x_user_id: Optional[str], x_internal_token: Optional[str]) -> Optional[str]:
+    """The user id the proxy vouches for, or None when the request did not come through it."""
+    if not (INTERNAL_API_TOKEN and x_user_id and x_internal_token):
+        return None
+    return x_user_id if hmac.compare_digest(x_internal_token, INTERNAL_API_TOKEN) else None
+
+def _check_quota(user_id: Optional[str]):
+    if not USER_TOKEN_QUOTA:
+        return
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="An authenticated user is required while a token quota is enforced")
+    if usage.ledger.exceeds(user_id, USER_TOKEN_QUOTA):
+        raise HTTPException(status_code=429, detail="Token quota exceeded for this user")
+
 @app.post("/process", response_model=ProcessResponse)
-async def process_resume_endpoint(resume: Resume):
+async def process_resume_endpoint(resume: Resume, response: Response, x_user_id: Optional[str] = Header(default=None),
+                                  x_internal_token: Optional[str] = Header(default=None),
+                                  x_latency_budget_ms: Optional[int] = Header(default=None),
+                                  idempotency_key: Optional[str] = Header(default=None)):
     """
-    Unified Pipeline: JD Parsing -> Expansion -> Analysis -> Categorization -> Enhancement.
+    Unified Pipeline: JD Parsing -> Expansion -> Analysis -> Categorization -> Enhancement,
+    streamed per item (see src/pipeline.py).
+    The response carries this request's own token/latency breakdown under `usage`.
+    With a latency budget, optional stages are skipped when time runs low and the
+    partial result is returned with `degraded` listing what was skipped; items whose
+    expansion failed keep their bullets and are listed under `degraded.failed`.
+    Retries with the same Idempotency-Key share one run (see src/utils/idempotency.py).
     """
+    user_id = _authenticated_user(x_user_id, x_internal_token)
+
+    async def compute() -> Dict[str, Any]:
+        _check_quota(user_id)
+        budget_ms = x_latency_budget_ms if x_latency_budget_ms is not None else PROCESS_BUDGET_MS
+        with usage.usage_scope(user_id) as scope, deadline_scope(budget_ms / 1000 if budget_ms > 0 else None):
+            # The agents make blocking Groq calls; keep them off the event loop so
+            # concurrent requests actually overlap.
+            processed = await run_in_threadpool(_run_pipeline, resume, scope)
+        return processed.model_dump(mode="json")
+
+    result, replayed = await _idempotent(idempotency_key, "/process", user_id,
+                                         (resume, x_latency_budget_ms), compute)
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+async def _idempotent(key: Optional[str], endpoint: str, user_id: Optional[str], request_parts: Tuple[Any, ...],
+                      compute) -> Tuple[Any, bool]:
+    """Runs `compute` once per Idempotency-Key. Returns (result, replayed); without a key it just runs."""
+    if not key:
+        return await compute(), False
     try:
-        # 0. Parse Job Description (if present) to reduce token consumption
-        parsed_jd_text = None
-        if resume.job_description:
-            print("\n🔍 Parsing Job Description...")
-            jd_parser = JDParserAgent(llm)
-            parsed_jd_text = jd_parser.parse_to_string(resume.job_description)
-            print(f"✅ JD Parsed successfully\n")
-        
-        # 1. Expansion Phase
-        # Check if expansion is needed (simple heuristic: empty details)
-        needs_expansion = False
-        for exp in resume.experience:
-            if not exp.details or len(exp.details) < 2:
-                needs_expansion = True
-                break
-        if not needs_expansion:
-            for proj in resume.projects:
-                if not proj.details or len(proj.details) < 2:
-                    needs_expansion = True
-                    break
-        
-        if needs_expansion:
-            expander = ExpanderAgent(llm)
-            resume = expander.expand(resume)
-
-        # 2. Skills Analysis (if JD present)
-        analysis = None
-        if parsed_jd_text:
-            analyzer = SkillsAnalyzer(llm)
-            # Pass parsed JD instead of raw JD
-            analysis = analyzer.analyze(resume, parsed_jd_text)
-
-        # 3. Skills Categorization
-        categorizer = SkillsCategorizer(llm)
-        resume = categorizer.categorize(resume)
-
-        # 4. Enhancement Phase (if JD present)
-        if parsed_jd_text:
-            enhancer = EnhancerAgent(llm)
-            # Pass parsed JD instead of raw JD
-            resume = enhancer.enhance(resume, parsed_jd_text)
-
-        return ProcessResponse(resume=resume, analysis=analysis)
+        store_key = idempotency.scoped_key(key, endpoint, user_id)
+        result, outcome = await idempotency.store.run(store_key, fingerprint(*request_parts), compute)
+    except idempotency.IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return result, outcome != "new"
+
+def _run_pipeline(resume: Resume, scope: usage.UsageScope) -> ProcessResponse:
+    """Runs the agent pipeline; LLM usage is recorded into `scope`."""
+    try:
+        result = ResumePipeline(get_llm()).run(resume)
+
+        usage_summary = scope.summary()
+        trace = metrics.current_trace()
+        if trace is not None:
+            # Stages overlap per item, so these are summed across items rather than wall time
+            usage_summary["stages_ms"] = {k: round(v * 1000, 1) for k, v in trace.stages.items()}
+        return ProcessResponse(resume=result.resume, analysis=result.analysis, usage=usage_summary,
+                               recomputed=result.recomputed, degraded=result.degraded)
         
+    except CircuitOpenError as e:
+        # Groq is known to be down: tell the client when to come back instead of hanging
+        raise HTTPException(status_code=503, detail=str(e),
+                            headers={"Retry-After": str(max(1, int(e.retry_in + 0.5)))})
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/generate")
-async def generate_resume_pdf(request: GenerateRequest, background_tasks: BackgroundTasks):
+async def generate_resume_pdf(request: GenerateRequest, background_tasks: BackgroundTasks, one_page: bool = False,
+                              idempotency_key: Optional[str] = Header(default=None)):
     """
     Generates a PDF resume and handles background upload to GCS.
     Returns the PDF file directly for immediate download.
+    With ?one_page=true the layout is auto-fitted to a single page (see src/generators/layout.py).
+    Retries with the same Idempotency-Key share one render, and the upload is scheduled once.
     """
     print(f"\n🚀 [v4-failsafe] Received Generate Request for user: {request.user_id}, resume: {request.resume_id}")
+
+    async def compute() -> Dict[str, Any]:
+        try:
+            pdf_content, fit_headers = await _render_pdf(request.resume, request.resume_id, one_page)
+        except Exception as e:
+            print(f"🔥 FATAL ERROR in /generate: {str(e)}")
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=str(e))
+        # Stored results stay JSON-serializable, like every other cache entry
+        return {"pdf": base64.b64encode(pdf_content).decode("ascii"), "headers": fit_headers}
+
+    result, replayed = await _idempotent(idempotency_key, "/generate", request.user_id,
+                                         (request, one_page), compute)
+    pdf_content = base64.b64decode(result["pdf"])
+    headers = dict(result["headers"])
+    if replayed:
+        headers["Idempotent-Replayed"] = "true"
+    else:
+        _schedule_upload(background_tasks, request.user_id, request.resume_id, pdf_content)
+
+    print("🚀 [Success] Returning PDF for immediate download!")
+    # Note: We return the bytes directly; nothing is left on disk.
+    return _pdf_response(pdf_content, request.resume_id, headers)
+
+@app.post("/process-and-generate")
+async def process_and_generate_endpoint(request: GenerateRequest, background_tasks: BackgroundTasks,
+                                        format: str = "pdf", one_page: bool = False,
+                                        x_user_id: Optional[str] = Header(default=None),
+                                        x_internal_token: Optional[str] = Header(default=None),
+                                        x_latency_budget_ms: Optional[int] = Header(default=None)):
+    """
+    /process followed by /generate in one request: the enhanced Resume goes
+    straight from the pipeline to the generator without a client round trip.
+    Returns the PDF (?format=pdf, default) or multipart/mixed with the
+    ProcessResponse JSON first and the PDF second (?format=multipart).
+    """
+    if format not in ("pdf", "multipart"):
+        raise HTTPException(status_code=422, detail="format must be 'pdf' or 'multipart'")
+    # request.user_id is client-supplied; it only names the upload, never the quota's user
+    user_id = _authenticated_user(x_user_id, x_internal_token)
+    _check_quota(user_id)
+    budget_ms = x_latency_budget_ms if x_latency_budget_ms is not None else PROCESS_BUDGET_MS
+    with usage.usage_scope(user_id) as scope, deadline_scope(budget_ms / 1000 if budget_ms > 0 else None):
+        processed = await run_in_threadpool(_run_pipeline, request.resume, scope)
+
     try:
-        resume = request.resume
-        user_id = request.user_id
-        resume_id = request.resume_id
-
-        print("🛠️  Initializing ResumeGenerator...")
-        generator = ResumeGenerator()
-        filename = f"resume_{resume_id}"
-        print(f"📄 Generating TeX for {filename}...")
-        tex_path = generator.generate_tex(resume, filename=filename)
-        print(f"🔨 Compiling PDF from {tex_path}...")
-        pdf_path = generator.generate_pdf(tex_path)
-        
-        if pdf_path and os.path.exists(pdf_path):
-            print(f"✅ PDF generated at: {pdf_path}")
-            
-            try:
-                # Read PDF content for background upload
-                with open(pdf_path, "rb") as f:
-                    file_content = f.read()
-                
-                # Schedule GCS upload and Supabase sync in the background
-                # This is FULLY DECOUPLED. The response is returned separately.
-                print("⏳ [Background] Scheduling GCS upload task...")
-                background_tasks.add_task(upload_resume_to_gcs, user_id, resume_id, file_content)
-            except Exception as e:
-                print(f"⚠️  Warning: Failed to schedule background upload: {e}")
-                # We continue anyway to ensure the user gets the PDF
-            
-            print("🚀 [Success] Returning PDF for immediate download!")
-            # Note: We return the file directly. This is the fastest possible way.
-            return FileResponse(
-                path=pdf_path,
-                filename=f"{filename}.pdf",
-                media_type="application/pdf"
-            )
-        else:
-            print("❌ PDF generation failed (check LaTeX logs above).")
-            raise HTTPException(status_code=500, detail="PDF generation failed")
+        pdf_content, fit_headers = await _render_pdf(processed.resume, request.resume_id, one_page)
     except Exception as e:
-        print(f"🔥 FATAL ERROR in /generate: {str(e)}")
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+    _schedule_upload(background_tasks, request.user_id, request.resume_id, pdf_content)
+
+    if format == "pdf":
+        # The PDF is the body; flag partial results so the client can tell
+        headers = {"X-Resume-Degraded": "1"} if processed.degraded else {}
+        return _pdf_response(pdf_content, request.resume_id, {**headers, **fit_headers})
+
+    filename = f"resume_{request.resume_id}.pdf"
+    boundary = uuid.uuid4().hex
+    body = _multipart_mixed(boundary, [
+        ({"Content-Type": "application/json"}, processed.model_dump_json().encode("utf-8")),
+        ({"Content-Type": "application/pdf",
+          "Content-Disposition": f'attachment; filename="{filename}"'}, pdf_content),
+    ])
+    return Response(content=body, media_type=f"multipart/mixed; boundary={boundary}", headers=fit_headers)
+
+async def _render_pdf(resume: Resume, resume_id: str, one_page: bool = False) -> Tuple[bytes, Dict[str, str]]:
+    """
+    TeX render + pdflatex off the event loop, in a scratch directory private to
+    this request (see src/generators/workspace.py). Returns the PDF bytes and,
+    for one-page auto-fit, headers reporting the pages/compiles/layout level; raises on failure.
+    """
+    print("🛠️  Initializing ResumeGenerator...")
+    generator = ResumeGenerator()
+    print(f"🔨 Compiling PDF for resume_{resume_id}...")
+    headers: Dict[str, str] = {}
+    if one_page:
+        fit = await run_in_threadpool(generator.render_pdf_one_page, resume)
+        pdf_content = fit.pdf
+        headers = {"X-Pdf-Pages": str(fit.pages or "unknown"), "X-Pdf-Compiles": str(fit.compiles),
+                   "X-Layout-Level": str(fit.level)}
+        print(f"📐 One-page fit: {fit.summary()}")
+    else:
+        pdf_content = await run_in_threadpool(generator.render_pdf, resume)
+    if not pdf_content:
+        print("❌ PDF generation failed (check LaTeX logs above).")
+        raise RuntimeError("PDF generation failed")
+    print(f"✅ PDF generated ({len(pdf_content)} bytes)")
+    return pdf_content, headers
+
+def _pdf_response(pdf_content: bytes, resume_id: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    headers = dict(headers or {})
+    headers["Content-Disposition"] = f'attachment; filename="resume_{resume_id}.pdf"'
+    return Response(content=pdf_content, media_type="application/pdf", headers=headers)
+
+def _schedule_upload(background_tasks: BackgroundTasks, user_id: str, resume_id: str, pdf_content: bytes):
+    try:
+        # Schedule GCS upload and Supabase sync in the background
+        # This is FULLY DECOUPLED. The response is returned separately.
+        print("⏳ [Background] Scheduling GCS upload task...")
+        background_tasks.add_task(upload_resume_to_gcs, user_id, resume_id, pdf_content)
+    except Exception as e:
+        print(f"⚠️  Warning: Failed to schedule background upload: {e}")
+        # We continue anyway to ensure the user gets the PDF
+
+def _multipart_mixed(boundary: str, parts: List[Tuple[Dict[str, str], bytes]]) -> bytes:
+    """Encode (headers, body) parts as a multipart/mixed payload (RFC 2046)."""
+    chunks = []
+    for headers, content in parts:
+        chunks.append(f"--{boundary}\r\n".encode("ascii"))
+        for name, value in headers.items():
+            chunks.append(f"{name}: {value}\r\n".encode("utf-8"))
+        chunks.append(b"\r\n")
+        chunks.append(content)
+        chunks.append(b"\r\n")
+    chunks.append(f"--{boundary}--\r\n".encode("ascii"))
+    return b"".join(chunks)
+
+@app.post("/match/jobs/index")
+async def index_jobs_endpoint(request: JobIndexRequest):
+    """
+    Precomputes term/skill matrices for a set of postings. Match resumes
+    against the returned index_id instead of re-sending the postings.
+    """
+    from src.search import job_matcher  # numpy/scipy: loaded on first use
+
+    index_id = await run_in_threadpool(job_matcher.index_jobs, request.jobs)
+    return {"index_id": index_id, "jobs": len(request.jobs)}
+
+@app.post("/match/jobs")
+async def match_jobs_endpoint(request: MatchJobsRequest):
+    """
+    Ranks postings for one resume (BM25 text similarity + skill overlap),
+    returning the top_k with matched and missing skills. No LLM calls.
+    """
+    from src.search import job_matcher
+
+    index_id = request.index_id
+    if index_id is None:
+        if request.jobs is None:
+            raise HTTPException(status_code=400, detail="Provide index_id or jobs")
+        index_id = await run_in_threadpool(job_matcher.index_jobs, request.jobs)
+    index = await run_in_threadpool(job_matcher.get_index, index_id)
+    if index is None:
+        raise HTTPException(status_code=404, detail="Job index not found or expired; POST /match/jobs/index again")
+    matches = await run_in_threadpool(index.match, request.resume, max(1, request.top_k))
+    return {"index_id": index_id, "jobs": len(index), "matches": matches}
+
+@app.get("/usage/{user_id}")
+async def get_user_usage(user_id: str, x_user_id: Optional[str] = Header(default=None),
+                         x_internal_token: Optional[str] = Header(default=None)):
+    """
+    Cumulative token usage and cost for a user (rolled up from /process calls).
+    Only that user, through the authenticated proxy, may read it. Totals are
+    this worker's (see USER_TOKEN_QUOTA).
+    """
+    caller = _authenticated_user(x_user_id, x_internal_token)
+    if caller is None:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    if caller != user_id:
+        raise HTTPException(status_code=403, detail="Not allowed to read another user's usage")
+    return usage.ledger.get(user_id)
 
 @app.get("/resumes")
 async def list_resumes():
@@ -160,7 +394,7 @@ async def list_resumes():
     Lists all saved resumes with metadata.
     """
     try:
-        saved_dir = "data/saved_resumes"
+        saved_dir = SAVED_RESUMES_DIR
         resumes = []
         if os.path.exists(saved_dir):
             for filename in os.listdir(saved_dir):
@@ -183,13 +417,29 @@ async def list_resumes():
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/resumes/search")
+async def search_resumes(skills: str = "", any_skills: str = Query("", alias="any"), q: str = "", limit: int = 20):
+    """
+    Skill-based search over saved resumes, e.g. ?skills=Kubernetes,Go&any=AWS,GCP&q=payments.
+    `skills` are all required, at least one of `any` must match, and results are ranked
+    by how rare the matched skills and `q` terms are. Answered from an inverted index.
+    """
+    from src.search import resume_index  # numpy: loaded on first use
+
+    all_of = [s.strip() for s in skills.split(",") if s.strip()]
+    any_of = [s.strip() for s in any_skills.split(",") if s.strip()]
+    if not all_of and not any_of and not q.strip():
+        raise HTTPException(status_code=400, detail="Provide skills, any or q")
+    index = await run_in_threadpool(resume_index.get_index, SAVED_RESUMES_DIR)
+    return index.search(all_of, any_of, q, limit=max(1, min(limit, 500)))
+
 @app.get("/resumes/{resume_id}")
 async def get_resume(resume_id: str):
     """
     Loads a specific resume by ID.
     """
     try:
-        path = f"data/saved_resumes/{resume_id}.json"
+        path = os.path.join(SAVED_RESUMES_DIR, f"{resume_id}.json")
         if not os.path.exists(path):
             raise HTTPException(status_code=404, detail="Resume not found")
         with open(path, "r") as f:
@@ -213,9 +463,10 @@ async def save_resume(resume: Dict[str, Any]):
             import time
             resume_id = f"{name}_{int(time.time())}"
         
-        path = f"data/saved_resumes/{resume_id}.json"
+        path = os.path.join(SAVED_RESUMES_DIR, f"{resume_id}.json")
         with open(path, "w") as f:
             json.dump(resume, f, indent=4)
+        await run_in_threadpool(_update_resume_index, resume_id, resume, path)
         
         return {"id": resume_id, "message": "Resume saved successfully"}
     except Exception as e:
@@ -228,9 +479,10 @@ async def delete_resume(resume_id: str):
     Deletes a specific resume.
     """
     try:
-        path = f"data/saved_resumes/{resume_id}.json"
+        path = os.path.join(SAVED_RESUMES_DIR, f"{resume_id}.json")
         if os.path.exists(path):
             os.remove(path)
+            await run_in_threadpool(_update_resume_index, resume_id, None)
             return {"message": "Resume deleted"}
         raise HTTPException(status_code=404, detail="Resume not found")
     except HTTPException:
@@ -239,6 +491,19 @@ async def delete_resume(resume_id: str):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+def _update_resume_index(resume_id: str, data: Optional[Dict[str, Any]], path: Optional[str] = None):
+    """Keep the search index in step with saved resumes (once loaded; before that its first sync picks changes up)."""
+    from src.search import resume_index
+
+    resume_index.note_change(SAVED_RESUMES_DIR, resume_id)
+    index = resume_index.loaded_index(SAVED_RESUMES_DIR)
+    if index is None:
+        return
+    if data is None:
+        index.remove(resume_id)
+    else:
+        index.add(resume_id, data, os.stat(path).st_mtime)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
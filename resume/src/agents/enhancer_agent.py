@@ -1,10 +1,25 @@
-import json
-from src.utils.llm_client import LLMClient
+import re
+from typing import Any, Dict, List, Optional, Set
+from src.utils.llm_client import LLMClient, TASK_WRITE, StructuredOutputError
+from src.utils.circuit_breaker import CircuitOpenError
+from src.utils.deadline import DeadlineExceeded
+from src.utils.cache import get_cache, fingerprint
 from src.schemas.resume_schema import Resume
+from src.schemas.enhancement_schema import EnhancementPatch
+from src.utils import dedup, metrics
+
+# Bullet keys: e<item>.<bullet> for experience, p<item>.<bullet> for projects
+_KEY_RE = re.compile(r"^\[?([ep])(\d+)\.(\d+)\]?$")
 
 class EnhancerAgent:
     def __init__(self, llm: LLMClient):
         self.llm = llm
+        self.cache = get_cache("enhance")
+        self.dedup_cache = get_cache("dedup")
+        # Items sent to the LLM on the last run ("summary", "e0", "p1", ...)
+        self.recomputed: List[str] = []
+        # Bullets sent back to the LLM as near-duplicates ("e1.0", ...)
+        self.deduplicated: List[str] = []
         self.system_prompt = """You are an expert resume writer specializing in ATS (Applicant Tracking System) optimization.
 
 Your task: Rewrite resume bullet points to align with a job description while maintaining ABSOLUTE authenticity.
@@ -25,97 +40,235 @@ Focus on making the resume ATS-friendly while keeping it 100% truthful and profe
 """
 
     def enhance(self, resume: Resume, jd_text: str) -> Resume:
-        # Extract all current skills to prevent hallucinations
-        all_skills = set()
-        for cat in resume.skills:
-            all_skills.update(cat.skills)
-        for proj in resume.projects:
-            all_skills.update(proj.technologies)
-        
-        skills_string = ", ".join(sorted(list(all_skills)))
+        """
+        Rewrite experience/project bullets and the summary towards the JD.
+
+        Only the rewriteable sections are sent, in a compact keyed form, and the
+        model returns a patch list of the bullets it changed. Everything else
+        (personal info, education, skills, certifications, custom sections) is
+        never round-tripped through the LLM. Items whose content, JD and skills
+        are unchanged since a previous run are restored from the cache.
+        """
+        self.recomputed = []
+        values = self.enhance_items(resume, jd_text)
+        return self.apply_values(resume.model_copy(deep=True), values)
+
+    def enhance_items(self, resume: Resume, jd_text: str, labels: Optional[Set[str]] = None) -> Dict[str, Any]:
+        """
+        Rewrite the given items ("summary", "e0", "p1", ...; all by default) and
+        return their new values: the summary string or the item's bullet list.
+        Only the selected items of `resume` are read, so other items may still be
+        changing (the streaming pipeline enhances each item as it is expanded).
+        Items that could not be rewritten are left out of the result.
+        """
+        skills_string = self._skills_string(resume)
         current_system_prompt = self.system_prompt.format(skills_list=skills_string)
 
+        # Per-item memoization: only items whose content (or the JD/skills) changed go to the LLM
+        context = fingerprint(jd_text, skills_string)
+        items = self._items(resume, only=labels)
+        keys = {label: fingerprint("enhance", content, context) for label, content in items.items()}
+        cached = {label: self.cache.get(key) for label, key in keys.items()}
+        stale = {label for label, value in cached.items() if value is None}
+        values = {label: value for label, value in cached.items() if value is not None}
+
+        if not stale:
+            return values
+        self.recomputed.extend(sorted(stale))
+
+        sections = self._compact_sections(resume, only=stale)
+
         user_prompt = f"""
         JOB DESCRIPTION:
         {jd_text}
         
-        CURRENT RESUME (JSON):
-        {resume.model_dump_json(indent=2)}
+        CURRENT RESUME SECTIONS (each bullet is prefixed by its key):
+        {sections}
         
         TASK:
-        Rewrite the resume to align with the JD using ONLY skills from the ALLOWED SKILLS LIST.
-        
-        CRITICAL: Include ALL sections from the original resume:
-        - personal_info
-        - summary
-        - experience (with enhanced bullet points)
-        - education
-        - projects (with enhanced descriptions)
-        - skills (categorized)
-        - certifications (MUST be preserved exactly as provided)
-        - languages (MUST be preserved exactly as provided)
-        - custom_sections (MUST be preserved exactly as provided)
-        
+        Rewrite bullets (and the summary, if present) to align with the JD using ONLY skills from the ALLOWED SKILLS LIST.
         Ensure every bullet is unique and varied. Add subtle metrics where appropriate.
-        Return ONLY a valid JSON object matching the Resume schema.
+        
+        Return ONLY a JSON object:
+        {{"summary": "rewritten summary or null", "patches": [{{"key": "e0.1", "text": "rewritten bullet"}}]}}
+        Include a patch only for bullets you changed. Use the keys exactly as given.
         """
 
         try:
             # Use a slightly higher temperature for variety as requested by user
-            response = self.llm.generate(current_system_prompt, user_prompt, temperature=0.4)
-            
-            # Clean up response - remove markdown code blocks if present
-            response = response.strip()
-            if response.startswith("```"):
-                lines = response.split("\n")
-                response = "\n".join(lines[1:-1])  # Remove first and last lines
-                if response.startswith("json"):
-                    response = response[4:].strip()
-            
-            # Try to parse the JSON
-            try:
-                enhanced_data = json.loads(response)
-                enhanced_resume = Resume(**enhanced_data)
-                
-                # Pruning Hallucinated Skills (CRITICAL)
-                original_skills_lower = {s.lower() for s in all_skills}
-                
-                # Check Skills section
-                if enhanced_resume.skills:
-                    for cat in enhanced_resume.skills:
-                        cat.skills = [s for s in cat.skills if s.lower() in original_skills_lower]
-                
-                # Check Project technologies
-                if enhanced_resume.projects:
-                    for proj in enhanced_resume.projects:
-                        proj.technologies = [t for t in proj.technologies if t.lower() in original_skills_lower]
-                
-                # CRITICAL: Preserve sections that LLM might drop
-                # If enhanced resume has empty certifications but original had data, restore original
-                if resume.certifications and not enhanced_resume.certifications:
-                    print("⚠️  Warning: LLM dropped certifications. Restoring original certifications.")
-                    enhanced_resume.certifications = resume.certifications
-                
-                # Same for languages
-                if resume.languages and not enhanced_resume.languages:
-                    print("⚠️  Warning: LLM dropped languages. Restoring original languages.")
-                    enhanced_resume.languages = resume.languages
-                
-                # Same for custom sections
-                if resume.custom_sections and not enhanced_resume.custom_sections:
-                    print("⚠️  Warning: LLM dropped custom sections. Restoring original custom sections.")
-                    enhanced_resume.custom_sections = resume.custom_sections
-                
-                # Check summary (this is harder, but we can at least remove blatant keywords)
-                # For now, we trust the LLM on text, but strictly filter the structural data lists.
-                
-                return enhanced_resume
-            except json.JSONDecodeError as e:
-                print(f"Enhancement Parsing Error: {e}")
-                print("Returning original resume to prevent data loss.")
-                return resume
-                
+            patch = self.llm.generate_json(
+                current_system_prompt, user_prompt, EnhancementPatch, temperature=0.4, task=TASK_WRITE
+            )
+            rewritten = self._patch_values(resume, patch, stale)
+            self._remember(items, rewritten, keys, context)
+            values.update(rewritten)
+        except StructuredOutputError as e:
+            print(f"Enhancement Parsing Error: {e}")
+            print("Keeping original bullets to prevent data loss.")
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
         except Exception as e:
             print(f"Enhancement Error: {e}")
-            print("Returning original resume.")
+            print("Keeping original bullets.")
+        return values
+
+    def duplicate_bullets(self, resume: Resume) -> Dict[str, List[str]]:
+        """{bullet key: [earlier bullet keys it near-duplicates]} (local check, no LLM)."""
+        flagged = dedup.offending(dedup.find_duplicates(dedup.bullets(resume)))
+        if flagged:
+            metrics.registry.inc("resume_duplicate_bullets_total", len(flagged), outcome="found")
+        return flagged
+
+    def rewrite_duplicates(self, resume: Resume, flagged: Dict[str, List[str]],
+                           jd_text: Optional[str] = None) -> Resume:
+        """
+        Rewrite only the flagged bullets, in place, with one LLM call for all of
+        them. The bullets they repeat are shown as "keep" context. Rewrites are
+        cached by the bullet, what it repeats, the JD and the skills.
+        """
+        self.deduplicated = []
+        if not flagged:
             return resume
+        keyed = dedup.bullets(resume)
+        skills_string = self._skills_string(resume)
+        context = fingerprint(jd_text, skills_string)
+        cache_keys = {key: fingerprint("dedup", keyed[key], [keyed[ref] for ref in refs], context)
+                      for key, refs in flagged.items()}
+        rewrites = {key: self.dedup_cache.get(cache_key) for key, cache_key in cache_keys.items()}
+        stale = sorted((key for key, text in rewrites.items() if text is None), key=list(keyed).index)
+        rewrites = {key: text for key, text in rewrites.items() if text is not None}
+
+        if stale:
+            self.deduplicated = stale
+            print(f"🔁 Rewriting {len(stale)} near-duplicate bullet(s): {', '.join(stale)}")
+            keep = sorted({ref for key in stale for ref in flagged[key]}, key=list(keyed).index)
+            user_prompt = f"""
+        Some resume bullets repeat content that already appears elsewhere in the resume.
+
+        KEEP (unchanged; shown so you do not repeat them):
+        {chr(10).join(f"[{key}] {keyed[key]}" for key in keep)}
+
+        REWRITE (each must cover a different aspect of the same work: another outcome, scope or technique):
+        {chr(10).join(f"[{key}] {self._item_title(resume, key)}: {keyed[key]}" for key in stale)}
+
+        JOB DESCRIPTION (keywords only):
+        {jd_text or "n/a"}
+
+        Return ONLY a JSON object:
+        {{"patches": [{{"key": "e1.0", "text": "rewritten bullet"}}]}}
+        Include one patch per REWRITE key, using the keys exactly as given.
+        """
+            try:
+                patch = self.llm.generate_json(
+                    self.system_prompt.format(skills_list=skills_string), user_prompt, EnhancementPatch,
+                    temperature=0.5, task=TASK_WRITE
+                )
+                for p in patch.patches:
+                    match = _KEY_RE.match(p.key.strip())
+                    key = f"{match.group(1)}{int(match.group(2))}.{int(match.group(3))}" if match else None
+                    if key in cache_keys and p.text.strip():
+                        rewrites[key] = p.text.strip()
+                        self.dedup_cache.set(cache_keys[key], rewrites[key])
+            except (CircuitOpenError, DeadlineExceeded):
+                raise
+            except Exception as e:
+                print(f"Dedup Error: {e}")
+                print("Keeping the duplicate bullets.")
+
+        for key, text in rewrites.items():
+            label, bullet = key.split(".")
+            items = resume.experience if label[0] == "e" else resume.projects
+            items[int(label[1:])].details[int(bullet)] = text
+        remaining = len(dedup.offending(dedup.find_duplicates(dedup.bullets(resume))))
+        metrics.registry.inc("resume_duplicate_bullets_total", max(0, len(flagged) - remaining), outcome="rewritten")
+        if remaining:
+            metrics.registry.inc("resume_duplicate_bullets_total", remaining, outcome="remaining")
+        return resume
+
+    def _item_title(self, resume: Resume, key: str) -> str:
+        label = key.split(".")[0]
+        if label[0] == "e":
+            exp = resume.experience[int(label[1:])]
+            return f"{exp.role} at {exp.company}"
+        return resume.projects[int(label[1:])].name
+
+    def _skills_string(self, resume: Resume) -> str:
+        # Extract all current skills to prevent hallucinations
+        all_skills = set()
+        for cat in resume.skills:
+            all_skills.update(cat.skills)
+        for proj in resume.projects:
+            all_skills.update(proj.technologies)
+        return ", ".join(sorted(list(all_skills)))
+
+    def _items(self, resume: Resume, only: Optional[Set[str]] = None) -> Dict[str, Any]:
+        """Rewriteable items keyed by label, with the content that determines their rewrite."""
+        items: Dict[str, Any] = {}
+        if resume.summary and (only is None or "summary" in only):
+            items["summary"] = resume.summary
+        for i, exp in enumerate(resume.experience):
+            if (only is None or f"e{i}" in only) and exp.details:
+                items[f"e{i}"] = [exp.role, exp.company, list(exp.details)]
+        for i, proj in enumerate(resume.projects):
+            if (only is None or f"p{i}" in only) and proj.details:
+                items[f"p{i}"] = [proj.name, proj.technologies, list(proj.details)]
+        return items
+
+    def apply_values(self, resume: Resume, values: Dict[str, Any]) -> Resume:
+        """Write rewritten values (summary string or bullet list) back into `resume` in place."""
+        for label, value in values.items():
+            if label == "summary":
+                resume.summary = value
+            else:
+                items = resume.experience if label[0] == "e" else resume.projects
+                items[int(label[1:])].details = list(value)
+        return resume
+
+    def _remember(self, items: Dict[str, Any], rewritten: Dict[str, Any], keys: Dict[str, str], context: str):
+        """
+        Cache the rewrite of each item that was sent. The rewritten item is also
+        stored under its own key, so resubmitting an already-enhanced resume
+        doesn't rewrite it again.
+        """
+        for label, value in rewritten.items():
+            self.cache.set(keys[label], value)
+            content = value if label == "summary" else items[label][:-1] + [value]
+            self.cache.set(fingerprint("enhance", content, context), value)
+
+    def _compact_sections(self, resume: Resume, only: Optional[Set[str]] = None) -> str:
+        """Summary plus keyed experience/project bullets, one per line (restricted to `only` labels if given)."""
+        lines = []
+        if resume.summary and (only is None or "summary" in only):
+            lines.append(f"SUMMARY: {resume.summary}")
+        for i, exp in enumerate(resume.experience):
+            if only is not None and f"e{i}" not in only:
+                continue
+            if exp.details:
+                lines.append(f"EXPERIENCE e{i}: {exp.role} at {exp.company}")
+                lines.extend(f"[e{i}.{j}] {detail}" for j, detail in enumerate(exp.details))
+        for i, proj in enumerate(resume.projects):
+            if only is not None and f"p{i}" not in only:
+                continue
+            if proj.details:
+                lines.append(f"PROJECT p{i}: {proj.name} ({', '.join(proj.technologies)})")
+                lines.extend(f"[p{i}.{j}] {detail}" for j, detail in enumerate(proj.details))
+        return "\n".join(lines)
+
+    def _patch_values(self, resume: Resume, patch: EnhancementPatch, labels: Set[str]) -> Dict[str, Any]:
+        """New values for `labels` after applying keyed bullet replacements. Unknown keys are ignored."""
+        values = {label: content if label == "summary" else list(content[-1])
+                  for label, content in self._items(resume, only=labels).items()}
+        if patch.summary and "summary" in values:
+            values["summary"] = patch.summary.strip()
+        applied = 0
+        for p in patch.patches:
+            match = _KEY_RE.match(p.key.strip())
+            text = p.text.strip()
+            if not match or not text:
+                continue
+            label, bullet = f"{match.group(1)}{int(match.group(2))}", int(match.group(3))
+            if label in values and bullet < len(values[label]):
+                values[label][bullet] = text
+                applied += 1
+        print(f"✏️  Applied {applied}/{len(patch.patches)} bullet patches")
+        return values
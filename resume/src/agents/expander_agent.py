@@ -5,20 +5,42 @@ This agent detects sections with minimal information and generates
 professional descriptions and bullet points to create a complete resume.
 """
 
-from src.schemas.resume_schema import Resume, ExperienceItem, ProjectItem
-from src.utils.llm_client import LLMClient
-from typing import List
+from src.schemas.resume_schema import Resume, ExperienceItem, ProjectItem, CustomSection, CustomItem
+from src.utils.llm_client import LLMClient, TASK_WRITE
+from src.utils.cache import get_cache, fingerprint
+from typing import Callable, List
 import re
 
 
 class ExpanderAgent:
     def __init__(self, llm_client: LLMClient):
         self.llm = llm_client
+        self.cache = get_cache("expand")
+        # Items that needed an LLM call on the last run, e.g. "experience[0]"
+        self.recomputed: List[str] = []
 
     def expand(self, resume: Resume) -> Resume:
         """
         Expands sparse resume sections with AI-generated content.
         """
+        self.prepare(resume)
+
+        print("Analyzing resume for sparse content...")
+        
+        for i, exp in enumerate(resume.experience):
+            self.expand_experience(i, exp)
+
+        for i, proj in enumerate(resume.projects):
+            self.expand_project(i, proj, len(resume.projects))
+
+        for s_idx, section in enumerate(resume.custom_sections):
+            for i, item in enumerate(section.items):
+                self.expand_custom(s_idx, section, i, item)
+        
+        return resume
+
+    def prepare(self, resume: Resume):
+        """Collect the allowed skills; must run before the per-item expand_* methods."""
         # Extract allowed skills to prevent hallucinations
         all_skills = set()
         for cat in resume.skills:
@@ -28,51 +50,69 @@ class ExpanderAgent:
         
         self.allowed_skills = sorted(list(all_skills))
         self.allowed_skills_str = ", ".join(self.allowed_skills)
+        self.recomputed = []
 
-        print("Analyzing resume for sparse content...")
-        
-        if resume.experience:
-            for exp in resume.experience:
-                target = self._calculate_target_bullets(exp.start_date, exp.end_date)
-                current_count = len(exp.details)
-                
-                if current_count < target:
-                    needed = target - current_count
-                    print(f"   -> Expanding {exp.company} ({current_count}/{target} bullets)")
-                    new_bullets = self._generate_experience_bullets(exp, needed)
-                    # Deduplicate and limit
-                    exp.details.extend(new_bullets[:needed])
-
-        if resume.projects:
-            num_projects = len(resume.projects)
-            # User Preference: If 2 or more projects, be concise (2-3 bullets max)
-            default_target = 3 if num_projects >= 2 else 4
-
-            for proj in resume.projects:
-                current_count = len(proj.details)
-                # If specific details already exist, trust user; else expand to target
-                if current_count < default_target:
-                    needed = default_target - current_count
-                    print(f"   -> Expanding Project: {proj.name} ({current_count}/{default_target} bullets)")
-                    new_bullets = self._generate_project_bullets(
-                        proj, 
-                        needed, 
-                        concise_mode=(num_projects >= 2)
-                    )
-                    proj.details.extend(new_bullets[:needed])
-
-        if resume.custom_sections:
-            for section in resume.custom_sections:
-                for item in section.items:
-                    current_count = len(item.details)
-                    target = 3 # Default for custom items
-                    if current_count < target:
-                        needed = target - current_count
-                        print(f"   -> Expanding Custom Section [{section.title}]: {item.name}")
-                        new_bullets = self._generate_custom_bullets(section.title, item, needed)
-                        item.details.extend(new_bullets[:needed])
+    def expand_experience(self, i: int, exp: ExperienceItem) -> ExperienceItem:
+        """Expand one experience entry in place (up to its duration-based bullet target)."""
+        target = self._calculate_target_bullets(exp.start_date, exp.end_date)
+        current_count = len(exp.details)
         
-        return resume
+        if current_count < target:
+            needed = target - current_count
+            print(f"   -> Expanding {exp.company} ({current_count}/{target} bullets)")
+            new_bullets = self._memoized(
+                f"experience[{i}]", ("experience", exp, needed),
+                lambda: self._generate_experience_bullets(exp, needed),
+            )
+            # Deduplicate and limit
+            exp.details.extend(new_bullets[:needed])
+        return exp
+
+    def expand_project(self, i: int, proj: ProjectItem, num_projects: int) -> ProjectItem:
+        """Expand one project in place; `num_projects` decides concise mode."""
+        # User Preference: If 2 or more projects, be concise (2-3 bullets max)
+        default_target = 3 if num_projects >= 2 else 4
+        current_count = len(proj.details)
+        # If specific details already exist, trust user; else expand to target
+        if current_count < default_target:
+            needed = default_target - current_count
+            print(f"   -> Expanding Project: {proj.name} ({current_count}/{default_target} bullets)")
+            concise_mode = num_projects >= 2
+            new_bullets = self._memoized(
+                f"projects[{i}]", ("project", proj, needed, concise_mode),
+                lambda: self._generate_project_bullets(proj, needed, concise_mode=concise_mode),
+            )
+            proj.details.extend(new_bullets[:needed])
+        return proj
+
+    def expand_custom(self, s_idx: int, section: CustomSection, i: int, item: CustomItem) -> CustomItem:
+        """Expand one custom section item in place."""
+        current_count = len(item.details)
+        target = 3 # Default for custom items
+        if current_count < target:
+            needed = target - current_count
+            print(f"   -> Expanding Custom Section [{section.title}]: {item.name}")
+            new_bullets = self._memoized(
+                f"custom_sections[{s_idx}].items[{i}]", ("custom", section.title, item, needed),
+                lambda: self._generate_custom_bullets(section.title, item, needed),
+            )
+            item.details.extend(new_bullets[:needed])
+        return item
+
+    def _memoized(self, label: str, inputs: tuple, generate: Callable[[], List[str]]) -> List[str]:
+        """
+        Per-item memoization: the key covers the item as it was before expansion
+        plus the allowed-skills list, so editing one item only regenerates that item.
+        """
+        key = fingerprint(*inputs, self.allowed_skills_str)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return list(cached)
+        self.recomputed.append(label)
+        bullets = generate()
+        if bullets:
+            self.cache.set(key, bullets)
+        return bullets
 
     def _calculate_target_bullets(self, start: str, end: str) -> int:
         """Heuristic: Estimate job duration to decide bullet count."""
@@ -140,7 +180,7 @@ Location: {exp.location}
 
 Return ONLY the bullet points, one per line, without numbers or bullet symbols."""
 
-        response = self.llm.generate(system_prompt, user_prompt, temperature=0.7)
+        response = self.llm.generate(system_prompt, user_prompt, temperature=0.7, task=TASK_WRITE)
         bullets = [line.strip() for line in response.strip().split('\n') if line.strip()]
         return bullets[:count]
 
@@ -177,7 +217,7 @@ Technologies: {tech_list}
 
 Return ONLY the bullet points, one per line, without numbers or bullet symbols."""
 
-        response = self.llm.generate(system_prompt, user_prompt, temperature=0.7)
+        response = self.llm.generate(system_prompt, user_prompt, temperature=0.7, task=TASK_WRITE)
         bullets = [line.strip() for line in response.strip().split('\n') if line.strip()]
         return bullets[:count]
 
@@ -206,6 +246,6 @@ Section: {section_title}
 
 Return ONLY the bullet points, one per line, without numbers or bullet symbols."""
 
-        response = self.llm.generate(system_prompt, user_prompt, temperature=0.7)
+        response = self.llm.generate(system_prompt, user_prompt, temperature=0.7, task=TASK_WRITE)
         bullets = [line.strip() for line in response.strip().split('\n') if line.strip()]
         return bullets[:count]
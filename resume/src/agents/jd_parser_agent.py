@@ -1,6 +1,8 @@
-import json
-from src.utils.llm_client import LLMClient
+from src.utils.llm_client import LLMClient, TASK_EXTRACT, StructuredOutputError
+from src.utils.circuit_breaker import CircuitOpenError
+from src.utils.deadline import DeadlineExceeded
 from src.schemas.parsed_jd_schema import ParsedJobDescription
+from src.utils.cache import get_cache, fingerprint
 
 class JDParserAgent:
     """
@@ -16,6 +18,9 @@ class JDParserAgent:
     
     def __init__(self, llm: LLMClient):
         self.llm = llm
+        self.cache = get_cache("jd_parse")
+        # Inputs that needed an LLM call on the last parse (empty on a cache hit)
+        self.recomputed = []
         self.system_prompt = """You are an expert ATS (Applicant Tracking System) analyst specializing in job description parsing.
 
 Your task: Extract ONLY the essential, ATS-relevant information from job descriptions.
@@ -67,9 +72,16 @@ Return ONLY a valid JSON object matching this schema:
         Returns:
             ParsedJobDescription with clean, structured data
         """
+        self.recomputed = []
         if not raw_jd or not raw_jd.strip():
             return ParsedJobDescription()
         
+        cache_key = fingerprint("jd_parse", raw_jd.strip())
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return ParsedJobDescription.model_validate(cached)
+        self.recomputed = ["job_description"]
+        
         user_prompt = f"""Parse this job description and extract essential information:
 
 {raw_jd}
@@ -79,24 +91,16 @@ Extract EXACT keywords and categorize them.
 Return ONLY the JSON object."""
 
         try:
-            response = self.llm.generate(
+            # Extraction runs on the small routed model in JSON mode; invalid output is
+            # repaired locally or re-asked once on the large model
+            parsed_jd = self.llm.generate_json(
                 self.system_prompt, 
                 user_prompt, 
-                temperature=0.1  # Low temperature for consistent extraction
+                ParsedJobDescription,
+                temperature=0.1,  # Low temperature for consistent extraction
+                task=TASK_EXTRACT
             )
             
-            # Clean up response - remove markdown code blocks if present
-            response = response.strip()
-            if response.startswith("```"):
-                lines = response.split("\n")
-                response = "\n".join(lines[1:-1])  # Remove first and last lines
-                if response.startswith("json"):
-                    response = response[4:].strip()
-            
-            # Parse JSON
-            parsed_data = json.loads(response)
-            parsed_jd = ParsedJobDescription(**parsed_data)
-            
             # Log token savings
             original_tokens = len(raw_jd.split())
             parsed_tokens = len(parsed_jd.to_compact_string().split())
@@ -107,12 +111,15 @@ Return ONLY the JSON object."""
             print(f"   Parsed: ~{parsed_tokens} tokens")
             print(f"   Reduction: {reduction_pct:.1f}%\n")
             
+            self.cache.set(cache_key, parsed_jd.model_dump(mode="json"))
             return parsed_jd
             
-        except json.JSONDecodeError as e:
+        except StructuredOutputError as e:
             print(f"Warning: Could not parse JD response as JSON: {e}")
             print("Returning empty ParsedJobDescription")
             return ParsedJobDescription()
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
         except Exception as e:
             print(f"Error parsing job description: {e}")
             print("Returning empty ParsedJobDescription")
@@ -6,64 +6,19 @@ the user's resume to identify missing skills and provide recommendations.
 """
 
 from src.schemas.resume_schema import Resume
-from src.utils.llm_client import LLMClient
+from src.schemas.parsed_jd_schema import JDSkillList
+from src.utils.llm_client import LLMClient, TASK_EXTRACT
+from src.utils.circuit_breaker import CircuitOpenError
+from src.utils.deadline import DeadlineExceeded
+from src.utils.cache import get_cache, fingerprint
 from typing import List, Dict
-import json
-import re
 
 
 class SkillsAnalyzer:
     def __init__(self, llm_client: LLMClient):
         self.llm = llm_client
-
-    # def analyze(self, resume: Resume, job_description: str) -> Dict[str, List[str]]:
-    #     if not job_description:
-    #         return {"missing_skills": [], "matching_skills": []}
-
-    #     print("🧠 Performing Deep Skill Gap Analysis...")
-
-    #     # 1. Get Resume Skills (All of them flattened)
-    #     resume_skills = []
-    #     for cat in resume.skills: resume_skills.extend(cat.skills)
-    #     for proj in resume.projects: resume_skills.extend(proj.technologies)
-    #     resume_skills_str = ", ".join(set(resume_skills))
-
-    #     # 2. ONE-SHOT LLM ANALYSIS (Much more accurate than manual string matching)
-    #     # We ask the LLM to compare JD vs Resume and tell us the truth.
-    #     system_prompt = "You are a strict Technical Recruiter. Compare a candidate's skills to a JD."
-        
-    #     user_prompt = f"""
-    #     JOB DESCRIPTION:
-    #     {job_description[:3000]}
-        
-    #     CANDIDATE SKILLS:
-    #     {resume_skills_str}
-        
-    #     TASK:
-    #     1. Identify "Matching Skills" (Skills the user HAS that are in the JD).
-    #     2. Identify "Missing Skills" (Critical skills in JD that user lacks).
-    #        - Do NOT list skills the user obviously knows (e.g. if they know React, don't list HTML/CSS as missing).
-    #     3. Provide 3 specific recommendations.
-        
-    #     Return valid JSON:
-    #     {{
-    #         "matching_skills": ["List", "of", "skills"],
-    #         "missing_skills": ["List", "of", "skills"],
-    #         "recommendations": ["Rec 1", "Rec 2"]
-    #     }}
-    #     """
-
-    #     response = self.llm.generate(system_prompt, user_prompt, temperature=0.2)
-    #     return self._parse_json(response)
-
-
-    def _parse_json(self, text):
-        try:
-            match = re.search(r'(\{.*\})', text, re.DOTALL)
-            if match: return json.loads(match.group(0))
-            return json.loads(text)
-        except:
-            return {"matching_skills": [], "missing_skills": [], "recommendations": []}
+        self.cache = get_cache("analyze")
+        self.recomputed = []
 
     def analyze(self, resume: Resume, job_description: str) -> Dict[str, List[str]]:
         """
@@ -152,42 +107,45 @@ class SkillsAnalyzer:
 
     def _extract_jd_skills(self, job_description: str) -> List[str]:
         """Use LLM to extract required skills from job description."""
+        self.recomputed = []
+        cache_key = fingerprint("jd_skills", job_description)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        self.recomputed = ["job_description"]
         
         # If JD is very short (like just a job title), expand it first
         if len(job_description.split()) < 10:
             system_prompt = """You are a technical recruiter. Given a job title, list the typical technical skills required.
 
-Return ONLY a JSON array of skills. Example:
-["Python", "Django", "PostgreSQL", "Docker", "AWS"]"""
+Return ONLY a JSON object with a "skills" array. Example:
+{"skills": ["Python", "Django", "PostgreSQL", "Docker", "AWS"]}"""
             
             user_prompt = f"""Job Title: {job_description}
 
 List typical technical skills required for this role.
-Return ONLY the JSON array."""
+Return ONLY the JSON object."""
         else:
             system_prompt = """You are a technical recruiter analyzing job descriptions.
 Extract ALL technical skills, tools, frameworks, and technologies mentioned.
 
-Return ONLY a JSON array of skills, nothing else. Example:
-["Python", "Docker", "AWS", "React", "SQL"]"""
+Return ONLY a JSON object with a "skills" array, nothing else. Example:
+{"skills": ["Python", "Docker", "AWS", "React", "SQL"]}"""
 
             user_prompt = f"""Extract all technical skills from this job description:
 
 {job_description}
 
-Return ONLY the JSON array of skills."""
+Return ONLY the JSON object."""
 
         try:
-            response = self.llm.generate(system_prompt, user_prompt, temperature=0.1)
-            # Try to parse JSON from response
-            response = response.strip()
-            if response.startswith("```"):
-                # Remove code blocks if present
-                response = response.split("```")[1]
-                if response.startswith("json"):
-                    response = response[4:]
-            skills = json.loads(response.strip())
-            return skills if isinstance(skills, list) else []
+            result = self.llm.generate_json(
+                system_prompt, user_prompt, JDSkillList, temperature=0.1, task=TASK_EXTRACT
+            )
+            self.cache.set(cache_key, result.skills)
+            return result.skills
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
         except Exception as e:
             print(f"Warning: Could not parse skills from JD: {e}")
             # Fallback: extract common backend skills if JD mentions "backend"
@@ -5,20 +5,24 @@ This agent uses AI to intelligently organize skills into relevant categories
 like Programming Languages, Web Development, Databases, Tools, etc.
 """
 
-from src.schemas.resume_schema import Resume, SkillCategory
-from src.utils.llm_client import LLMClient
+from src.schemas.resume_schema import Resume, SkillCategory, SkillCategoryList
+from src.utils.llm_client import LLMClient, TASK_CLASSIFY
+from src.utils.circuit_breaker import CircuitOpenError
+from src.utils.deadline import DeadlineExceeded
+from src.utils.cache import get_cache, fingerprint
 from typing import List
-import json
-import re
 
 class SkillsCategorizer:
     def __init__(self, llm_client: LLMClient):
         self.llm = llm_client
+        self.cache = get_cache("categorize")
+        self.recomputed = []
 
     def categorize(self, resume: Resume) -> Resume:
         """
         Intelligently organizes skills into relevant categories using LLM.
         """
+        self.recomputed = []
         # Extract all unique skills from the resume
         all_skills = self._extract_all_skills(resume)
         
@@ -27,6 +31,14 @@ class SkillsCategorizer:
         
         # Determine the role context from JD or experience
         role_context = self._get_role_context(resume)
+
+        # Same skill set + role context => same categories; skip the LLM
+        cache_key = fingerprint("categorize", all_skills, role_context)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            resume.skills = [SkillCategory.model_validate(c) for c in cached]
+            return resume
+        self.recomputed = ["skills"]
         print(f"🗂️  Categorizing {len(all_skills)} skills for: {role_context}...")
         
         # 1. Define the Schema strictly for the LLM
@@ -37,7 +49,7 @@ class SkillsCategorizer:
         - Do not lose any skills from the input list.
         - Do not duplicate skills.
         - Create 3-5 categories max.
-        - Return ONLY valid JSON (list of objects).
+        - Return ONLY a valid JSON object with a "categories" list.
         """
         
         user_prompt = f"""
@@ -45,28 +57,33 @@ class SkillsCategorizer:
         SKILLS LIST: {", ".join(all_skills)}
         
         Return JSON format:
-        [
+        {{"categories": [
             {{"category": "Programming Languages", "skills": ["Python", "Java"]}},
             {{"category": "Frameworks & Libraries", "skills": ["React", "FastAPI"]}}
-        ]
+        ]}}
         """
 
         try:
-            response = self.llm.generate(system_prompt, user_prompt, temperature=0.1)
-            categories_data = self._extract_json(response)
+            # Classification runs on the small routed model in JSON mode
+            result = self.llm.generate_json(
+                system_prompt, user_prompt, SkillCategoryList, temperature=0.1, task=TASK_CLASSIFY
+            )
             
-            if categories_data:
+            if result.categories:
                 # Pruning Hallucinated Skills (CRITICAL)
                 original_skills_lower = {s.lower() for s in all_skills}
                 
                 pruned_categories = []
-                for cat_data in categories_data:
-                    cat_skills = [s for s in cat_data.get("skills", []) if s.lower() in original_skills_lower]
+                for cat in result.categories:
+                    cat_skills = [s for s in cat.skills if s.lower() in original_skills_lower]
                     if cat_skills:
-                        pruned_categories.append(SkillCategory(category=cat_data.get("category", "Other"), skills=cat_skills))
+                        pruned_categories.append(SkillCategory(category=cat.category or "Other", skills=cat_skills))
                 
                 resume.skills = pruned_categories
+                self.cache.set(cache_key, [c.model_dump(mode="json") for c in pruned_categories])
             
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
         except Exception as e:
             print(f"⚠️ Categorization failed: {e}. Keeping original layout.")
             
@@ -88,22 +105,3 @@ class SkillsCategorizer:
         elif resume.experience:
             return resume.experience[0].role
         return "Software Developer"
-
-    def _extract_json(self, text: str):
-        """Robustly extract JSON list from LLM response."""
-        try:
-            # Clean response from markdown blocks
-            text = text.strip()
-            if text.startswith("```"):
-                lines = text.split("\n")
-                text = "\n".join(lines[1:-1])
-                if text.startswith("json"):
-                    text = text[4:].strip()
-            
-            match = re.search(r'(\[.*\])', text, re.DOTALL)
-            if match:
-                return json.loads(match.group(0))
-            return json.loads(text)
-        except Exception as e:
-            print(f"JSON Extraction Error: {e}")
-            return None
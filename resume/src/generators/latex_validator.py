@@ -0,0 +1,136 @@
+"""
+LaTeX validator: repair known-fatal input before pdflatex sees it.
+
+A failed compile costs as much as a good one, and user text is what makes
+compiles fail. `repair(resume)` runs over every string field of the Resume
+and fixes what would stop pdflatex under modern.tex.j2 (utf8 inputenc + T1):
+
+- unicode_transliterated / unicode_dropped: characters the font setup has no
+  glyph for ("Unicode character ... not set up for use with LaTeX").
+  Common symbols are transliterated (→ becomes ->); accented letters outside
+  the supported range lose their accent; anything else (emoji, CJK) is
+  dropped.
+- whitespace_collapsed: newlines, tabs and control characters. A paragraph
+  break inside the tabular subheadings is fatal.
+- url_escaped: link fields containing # % & { } \\ ^ or spaces. They are
+  escaped by the `latexurl` template filter; the rule is recorded here.
+
+`check_tex(tex)` is a last gate on the rendered document: unbalanced
+braces or unsupported characters mean a guaranteed failure, so the compile
+is skipped and counted in resume_latex_rejected_total{rule}.
+
+Every repair rule that fires is counted in resume_latex_repairs_total{rule}.
+"""
+
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from src.schemas.resume_schema import Resume
+from src.utils import metrics
+
+# Characters outside ASCII/Latin-1/Latin Extended-A that utf8 inputenc + T1/TS1 can set
+EXTRA_SUPPORTED = set("–—‘’‚“”„†‡•…‰‹›€™")
+
+TRANSLITERATIONS = {
+    "→": "->", "←": "<-", "↔": "<->", "⇒": "=>", "⇐": "<=",
+    "≥": ">=", "≤": "<=", "≠": "!=", "≈": "~", "−": "-",
+    "‐": "-", "‑": "-", "‒": "-", "―": "-", "′": "'", "″": '"',
+    "✓": "", "✔": "", "✗": "", "★": "*", "☆": "*",
+    "●": "•", "▪": "•", "◦": "•", "■": "•", "➢": "•", "►": "•",
+    " ": " ", " ": " ", " ": " ", " ": " ",
+    "​": "", "‌": "", "‍": "", "﻿": "",
+}
+
+URL_FIELDS = {"linkedin", "github", "website", "link"}
+URL_SPECIALS = set("#%&{}\\^ ")
+
+
+def is_supported(ch: str) -> bool:
+    code = ord(ch)
+    return 0x20 <= code < 0x7F or 0xA0 <= code <= 0x17F or ch in EXTRA_SUPPORTED
+
+
+def clean_text(text: str, fired: Counter) -> str:
+    """Return `text` with unsupported characters and line breaks repaired, counting rules in `fired`."""
+    if all(0x20 <= ord(ch) < 0x7F for ch in text):
+        return text  # plain ASCII: the common case
+    out: List[str] = []
+    for ch in text:
+        if is_supported(ch):
+            out.append(ch)
+        elif ch in "\r\n\t" or ord(ch) < 0x20 or ord(ch) == 0x7F:
+            fired["whitespace_collapsed"] += 1
+            out.append(" ")
+        elif ch in TRANSLITERATIONS:
+            fired["unicode_transliterated"] += 1
+            out.append(TRANSLITERATIONS[ch])
+        else:
+            # Accented letters and ligatures decompose to a supported base (ǎ -> a, ﬁ -> fi)
+            decomposed = "".join(c for c in unicodedata.normalize("NFKD", ch) if is_supported(c))
+            fired["unicode_transliterated" if decomposed else "unicode_dropped"] += 1
+            out.append(decomposed)
+    cleaned = "".join(out)
+    if fired["whitespace_collapsed"]:
+        cleaned = " ".join(cleaned.split())
+    return cleaned
+
+
+def _walk(value: Any, key: str, fired: Counter) -> Any:
+    if isinstance(value, str):
+        if key in URL_FIELDS and any(ch in URL_SPECIALS for ch in value.strip()):
+            fired["url_escaped"] += 1
+        return clean_text(value, fired)
+    if isinstance(value, list):
+        return [_walk(item, key, fired) for item in value]
+    if isinstance(value, dict):
+        return {k: _walk(v, k, fired) for k, v in value.items()}
+    return value
+
+
+def repair(resume: Resume) -> Tuple[Resume, Dict[str, int]]:
+    """
+    Return (resume safe to render, {rule: times fired}). The input is not
+    modified; it is returned as-is when no rule fired.
+    """
+    fired: Counter = Counter()
+    data = _walk(resume.model_dump(), "", fired)
+    if not fired:
+        return resume, {}
+    for rule, count in fired.items():
+        metrics.registry.inc("resume_latex_repairs_total", count, rule=rule)
+    print(f"🩹 LaTeX validator repaired: {dict(fired)}")
+    if set(fired) == {"url_escaped"}:
+        return resume, dict(fired)  # escaped at render time by latexurl
+    return Resume.model_validate(data), dict(fired)
+
+
+def check_tex(tex: str) -> List[str]:
+    """Rules the rendered document breaks (empty if it is safe to compile)."""
+    problems = []
+    depth = 0
+    i = 0
+    while i < len(tex):
+        ch = tex[i]
+        if ch == "\\":
+            i += 2  # skip the escaped character (\{ \} \% ...)
+            continue
+        if ch == "%":
+            newline = tex.find("\n", i)
+            i = len(tex) if newline < 0 else newline
+            continue
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth < 0:
+                break
+        i += 1
+    if depth != 0:
+        problems.append("unbalanced_braces")
+    if any(not is_supported(ch) and ch not in "\n\t\r" for ch in tex):
+        problems.append("unsupported_unicode")
+    for rule in problems:
+        metrics.registry.inc("resume_latex_rejected_total", rule=rule)
+    return problems
+
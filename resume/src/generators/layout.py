@@ -0,0 +1,158 @@
+"""
+Layout: one-page auto-fit for the resume templates.
+
+Instead of compiling, counting pages and recompiling with tighter settings,
+the height of the document is estimated up front from the template's
+metrics. The metrics are line heights, block spacing and average glyph width
+at 12pt. The estimate is computed for each of LEVELS, from the default
+layout through tighter spacing and smaller fonts to trimming bullets. The
+first level estimated to fit one page is compiled. If that still overflows,
+one fallback level is compiled, so no document needs more than two
+compiles.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.schemas.resume_schema import Resume
+
+# Estimates must come in under this fraction of the page to count as fitting
+FIT_SAFETY = 0.97
+# After an overflow, the fallback level must be estimated at least this much shorter
+FALLBACK_SHRINK = 0.9
+
+
+class LayoutParams:
+    """Knobs the templates expose for fitting. The defaults reproduce the regular layout."""
+
+    def __init__(self, font_pt: int = 12, linespread: float = 1.0, compact: bool = False,
+                 max_bullets: Optional[int] = None):
+        self.font_pt = font_pt          # document class size: 10, 11 or 12
+        self.linespread = linespread
+        self.compact = compact          # tighter section spacing
+        self.max_bullets = max_bullets  # keep the first N bullets of each experience/project
+
+    def describe(self) -> Dict[str, Any]:
+        return {"font_pt": self.font_pt, "linespread": self.linespread,
+                "compact": self.compact, "max_bullets": self.max_bullets}
+
+
+# Least to most invasive
+LEVELS: List[LayoutParams] = [
+    LayoutParams(),
+    LayoutParams(12, 0.95, True),
+    LayoutParams(11, 0.95, True),
+    LayoutParams(10, 0.95, True),
+    LayoutParams(10, 0.95, True, max_bullets=4),
+    LayoutParams(10, 0.95, True, max_bullets=3),
+    LayoutParams(10, 0.95, True, max_bullets=2),
+]
+
+
+class TemplateMetrics:
+    """
+    Dimensions (pt, at 12pt and linespread 1.0) of one template's building blocks.
+    Font-relative dimensions scale with font_pt/12; line heights also with linespread.
+    """
+
+    def __init__(self, page_height: float, text_width: float, row_width: float, bullet_width: float,
+                 body_size: float, char_em: float, body_line: float, footnote_line: float,
+                 header: float, section: float, section_compact: float, subheading: float,
+                 heading_row: float, list_gap: float):
+        self.page_height = page_height      # usable height between the top and bottom margins
+        self.text_width = text_width        # summary / languages
+        self.row_width = row_width          # skill rows (list indent)
+        self.bullet_width = bullet_width    # bullet text
+        self.body_size = body_size
+        self.char_em = char_em              # average glyph width in em for body text
+        self.body_line = body_line
+        self.footnote_line = footnote_line
+        self.header = header                # name + contact line
+        self.section = section              # title + rule + spacing
+        self.section_compact = section_compact
+        self.subheading = subheading        # two-row heading (company/role/dates)
+        self.heading_row = heading_row      # one-row heading (projects, certifications, custom)
+        self.list_gap = list_gap            # after a bullet list
+
+
+# modern.tex.j2: letterpaper, 0.35in/0.3in margins, mathpazo (Palatino), \small body text.
+# Spacing follows the template's \vspace/itemsep settings on top of titlesec/enumitem defaults.
+LATEX_METRICS = TemplateMetrics(
+    page_height=792 - 2 * 0.3 * 72, text_width=612 - 2 * 0.35 * 72,
+    row_width=612 - 2 * 0.35 * 72 - 0.15 * 72, bullet_width=612 - 2 * 0.35 * 72 - 0.15 * 72 - 25,
+    body_size=10.95, char_em=0.48, body_line=13.6, footnote_line=12.0,
+    header=56.0, section=31.0, section_compact=19.0, subheading=26.0, heading_row=14.0, list_gap=-3.0,
+)
+
+
+def apply(resume: Resume, params: LayoutParams) -> Resume:
+    """The resume as it will be rendered under `params` (bullets trimmed if asked)."""
+    if not params.max_bullets:
+        return resume
+    trimmed = resume.model_copy(deep=True)
+    for item in list(trimmed.experience) + list(trimmed.projects):
+        item.details = item.details[:params.max_bullets]
+    return trimmed
+
+
+def estimate_height(resume: Resume, params: LayoutParams, metrics: TemplateMetrics) -> float:
+    """Estimated height in pt of the resume laid out with `params`."""
+    resume = apply(resume, params)
+    scale = params.font_pt / 12.0
+    line = metrics.body_line * scale * params.linespread
+    glyph = metrics.char_em * metrics.body_size * scale
+    section = metrics.section_compact if params.compact else metrics.section
+
+    def lines(text: Optional[str], width: float) -> int:
+        return max(1, math.ceil(len(text or "") * glyph / width))
+
+    def bullets(details: List[str]) -> float:
+        kept = [d for d in details if d]
+        if not kept:
+            return 0.0
+        return sum(lines(d, metrics.bullet_width) for d in kept) * line + metrics.list_gap * scale
+
+    height = metrics.header * scale
+    if resume.summary:
+        height += section + lines(resume.summary, metrics.text_width) * line
+    for items in (resume.experience, resume.education):
+        if items:
+            height += section
+            for item in items:
+                height += metrics.subheading * scale * params.linespread + bullets(item.details)
+    if resume.skills:
+        height += section
+        for category in resume.skills:
+            if category.skills:
+                row = f"{category.category}: " + " · ".join(category.skills)
+                height += lines(row, metrics.row_width) * line
+    for items in (resume.projects, resume.certifications):
+        if items:
+            height += section
+            for item in items:
+                height += metrics.heading_row * scale * params.linespread + bullets(item.details)
+    if resume.languages:
+        height += section + lines(" · ".join(resume.languages), metrics.text_width) * metrics.footnote_line * scale
+    for custom in resume.custom_sections:
+        height += section
+        for item in custom.items:
+            height += metrics.heading_row * scale * params.linespread + bullets(item.details)
+    return height
+
+
+def plan(resume: Resume, metrics: TemplateMetrics) -> Tuple[int, List[float]]:
+    """Index into LEVELS of the least invasive layout estimated to fit one page, plus every level's estimate."""
+    estimates = [estimate_height(resume, params, metrics) for params in LEVELS]
+    budget = metrics.page_height * FIT_SAFETY
+    for level, height in enumerate(estimates):
+        if height <= budget:
+            return level, estimates
+    return len(LEVELS) - 1, estimates
+
+
+def fallback(level: int, estimates: List[float]) -> Optional[int]:
+    """Level to try after `level` overflowed: the next one estimated clearly shorter, else the last."""
+    for candidate in range(level + 1, len(LEVELS)):
+        if estimates[candidate] <= estimates[level] * FALLBACK_SHRINK:
+            return candidate
+    return len(LEVELS) - 1 if level < len(LEVELS) - 1 else None
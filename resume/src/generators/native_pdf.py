@@ -0,0 +1,263 @@
+"""
+NativePdfRenderer: lays out the modern template straight to PDF with reportlab.
+
+Covers the same sections as templates/modern.tex.j2 (header, summary,
+experience, education, skills, projects, certifications, languages, custom
+sections) with the same structure: ruled section titles, subheadings with
+right-aligned location/dates, bullet lists and skill rows. There is no TeX
+run, so a page takes milliseconds and the image does not need texlive.
+
+Differences from the LaTeX output are accepted: Times stands in for Palatino,
+and there is no microtype/kerning. The built-in PDF fonts only cover WinAnsi
+(cp1252), so other characters are replaced with '?'.
+
+reportlab is an optional dependency, imported on first render.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+from src.generators.layout import LayoutParams, TemplateMetrics
+from src.schemas.resume_schema import Resume
+
+INCH = 72.0
+PAGE_WIDTH, PAGE_HEIGHT = 8.5 * INCH, 11 * INCH  # letterpaper
+MARGIN_X = 0.35 * INCH
+MARGIN_TOP = 0.3 * INCH
+MARGIN_BOTTOM = 0.3 * INCH
+LIST_INDENT = 0.15 * INCH
+BULLET_INDENT = 0.3 * INCH
+
+REGULAR, BOLD, ITALIC = "Times-Roman", "Times-Bold", "Times-Italic"
+NAME_SIZE = 24
+SECTION_SIZE = 14
+BODY_SIZE = 10.9  # \small at 12pt
+FOOTNOTE_SIZE = 10
+LEADING = 1.2
+SEPARATOR = " · "  # middle dot, as $\cdot$ in the template
+
+# A run of text in one font: (text, font, link)
+Run = Tuple[str, str, Optional[str]]
+
+# The blocks below, measured from the drawing code, for the one-page estimator
+METRICS = TemplateMetrics(
+    page_height=PAGE_HEIGHT - MARGIN_TOP - MARGIN_BOTTOM, text_width=PAGE_WIDTH - 2 * MARGIN_X,
+    row_width=PAGE_WIDTH - 2 * MARGIN_X - LIST_INDENT, bullet_width=PAGE_WIDTH - 2 * MARGIN_X - BULLET_INDENT,
+    body_size=BODY_SIZE, char_em=0.43, body_line=BODY_SIZE * LEADING, footnote_line=FOOTNOTE_SIZE * LEADING,
+    header=NAME_SIZE + 4 + BODY_SIZE * LEADING, section=SECTION_SIZE * LEADING + 11,
+    section_compact=SECTION_SIZE * LEADING + 7, subheading=2 * BODY_SIZE * LEADING + 2,
+    heading_row=BODY_SIZE * LEADING + 2, list_gap=2,
+)
+
+
+def _winansi(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    return str(text).encode("cp1252", "replace").decode("cp1252")
+
+
+def _dates(start: str, end: str) -> str:
+    return f"{start} – {end}"  # en dash, as -- in TeX
+
+
+class NativePdfRenderer:
+    def __init__(self, layout: Optional[LayoutParams] = None):
+        layout = layout or LayoutParams()
+        scale = layout.font_pt / 12.0
+        self.body_size = BODY_SIZE * scale
+        self.name_size = NAME_SIZE * scale
+        self.footnote_size = FOOTNOTE_SIZE * scale
+        self.leading = LEADING * layout.linespread
+        self.section_gap = 2 if layout.compact else 6
+        try:
+            from reportlab.pdfbase.pdfmetrics import stringWidth
+            from reportlab.pdfgen import canvas
+        except ImportError as e:
+            raise RuntimeError("The native PDF backend needs reportlab (pip install reportlab)") from e
+        self._canvas_module = canvas
+        self._width = stringWidth
+        self.pages = 0
+
+    # ------------------------------------------------------------------ public
+
+    def render(self, resume: Resume) -> bytes:
+        import io
+
+        buffer = io.BytesIO()
+        self.c = self._canvas_module.Canvas(buffer, pagesize=(PAGE_WIDTH, PAGE_HEIGHT), pageCompression=1)
+        self.c.setTitle(_winansi(resume.personal_info.name))
+        self.pages = 1
+        self.y = PAGE_HEIGHT - MARGIN_TOP
+
+        self._header(resume)
+        if resume.summary:
+            self._section("Professional Summary")
+            self._paragraph([(resume.summary, REGULAR, None)], MARGIN_X, self.body_size)
+
+        if resume.experience:
+            self._section("Experience")
+            for exp in resume.experience:
+                self._subheading(exp.company, exp.location, exp.role, _dates(exp.start_date, exp.end_date))
+                self._bullets(exp.details)
+
+        if resume.education:
+            self._section("Education")
+            for edu in resume.education:
+                self._subheading(edu.institution, edu.location, edu.degree, _dates(edu.start_date, edu.end_date))
+                self._bullets(edu.details)
+
+        if resume.skills:
+            self._section("Technical Skills")
+            for category in resume.skills:
+                if category.skills:
+                    self._paragraph([(f"{category.category or 'Skills'}: ", BOLD, None),
+                                     (SEPARATOR.join(category.skills), REGULAR, None)],
+                                    MARGIN_X + LIST_INDENT, self.body_size)
+
+        if resume.projects:
+            self._section("Projects")
+            for project in resume.projects:
+                runs: List[Run] = [(project.name, BOLD, None)]
+                if project.technologies:
+                    runs.append((" | " + SEPARATOR.join(project.technologies), REGULAR, None))
+                self._heading_row(runs, [("Link", REGULAR, project.link)] if project.link else [])
+                self._bullets(project.details)
+
+        if resume.certifications:
+            self._section("Certifications")
+            for cert in resume.certifications:
+                runs = [(cert.name, BOLD, None), (f" | {cert.issuer}", REGULAR, None)]
+                if cert.link:
+                    runs += [(" | ", REGULAR, None), ("Verify", REGULAR, cert.link)]
+                self._heading_row(runs, [(cert.date, REGULAR, None)])
+                self._bullets(cert.details)
+
+        if resume.languages:
+            self._section("Languages Known")
+            self._paragraph([(SEPARATOR.join(resume.languages), REGULAR, None)], MARGIN_X, self.footnote_size)
+
+        for section in resume.custom_sections:
+            self._section(section.title)
+            for item in section.items:
+                runs = [(item.name, BOLD, item.link)]
+                if item.organizer:
+                    runs.append((f" | {item.organizer}", REGULAR, None))
+                self._heading_row(runs, [(item.date, REGULAR, None)] if item.date else [])
+                self._bullets(item.details)
+
+        self.c.save()
+        return buffer.getvalue()
+
+    # ---------------------------------------------------------------- sections
+
+    def _header(self, resume: Resume):
+        info = resume.personal_info
+        self._advance(self.name_size)
+        self._centered([(info.name, BOLD, None)], self.name_size)
+        self.y -= 4
+
+        contact: List[Run] = []
+        for text, link in ((info.phone, None), (info.email, f"mailto:{info.email}"),
+                           ("LinkedIn" if info.linkedin else None, info.linkedin),
+                           ("GitHub" if info.github else None, info.github),
+                           ("Portfolio" if info.website else None, info.website)):
+            if not text:
+                continue
+            if contact:
+                contact.append(("  |  ", REGULAR, None))
+            contact.append((text, REGULAR, link))
+        if contact:
+            self._advance(self.body_size * self.leading)
+            self._centered(contact, self.body_size)
+
+    def _section(self, title: str):
+        # Keep a title together with at least its first line of content
+        self._advance(SECTION_SIZE * LEADING + self.section_gap, keep=self.body_size * self.leading * 2)
+        self.c.setFont(REGULAR, SECTION_SIZE)
+        self.c.drawString(MARGIN_X, self.y, _winansi(title).upper())
+        self.y -= 3
+        self.c.setLineWidth(0.5)
+        self.c.line(MARGIN_X, self.y, PAGE_WIDTH - MARGIN_X, self.y)
+        self.y -= 2
+
+    def _subheading(self, left_top: str, right_top: Optional[str], left_bottom: str, right_bottom: str):
+        line = self.body_size * self.leading
+        self._advance(line + 2, keep=line)
+        self._row([(left_top, BOLD, None)], [(right_top, REGULAR, None)] if right_top else [], self.body_size + 1)
+        self._advance(line)
+        self._row([(left_bottom, ITALIC, None)], [(right_bottom, ITALIC, None)], self.body_size)
+
+    def _heading_row(self, left: Sequence[Run], right: Sequence[Run]):
+        self._advance(self.body_size * self.leading + 2)
+        self._row(left, right, self.body_size)
+
+    def _bullets(self, details: Sequence[str]):
+        for detail in details:
+            if detail:
+                self._paragraph([(detail, REGULAR, None)], MARGIN_X + BULLET_INDENT, self.body_size, bullet=True)
+        if details:
+            self.y -= 2
+
+    # ------------------------------------------------------------- primitives
+
+    def _advance(self, height: float, keep: float = 0.0):
+        """Move the cursor down `height`, starting a new page if `height + keep` does not fit."""
+        if self.y - height - keep < MARGIN_BOTTOM:
+            self.c.showPage()
+            self.pages += 1
+            self.y = PAGE_HEIGHT - MARGIN_TOP
+        self.y -= height
+
+    def _runs_width(self, runs: Sequence[Run], size: float) -> float:
+        return sum(self._width(_winansi(text), font, size) for text, font, _ in runs)
+
+    def _draw_runs(self, runs: Sequence[Run], x: float, size: float):
+        for text, font, link in runs:
+            text = _winansi(text)
+            if not text:
+                continue
+            width = self._width(text, font, size)
+            self.c.setFont(font, size)
+            self.c.drawString(x, self.y, text)
+            if link:
+                self.c.setLineWidth(0.4)
+                self.c.line(x, self.y - 1.5, x + width, self.y - 1.5)
+                self.c.linkURL(link, (x, self.y - 2, x + width, self.y + size), relative=0)
+            x += width
+
+    def _centered(self, runs: Sequence[Run], size: float):
+        self._draw_runs(runs, (PAGE_WIDTH - self._runs_width(runs, size)) / 2, size)
+
+    def _row(self, left: Sequence[Run], right: Sequence[Run], size: float):
+        """Left runs at the list indent, right runs flush with the right margin."""
+        self._draw_runs(left, MARGIN_X + LIST_INDENT, size)
+        if right:
+            self._draw_runs(right, PAGE_WIDTH - MARGIN_X - self._runs_width(right, size), size)
+
+    def _paragraph(self, runs: Sequence[Run], x: float, size: float, bullet: bool = False):
+        """Word-wrap runs between x and the right margin, one line per advance."""
+        max_width = PAGE_WIDTH - MARGIN_X - x
+        line: List[Run] = []
+        line_width = 0.0
+        first = [bullet]
+
+        def flush():
+            self._advance(size * self.leading)
+            if first[0]:
+                self._draw_runs([("•", REGULAR, None)], x - 8, size)
+                first[0] = False
+            self._draw_runs(line, x, size)
+
+        for text, font, link in runs:
+            for i, word in enumerate(_winansi(text).split(" ")):
+                # Keep the spaces between runs; splitting drops them
+                piece = word if i == 0 else " " + word
+                width = self._width(piece, font, size)
+                if line and line_width + width > max_width:
+                    flush()
+                    line, line_width = [], 0.0
+                    piece = piece.lstrip(" ")
+                    width = self._width(piece, font, size)
+                line.append((piece, font, link))
+                line_width += width
+        if line:
+            flush()
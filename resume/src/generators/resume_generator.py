@@ -1,11 +1,58 @@
 import os
+import re
 import subprocess
+from typing import Optional, Tuple
 import jinja2
 from src.schemas.resume_schema import Resume
-from src.utils.template_utils import latextxt
+from src.utils.template_utils import latextxt, latexurl
+from src.utils import metrics
+from src.utils.cache import fingerprint
+from src.generators.workspace import compile_slot, compile_workspace, retained_path, write_retained
+from src.generators import latex_validator, layout
+from src.generators.layout import LayoutParams, TemplateMetrics
+
+# pdflatex is killed after this long (a broken document can otherwise hang it)
+COMPILE_TIMEOUT_S = float(os.getenv("COMPILE_TIMEOUT_S", "60"))
+# Reuse the PDF of an identical .tex (PDF_CACHE=0 disables)
+PDF_CACHE_ENABLED = os.getenv("PDF_CACHE", "1") != "0"
+AUX_EXTENSIONS = (".aux", ".log", ".out")
+# "latex" (pdflatex + modern.tex.j2) or "native" (reportlab, no TeX needed)
+PDF_BACKEND = os.getenv("PDF_BACKEND", "latex")
+BACKENDS = ("latex", "native")
+# pdflatex's summary line, e.g. "Output written on resume.pdf (2 pages, 41233 bytes)."
+PAGES_WRITTEN = re.compile(r"Output written on .*?\((\d+) pages?")
+
+
+def _read_pages(path: str) -> Optional[int]:
+    try:
+        with open(path) as f:
+            return int(f.read())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+class FitResult:
+    """A one-page render: the PDF plus how many compiles it took and the layout chosen."""
+
+    def __init__(self, pdf: Optional[bytes], pages: Optional[int], compiles: int, level: int,
+                 estimated_height: float):
+        self.pdf = pdf
+        self.pages = pages
+        self.compiles = compiles
+        self.level = level
+        self.layout = layout.LEVELS[level]
+        self.estimated_height = estimated_height
+
+    def summary(self):
+        return {"pages": self.pages, "compiles": self.compiles, "level": self.level,
+                "layout": self.layout.describe()}
+
 
 class ResumeGenerator:
-    def __init__(self, output_dir: str = "output"):
+    def __init__(self, output_dir: str = "output", backend: Optional[str] = None):
+        self.backend = backend or PDF_BACKEND
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown PDF backend '{self.backend}' (expected one of {', '.join(BACKENDS)})")
         self.output_dir = output_dir
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
@@ -17,49 +64,164 @@ class ResumeGenerator:
             autoescape=jinja2.select_autoescape(['html', 'xml'])
         )
         self.env.filters['latextxt'] = latextxt
+        self.env.filters['latexurl'] = latexurl
+
+    def render_tex(self, resume: Resume, params: Optional[LayoutParams] = None) -> str:
+        with metrics.stage("tex_render"):
+            resume, _ = latex_validator.repair(resume)
+            return self.env.get_template("modern.tex.j2").render(resume=resume, layout=params or LayoutParams())
+
+    def render_pdf(self, resume: Resume, params: Optional[LayoutParams] = None) -> Optional[bytes]:
+        """
+        Return the PDF bytes (None if compilation failed). The latex backend
+        compiles in a private scratch directory; the native backend lays the
+        page out in memory. Nothing is left in output_dir.
+        """
+        return self._render(resume, params or LayoutParams())[0]
+
+    def render_pdf_one_page(self, resume: Resume) -> FitResult:
+        """
+        Auto-fit to one page: pick the least invasive layout the estimator says
+        fits, compile it, and only if it still overflows compile one fallback.
+        """
+        template_metrics = self._template_metrics()
+        level, estimates = layout.plan(resume, template_metrics)
+        pdf, pages = self._render(resume, layout.LEVELS[level], need_pages=True)
+        compiles = 1
+        if pdf is not None and pages is not None and pages > 1:
+            retry = layout.fallback(level, estimates)
+            if retry is not None:
+                print(f"📐 Layout level {level} overflowed to {pages} pages; retrying at level {retry}")
+                retry_pdf, retry_pages = self._render(resume, layout.LEVELS[retry], need_pages=True)
+                compiles += 1
+                if retry_pdf is not None:
+                    pdf, pages, level = retry_pdf, retry_pages, retry
+
+        metrics.registry.inc("resume_autofit_total", backend=self.backend, compiles=str(compiles),
+                             fitted="yes" if pages == 1 else "no")
+        return FitResult(pdf, pages, compiles, level, estimates[level])
+
+    def _template_metrics(self) -> TemplateMetrics:
+        if self.backend == "native":
+            from src.generators.native_pdf import METRICS
+            return METRICS
+        return layout.LATEX_METRICS
+
+    def _render(self, resume: Resume, params: LayoutParams,
+                need_pages: bool = False) -> Tuple[Optional[bytes], Optional[int]]:
+        """(pdf bytes, page count) for `resume` laid out with `params`."""
+        resume = layout.apply(resume, params)
+        if self.backend == "native":
+            from src.generators.native_pdf import NativePdfRenderer
+            resume, _ = latex_validator.repair(resume)  # same text as the LaTeX output
+            renderer = NativePdfRenderer(params)
+            with metrics.stage("pdf_native"):
+                pdf = renderer.render(resume)
+            metrics.registry.inc("resume_pdf_compiles_total", result="ok", backend="native")
+            return pdf, renderer.pages
+        return self._compile(self.render_tex(resume, params), need_pages)
+
+    def compile_pdf(self, tex: str) -> Optional[bytes]:
+        return self._compile(tex)[0]
+
+    def _compile(self, tex: str, need_pages: bool = False) -> Tuple[Optional[bytes], Optional[int]]:
+        key = fingerprint("pdf", tex)
+        cache_path = retained_path("pdf", f"{key}.pdf")
+        pages_path = cache_path + ".pages"
+        if PDF_CACHE_ENABLED:
+            try:
+                with open(cache_path, "rb") as f:
+                    pdf = f.read()
+                pages = _read_pages(pages_path)
+                if pages is not None or not need_pages:
+                    os.utime(cache_path)  # keep recently used PDFs ahead of the GC
+                    metrics.record_cache("pdf", True)
+                    return pdf, pages
+            except FileNotFoundError:
+                pass
+            metrics.record_cache("pdf", False)
+
+        problems = latex_validator.check_tex(tex)
+        if problems:
+            # pdflatex would fail on this; don't spend a compile finding out
+            metrics.registry.inc("resume_pdf_compiles_total", result="rejected", backend="latex")
+            print(f"⛔ Skipping compile, rendered .tex fails validation: {', '.join(problems)}")
+            return None, None
+
+        with compile_workspace() as workdir:
+            tex_path = os.path.join(workdir, "resume.tex")
+            with open(tex_path, "w") as f:
+                f.write(tex)
+            output = self._run_pdflatex(workdir, "resume.tex", failed_log_key=key)
+            if output is None:
+                return None, None
+            with open(os.path.join(workdir, "resume.pdf"), "rb") as f:
+                pdf = f.read()
+        match = PAGES_WRITTEN.search(output)
+        pages = int(match.group(1)) if match else None
+
+        if PDF_CACHE_ENABLED:
+            write_retained(cache_path, pdf)
+            if pages is not None:
+                write_retained(pages_path, str(pages).encode("ascii"))
+        return pdf, pages
 
     def generate_tex(self, resume: Resume, filename: str = "resume") -> str:
-        template = self.env.get_template("modern.tex.j2")
-        # Pre-process resume object if needed (e.g. escape characters)
-        # For now, we rely on jinja2 to handle simple replacements, 
-        # but complex latex escaping should be done in helper filters.
-        
-        # We need a recursive function to escape all strings in the model
-        # For simplicity in this iteration, we will just render and assume users don't break latex often
-        # or we improve the filter later. 
-        # Actually, let's use the latextxt filter in the template for safety.
-        
-        rendered_tex = template.render(resume=resume)
-        
+        # Unsupported characters are repaired by latex_validator; TeX specials
+        # are escaped by the latextxt/latexurl filters in the template.
+        rendered_tex = self.render_tex(resume)
         output_path = os.path.join(self.output_dir, f"{filename}.tex")
         with open(output_path, "w") as f:
             f.write(rendered_tex)
-            
         return output_path
 
     def generate_pdf(self, tex_path: str) -> str:
+        # We must run pdflatex in the output directory or handle paths carefully
+        # Simplest is to run in the directory of the tex file
+        cwd = os.path.dirname(tex_path)
+        basename = os.path.basename(tex_path)
+        if self._run_pdflatex(cwd, basename) is None:
+            return None
+        stem = os.path.splitext(tex_path)[0]
+        for ext in AUX_EXTENSIONS:
+            try:
+                os.remove(stem + ext)
+            except FileNotFoundError:
+                pass
+        return stem + ".pdf"
+
+    def _run_pdflatex(self, cwd: str, basename: str, failed_log_key: Optional[str] = None) -> Optional[str]:
+        """Run pdflatex; returns its stdout, or None if the compile failed."""
         try:
-            # We must run pdflatex in the output directory or handle paths carefully
-            # Simplest is to run in the directory of the tex file
-            cwd = os.path.dirname(tex_path)
-            basename = os.path.basename(tex_path)
-            
             # recursive call often needed for references, but for this simple template once is usually enough
             # unless we add lastpage or similar packages.
-            subprocess.run(
-                ["pdflatex", "-interaction=nonstopmode", basename], 
-                cwd=cwd, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                check=True
-            )
-            
-            pdf_path = tex_path.replace(".tex", ".pdf")
-            return pdf_path
+            # One of the host-wide compile slots, shared by every worker process
+            with compile_slot(), metrics.stage("pdf_compile"):
+                result = subprocess.run(
+                    ["pdflatex", "-interaction=nonstopmode", basename], 
+                    cwd=cwd, 
+                    stdout=subprocess.PIPE, 
+                    stderr=subprocess.PIPE,
+                    check=True,
+                    timeout=COMPILE_TIMEOUT_S
+                )
+            metrics.registry.inc("resume_pdf_compiles_total", result="ok", backend="latex")
+            return result.stdout.decode(errors="replace")
         except subprocess.CalledProcessError as e:
+            metrics.registry.inc("resume_pdf_compiles_total", result="failed", backend="latex")
             print(f"Error compiling PDF: {e}")
             print(f"Stdout: {e.stdout.decode()}")
             print(f"Stderr: {e.stderr.decode()}")
+            if failed_log_key:
+                # The workspace is about to be deleted; keep the log (under the disk budget) for debugging
+                log_path = os.path.join(cwd, os.path.splitext(basename)[0] + ".log")
+                if os.path.exists(log_path):
+                    with open(log_path, "rb") as f:
+                        write_retained(retained_path("failed", f"{failed_log_key}.log"), f.read())
+            return None
+        except subprocess.TimeoutExpired:
+            metrics.registry.inc("resume_pdf_compiles_total", result="timeout", backend="latex")
+            print(f"pdflatex timed out after {COMPILE_TIMEOUT_S}s")
             return None
         except FileNotFoundError:
             print("pdflatex not found. Please install TeX Live (latex-base).")
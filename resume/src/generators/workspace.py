@@ -0,0 +1,152 @@
+"""
+Workspace: isolated scratch directories for LaTeX compiles, and a
+disk-budgeted store for anything kept afterwards.
+
+Every compile gets its own directory (on tmpfs when /dev/shm is writable),
+so concurrent compiles of the same resume never share .tex/.aux/.pdf files.
+The directory is deleted as soon as the PDF bytes have been read.
+
+What is kept on purpose (rendered PDFs for reuse, logs of failed compiles)
+lives under RETAINED_DIR. `collect_garbage` deletes the oldest entries there
+until the total is back under COMPILE_RETAINED_MAX_MB. RETAINED_DIR is on
+the host's filesystem, so every worker process reuses the same PDFs.
+
+At most COMPILE_CONCURRENCY pdflatex runs happen at once on the host,
+whatever the number of worker processes. `compile_slot` holds one of that
+many lock files (flock, released by the kernel even if the worker dies).
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from src.utils import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to a per-process limit
+    fcntl = None
+
+SCRATCH_ROOT = os.getenv("COMPILE_SCRATCH_DIR")
+RETAINED_DIR = os.getenv("COMPILE_RETAINED_DIR", os.path.join(tempfile.gettempdir(), "resume-retained"))
+RETAINED_MAX_BYTES = int(float(os.getenv("COMPILE_RETAINED_MAX_MB", "256")) * 1024 * 1024)
+
+COMPILE_CONCURRENCY = max(1, int(os.getenv("COMPILE_CONCURRENCY", str(os.cpu_count() or 1))))
+SLOTS_DIR = os.getenv("COMPILE_SLOTS_DIR", os.path.join(tempfile.gettempdir(), "resume-compile-slots"))
+SLOT_POLL_MAX_S = 0.05
+
+_gc_lock = threading.Lock()
+_local_slots = threading.BoundedSemaphore(COMPILE_CONCURRENCY)
+
+
+def scratch_root() -> str:
+    """COMPILE_SCRATCH_DIR, else /dev/shm (RAM-backed) if writable, else the system temp dir."""
+    if SCRATCH_ROOT:
+        os.makedirs(SCRATCH_ROOT, exist_ok=True)
+        return SCRATCH_ROOT
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+@contextmanager
+def compile_workspace(prefix: str = "resume-") -> Iterator[str]:
+    """A private scratch directory for one compile, removed on exit whatever happened."""
+    path = tempfile.mkdtemp(prefix=prefix, dir=scratch_root())
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+@contextmanager
+def compile_slot() -> Iterator[None]:
+    """Wait for one of the host's COMPILE_CONCURRENCY compile slots and hold it for the block."""
+    start = time.perf_counter()
+    with metrics.stage("compile_wait"):
+        fd = _acquire_slot()
+    metrics.registry.observe("resume_compile_slot_wait_seconds", time.perf_counter() - start)
+    try:
+        yield
+    finally:
+        if fd is None:
+            _local_slots.release()
+        else:
+            os.close(fd)  # drops the flock
+
+
+def _acquire_slot() -> Optional[int]:
+    """An fd holding a slot's lock file (None: the per-process semaphore was taken instead)."""
+    if fcntl is None:
+        _local_slots.acquire()
+        return None
+    os.makedirs(SLOTS_DIR, exist_ok=True)
+    delay = 0.005
+    while True:
+        for slot in range(COMPILE_CONCURRENCY):
+            # A fresh open file per attempt: flock is per open file, so threads of one process exclude each other too
+            fd = os.open(os.path.join(SLOTS_DIR, f"slot-{slot}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except OSError:
+                os.close(fd)
+        time.sleep(delay)
+        delay = min(delay * 2, SLOT_POLL_MAX_S)
+
+
+def retained_path(*parts: str) -> str:
+    """Path under RETAINED_DIR (parent directories created)."""
+    path = os.path.join(RETAINED_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def write_retained(path: str, content: bytes):
+    """Atomically write a retained file, then bring the store back under budget."""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(content)
+    os.replace(tmp, path)
+    collect_garbage()
+
+
+def collect_garbage(root: Optional[str] = None, max_bytes: Optional[int] = None) -> int:
+    """
+    Delete the least recently modified files under `root` until their total
+    size fits `max_bytes`. Returns the number of bytes freed.
+    """
+    root = root or RETAINED_DIR
+    max_bytes = RETAINED_MAX_BYTES if max_bytes is None else max_bytes
+    with _gc_lock:
+        entries = []
+        total = 0
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        freed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total - freed <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            freed += size
+
+    metrics.registry.set_gauge("resume_retained_bytes", total - freed)
+    if freed:
+        metrics.registry.inc("resume_retained_evicted_bytes_total", freed)
+    return freed
@@ -0,0 +1,248 @@
+"""
+ResumePipeline: item-level streaming execution of the agent pipeline.
+
+Each experience/project/custom item is expanded by its own task on a thread
+pool and, once done, pushed onto a ready queue. An enhancement dispatcher drains
+the queue and sends whatever items are ready in one enhancement call, so an
+item is enhanced as soon as it has been expanded while other items are still
+expanding, and items that arrive together share one prompt (the JD is not
+resent per item). JD parsing, skills analysis and categorization run alongside,
+and the final Resume is assembled once everything has finished. Wall time
+approaches the slowest single item's chain rather than the sum of the stages.
+Near-duplicate bullets left over are then rewritten in one targeted call
+(src/utils/dedup.py).
+
+Pool tasks only ever wait on tasks submitted before them, so the pool cannot
+deadlock even with a single worker.
+"""
+
+import contextvars
+import os
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from src.agents.enhancer_agent import EnhancerAgent
+from src.agents.expander_agent import ExpanderAgent
+from src.agents.jd_parser_agent import JDParserAgent
+from src.agents.skills_analyzer import SkillsAnalyzer
+from src.agents.skills_categorizer import SkillsCategorizer
+from src.schemas.resume_schema import Resume
+from src.utils import metrics
+from src.utils.circuit_breaker import CircuitOpenError
+from src.utils.deadline import DeadlineExceeded, current_deadline
+from src.utils.llm_client import LLMClient
+
+
+class PipelineResult:
+    def __init__(self, resume: Resume, analysis: Optional[Dict[str, Any]], recomputed: Dict[str, List[str]],
+                 degraded: Optional[Dict[str, Any]] = None):
+        self.resume = resume
+        self.analysis = analysis
+        # Items each stage had to send to the LLM; everything else came from the per-item cache
+        self.recomputed = recomputed
+        # What was skipped or cut short to stay within the request's latency budget,
+        # and ("failed") items whose expansion errored and kept the user's bullets
+        self.degraded = degraded
+
+
+class ResumePipeline:
+    def __init__(self, llm: LLMClient, max_workers: Optional[int] = None):
+        self.llm = llm
+        self.max_workers = max_workers or int(os.getenv("PIPELINE_MAX_WORKERS", "8"))
+
+    def run(self, resume: Resume) -> PipelineResult:
+        """
+        JD Parsing -> (per item) Expansion -> Enhancement, with Analysis and
+        Categorization in parallel. The input resume is not modified.
+
+        Under a request deadline (src.utils.deadline), optional work is skipped
+        when the remaining budget no longer covers it: categorization, analysis,
+        and per item the expansion and enhancement. JD parsing always runs.
+        An item whose expansion fails keeps its original bullets; it is listed
+        under `degraded["failed"]`. An open LLM circuit still fails the run.
+        """
+        resume = resume.model_copy(deep=True)
+        deadline = current_deadline()
+
+        def within_budget(stage: str, *items: str) -> bool:
+            if deadline is None or deadline.allows(stage):
+                return True
+            for item in items or (stage,):
+                deadline.skip(item)
+            return False
+
+        jd_parser = JDParserAgent(self.llm)
+        expander = ExpanderAgent(self.llm)
+        analyzer = SkillsAnalyzer(self.llm)
+        categorizer = SkillsCategorizer(self.llm)
+        enhancer = EnhancerAgent(self.llm)
+
+        failed: List[str] = []
+        expand = self._needs_expansion(resume)
+        if expand:
+            print("Analyzing resume for sparse content...")
+            expander.prepare(resume)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline") as pool:
+            def submit(fn: Callable, *args) -> Future:
+                # Each task gets its own copy of the request context (trace, stage, usage scope)
+                return pool.submit(contextvars.copy_context().run, fn, *args)
+
+            def parse_jd() -> Optional[str]:
+                if not resume.job_description:
+                    return None
+                print("\n🔍 Parsing Job Description...")
+                try:
+                    with metrics.stage("jd_parse"):
+                        parsed = jd_parser.parse_to_string(resume.job_description)
+                except DeadlineExceeded:
+                    return None  # no JD to tailor to: analysis and enhancement are skipped
+                print(f"✅ JD Parsed successfully\n")
+                return parsed
+
+            # Analysis and categorization only look at skills, which expansion never
+            # touches; they get their own snapshot so they can run alongside it.
+            snapshot = resume.model_copy(deep=True)
+
+            def categorize():
+                if not within_budget("categorize"):
+                    return
+                try:
+                    with metrics.stage("categorize"):
+                        categorized = categorizer.categorize(snapshot.model_copy(deep=True))
+                except DeadlineExceeded:
+                    return  # keep the original layout
+                resume.skills = categorized.skills
+
+            def analyze() -> Optional[Dict[str, Any]]:
+                parsed = parsed_jd.result()
+                if not parsed or not within_budget("analyze"):
+                    return None
+                try:
+                    with metrics.stage("analyze"):
+                        result = analyzer.analyze(snapshot, parsed)
+                except DeadlineExceeded:
+                    return None
+                # A JD skill extraction cut short falls back to generic skills; don't report that
+                return None if deadline is not None and "analyze" in deadline.skipped else result
+
+            parsed_jd = submit(parse_jd)
+            categorized = submit(categorize)
+            analysis = submit(analyze)
+
+            # Items whose expansion has finished and that are waiting for enhancement
+            ready: "queue.Queue[str]" = queue.Queue()
+            labels = (["summary"] if resume.summary else []) \
+                + [f"e{i}" for i in range(len(resume.experience))] \
+                + [f"p{i}" for i in range(len(resume.projects))]
+
+            def expand_then_queue(expand_item: Callable, name: str, label: Optional[str]):
+                try:
+                    if within_budget("expand", f"expand:{name}"):
+                        with metrics.stage("expand"):
+                            expand_item()
+                except DeadlineExceeded:
+                    # Keep the user's own bullets for this item
+                    deadline.skip(f"expand:{name}")
+                except CircuitOpenError:
+                    raise  # surfaces from this task's result: the whole request fails fast
+                except Exception as e:
+                    print(f"⚠️  Expanding {name} failed ({e}); keeping its original bullets")
+                    metrics.registry.inc("resume_degraded_total", what="expand_failed")
+                    failed.append(f"expand:{name}")
+                finally:
+                    # Always release the label so the dispatcher never waits forever
+                    if label is not None:
+                        ready.put(label)
+
+            expansions = []
+            if expand:
+                for i, exp in enumerate(resume.experience):
+                    step = lambda i=i, exp=exp: expander.expand_experience(i, exp)
+                    expansions.append(submit(expand_then_queue, step, f"experience[{i}]", f"e{i}"))
+                for i, proj in enumerate(resume.projects):
+                    step = lambda i=i, proj=proj: expander.expand_project(i, proj, len(resume.projects))
+                    expansions.append(submit(expand_then_queue, step, f"projects[{i}]", f"p{i}"))
+                for s_idx, section in enumerate(resume.custom_sections):
+                    for i, item in enumerate(section.items):
+                        step = lambda s_idx=s_idx, section=section, i=i, item=item: expander.expand_custom(s_idx, section, i, item)
+                        name = f"custom_sections[{s_idx}].items[{i}]"
+                        expansions.append(submit(expand_then_queue, step, name, None))
+                if resume.summary:
+                    ready.put("summary")
+            else:
+                for label in labels:
+                    ready.put(label)
+
+            def enhance(batch: set) -> Dict[str, Any]:
+                if not within_budget("enhance", *(f"enhance:{label}" for label in sorted(batch))):
+                    return {}
+                try:
+                    with metrics.stage("enhance"):
+                        return enhancer.enhance_items(resume, parsed_jd_text, batch)
+                except DeadlineExceeded:
+                    return {}  # these items keep their bullets
+
+            # Enhancement dispatcher: one call per group of items that became ready together
+            enhancements = []
+            parsed_jd_text = parsed_jd.result()
+            if parsed_jd_text:
+                # The enhancer's allowed skills list comes from the categorized skills
+                categorized.result()
+                pending = len(labels)
+                while pending:
+                    batch = {ready.get()}
+                    while True:
+                        try:
+                            batch.add(ready.get_nowait())
+                        except queue.Empty:
+                            break
+                    pending -= len(batch)
+                    enhancements.append(submit(enhance, batch))
+
+            # Assemble once everything has finished
+            for future in expansions:
+                future.result()
+            values: Dict[str, Any] = {}
+            for future in enhancements:
+                values.update(future.result())
+            categorized.result()
+            result_analysis = analysis.result()
+
+        enhancer.apply_values(resume, values)
+
+        # Models repeat themselves despite the prompts: send back only the
+        # near-duplicate bullets, in one call, instead of another full round
+        if expand or parsed_jd_text:
+            flagged = enhancer.duplicate_bullets(resume)
+            if flagged and within_budget("dedup", *(f"dedup:{key}" for key in flagged)):
+                try:
+                    with metrics.stage("dedup"):
+                        enhancer.rewrite_duplicates(resume, flagged, parsed_jd_text)
+                except DeadlineExceeded:
+                    pass  # the duplicates stay
+
+        recomputed: Dict[str, List[str]] = {"categorize": categorizer.recomputed}
+        if resume.job_description:
+            recomputed["jd_parse"] = jd_parser.recomputed
+            recomputed["analyze"] = analyzer.recomputed
+            recomputed["enhance"] = sorted(enhancer.recomputed)
+        if expand:
+            recomputed["expand"] = sorted(expander.recomputed)
+        if enhancer.deduplicated:
+            recomputed["dedup"] = enhancer.deduplicated
+        degraded = deadline.summary() if deadline is not None else None
+        if failed:
+            degraded = dict(degraded or {}, failed=sorted(failed))
+        return PipelineResult(resume, result_analysis, recomputed, degraded)
+
+    def _needs_expansion(self, resume: Resume) -> bool:
+        """Simple heuristic: some experience or project has fewer than 2 bullets."""
+        for exp in resume.experience:
+            if not exp.details or len(exp.details) < 2:
+                return True
+        for proj in resume.projects:
+            if not proj.details or len(proj.details) < 2:
+                return True
+        return False
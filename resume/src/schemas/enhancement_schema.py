@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class BulletPatch(BaseModel):
+    """Replacement text for one bullet, addressed by key (e.g. "e0.1" = experience 0, bullet 1)."""
+    key: str
+    text: str
+
+class EnhancementPatch(BaseModel):
+    """
+    Enhancer output: only what changed. Sections the model did not touch are
+    omitted, so output tokens scale with the number of rewritten bullets.
+    """
+    summary: Optional[str] = None
+    patches: List[BulletPatch] = []
@@ -36,3 +36,15 @@ class ParsedJobDescription(BaseModel):
             parts.append(f"Key Responsibilities:\n" + "\n".join(f"- {r}" for r in self.key_responsibilities))
         
         return "\n\n".join(parts)
+
+
+class JDSkillList(BaseModel):
+    """Flat list of technical skills extracted from a job description."""
+    skills: List[str] = []
+
+
+class JobPosting(BaseModel):
+    """A posting for bulk matching: the parsed form when available, else the raw description."""
+    id: str
+    text: Optional[str] = None
+    parsed: Optional[ParsedJobDescription] = None
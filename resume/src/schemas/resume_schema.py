@@ -37,6 +37,9 @@ class SkillCategory(BaseModel):
     category: str
     skills: List[str]
 
+class SkillCategoryList(BaseModel):
+    categories: List[SkillCategory] = []
+
 class CertificationItem(BaseModel):
     name: str
     issuer: str
@@ -0,0 +1,217 @@
+"""
+JobIndex: rank many job descriptions for one resume without the LLM.
+
+SkillsAnalyzer compares one resume with one JD through an LLM call, which is
+far too slow for job boards that need thousands of postings ranked. JobIndex
+does the expensive part once per set of postings. It tokenizes every posting
+into a sparse BM25-weighted term matrix, and extracts each posting's skills
+into a sparse weighted skill matrix. Parsed postings use their primary and
+secondary skill lists; raw text is scanned against the skill taxonomy.
+Matching a resume then costs two sparse matrix-vector products:
+
+    text_score  = BM25(resume terms, posting), scaled to [0, 1] by the best posting
+    skill_score = weight of the posting's skills the resume has / total skill weight
+    score       = SKILL_WEIGHT * skill_score + (1 - SKILL_WEIGHT) * text_score
+
+The top-k postings come from argpartition, each with its matched and missing
+skills. Built indexes are kept in memory by content id (index_jobs/get_index)
+so a job board registers its postings once and matches many resumes against
+them. numpy and scipy are imported with this module; the server imports it on
+first use.
+"""
+
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+from scipy import sparse
+
+from src.schemas.parsed_jd_schema import JobPosting, ParsedJobDescription
+from src.schemas.resume_schema import Resume
+from src.search.text import (
+    STOPWORDS, TAXONOMY, PhraseTable, extract_skills, listed_skills, resume_text, skill_key, tokenize,
+)
+from src.utils import metrics
+from src.utils.cache import MemoryCache, fingerprint, get_cache, shared
+
+# Share of the score that comes from skill overlap (the rest is BM25 text similarity)
+SKILL_WEIGHT = float(os.getenv("MATCH_SKILL_WEIGHT", "0.6"))
+PRIMARY_WEIGHT = 1.0
+SECONDARY_WEIGHT = 0.5
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Built indexes kept for reuse (they hold numpy/scipy objects, so not in a get_cache cache)
+JOB_INDEX_MAX = int(os.getenv("JOB_INDEX_MAX", "8"))
+JOB_INDEX_TTL_SECONDS = float(os.getenv("JOB_INDEX_TTL_SECONDS", "3600"))
+
+Job = Union[ParsedJobDescription, str]
+
+
+def resume_skills(data: Dict[str, Any], phrases: PhraseTable) -> List[str]:
+    """Skill keys the resume claims: listed skills, project technologies, and skills named in its text."""
+    keys = dict.fromkeys(listed_skills(data))
+    keys.update(dict.fromkeys(extract_skills(resume_text(data), phrases)))
+    return list(keys)
+
+
+class JobIndex:
+    """Precomputed sparse term and skill matrices for a fixed list of postings."""
+
+    def __init__(self, jobs: Sequence[Job], ids: Optional[Sequence[str]] = None):
+        started = time.perf_counter()
+        self.ids = [str(i) for i in ids] if ids is not None else [str(i) for i in range(len(jobs))]
+        if len(self.ids) != len(jobs):
+            raise ValueError("ids and jobs must have the same length")
+
+        # Skill vocabulary: the taxonomy plus every skill a parsed posting names
+        display: Dict[str, str] = {skill_key(name): name for name in TAXONOMY}
+        for job in jobs:
+            if isinstance(job, ParsedJobDescription):
+                for name in job.primary_technical_skills + job.secondary_technical_skills:
+                    display.setdefault(skill_key(name), name)
+        display.pop("", None)
+        self.phrases = PhraseTable(display.values())
+        self.skill_names = list(display.values())
+        self.skill_ids = {key: i for i, key in enumerate(display)}
+
+        term_ids: Dict[str, int] = {}
+        t_rows, t_cols, t_vals = [], [], []
+        s_rows, s_cols, s_vals = [], [], []
+        lengths = np.zeros(len(jobs))
+        for row, job in enumerate(jobs):
+            tokens, weights = self._read(job)
+            counts: Dict[int, int] = {}
+            for token in tokens:
+                if token in STOPWORDS:
+                    continue
+                col = term_ids.setdefault(token, len(term_ids))
+                counts[col] = counts.get(col, 0) + 1
+            lengths[row] = sum(counts.values())
+            t_rows.extend([row] * len(counts))
+            t_cols.extend(counts)
+            t_vals.extend(counts.values())
+            for key, weight in weights.items():
+                s_rows.append(row)
+                s_cols.append(self.skill_ids[key])
+                s_vals.append(weight)
+
+        n_jobs = len(jobs)
+        self.term_ids = term_ids
+        tf = sparse.csr_matrix((np.array(t_vals, dtype=np.float64), (t_rows, t_cols)),
+                               shape=(n_jobs, len(term_ids)))
+        self.terms = self._bm25(tf, lengths)
+        self.skills = sparse.csr_matrix((np.array(s_vals, dtype=np.float64), (s_rows, s_cols)),
+                                        shape=(n_jobs, len(self.skill_ids)))
+        self.skill_mass = np.asarray(self.skills.sum(axis=1)).ravel()
+
+        build_seconds = time.perf_counter() - started
+        metrics.registry.observe("resume_job_index_build_seconds", build_seconds)
+        print(f"🗂️  Indexed {n_jobs} job postings ({len(term_ids)} terms, {len(self.skill_ids)} skills) "
+              f"in {build_seconds * 1000:.0f}ms")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _read(self, job: Job):
+        """(tokens including stopwords, {skill key: weight}) of one posting."""
+        if isinstance(job, ParsedJobDescription):
+            weights: Dict[str, float] = {}
+            for name in job.secondary_technical_skills:
+                weights[skill_key(name)] = SECONDARY_WEIGHT
+            for name in job.primary_technical_skills:
+                weights[skill_key(name)] = PRIMARY_WEIGHT
+            weights.pop("", None)
+            return tokenize(job.to_compact_string(), stopwords=True), weights
+        tokens = tokenize(str(job or ""), stopwords=True)
+        return tokens, {key: PRIMARY_WEIGHT for key in self.phrases.scan(tokens) if key in self.skill_ids}
+
+    @staticmethod
+    def _bm25(tf: "sparse.csr_matrix", lengths: "np.ndarray") -> "sparse.csr_matrix":
+        """Per-(posting, term) BM25 weights, so a query scores with one mat-vec."""
+        n_jobs = tf.shape[0]
+        doc_freq = np.bincount(tf.indices, minlength=tf.shape[1])
+        idf = np.log(1 + (n_jobs - doc_freq + 0.5) / (doc_freq + 0.5))
+        avg_len = lengths.mean() if n_jobs else 0.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avg_len) if avg_len else np.ones(n_jobs)
+        weights = tf.copy()
+        row_norm = np.repeat(norm, np.diff(tf.indptr))
+        weights.data = idf[tf.indices] * tf.data * (BM25_K1 + 1) / (tf.data + row_norm)
+        return weights
+
+    def match(self, resume: Resume, top_k: int = 10) -> List[Dict[str, Any]]:
+        """The top_k postings for `resume`, best first, with matched and missing skills."""
+        started = time.perf_counter()
+        if not self.ids:
+            return []
+        data = resume.model_dump()
+        query = np.zeros(len(self.term_ids))
+        for token in set(tokenize(resume_text(data))):
+            col = self.term_ids.get(token)
+            if col is not None:
+                query[col] = 1.0
+        text_scores = self.terms @ query
+        best = text_scores.max()
+        if best > 0:
+            text_scores = text_scores / best
+
+        has = np.zeros(len(self.skill_ids))
+        for key in resume_skills(data, self.phrases):
+            col = self.skill_ids.get(key)
+            if col is not None:
+                has[col] = 1.0
+        covered = self.skills @ has
+        skill_scores = np.divide(covered, self.skill_mass, out=np.zeros_like(covered), where=self.skill_mass > 0)
+
+        scores = SKILL_WEIGHT * skill_scores + (1 - SKILL_WEIGHT) * text_scores
+        k = max(0, min(top_k, len(scores)))
+        top = np.argpartition(-scores, k - 1)[:k] if k else np.array([], dtype=int)
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        results = []
+        for row in top:
+            start, end = self.skills.indptr[row], self.skills.indptr[row + 1]
+            cols, weights = self.skills.indices[start:end], self.skills.data[start:end]
+            order = np.argsort(-weights, kind="stable")  # primary skills first
+            matched = [self.skill_names[c] for c in cols[order] if has[c]]
+            missing = [self.skill_names[c] for c in cols[order] if not has[c]]
+            results.append({
+                "id": self.ids[row],
+                "score": round(float(scores[row]), 4),
+                "text_score": round(float(text_scores[row]), 4),
+                "skill_score": round(float(skill_scores[row]), 4),
+                "matched_skills": matched,
+                "missing_skills": missing,
+            })
+        metrics.registry.observe("resume_job_match_seconds", time.perf_counter() - started)
+        return results
+
+
+_indexes = MemoryCache("job_index", max_entries=JOB_INDEX_MAX, ttl_seconds=JOB_INDEX_TTL_SECONDS)
+
+
+def index_jobs(postings: Sequence[JobPosting]) -> str:
+    """Build (or reuse) the index of `postings`; returns its id for get_index."""
+    dumped = [p.model_dump(mode="json") for p in postings]
+    index_id = fingerprint("jobs", dumped)
+    if _indexes.get(index_id) is None:
+        jobs: List[Job] = [p.parsed if p.parsed is not None else (p.text or "") for p in postings]
+        _indexes.set(index_id, JobIndex(jobs, ids=[p.id for p in postings]))
+        if shared():
+            # The next /match/jobs may land on another worker; let it rebuild from the postings
+            _shared_postings().set(index_id, dumped)
+    return index_id
+
+
+def get_index(index_id: str) -> Optional[JobIndex]:
+    index = _indexes.get(index_id)
+    if index is None and shared():
+        dumped = _shared_postings().get(index_id)
+        if dumped is not None:
+            index_jobs([JobPosting(**p) for p in dumped])
+            index = _indexes.get(index_id)
+    return index
+
+
+def _shared_postings():
+    return get_cache("job_postings", max_entries=JOB_INDEX_MAX, ttl_seconds=JOB_INDEX_TTL_SECONDS)
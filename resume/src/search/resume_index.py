@@ -0,0 +1,383 @@
+"""
+ResumeIndex: inverted index over saved resumes for skill-based search.
+
+Maps normalized skills and text terms to the resumes that have them, so
+"Kubernetes AND Go, ranked by fit" is answered from posting lists instead of
+reading every file in data/saved_resumes/.
+
+- Skills come from the skill lists and project technologies (weight 1.0) and
+  from skills named in the resume text (weight 0.5).
+- Terms are the tokens of the summary, skills, bullets and item names, with
+  their counts.
+
+Each resume gets an integer doc number. Posting lists are compact
+array('I')/array('f') pairs, sorted because doc numbers only grow. A query
+is answered with numpy: boolean masks for the required skills, then
+idf-weighted scores accumulated per posting list.
+
+Updates are incremental. save_resume/delete_resume call add/remove, which
+tombstones the old doc number; the postings are compacted once half of them
+are dead.
+
+The index is built on first use and snapshotted (pickle) next to the saved
+resumes directory. The next load reuses the snapshot and re-reads only the
+files whose mtime changed.
+
+With several workers, each has its own index. A save or delete appends the
+resume id to a numbered change log in the shared cache (note_change). On
+their next search the other workers re-read just the files logged since
+their position. The worker that made the change is already up to date and
+skips its own entry. If the log has a gap (evicted or expired entries),
+the worker falls back to a full sync.
+"""
+
+import json
+import math
+import os
+import pickle
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.search.text import STOPWORDS, TAXONOMY, PhraseTable, listed_skills, resume_text, skill_key, tokenize
+from src.utils import metrics
+from src.utils.cache import get_cache, shared
+
+# Bump when what gets indexed changes, so old snapshots are rebuilt (2: ambiguous words not scanned)
+SNAPSHOT_VERSION = 2
+LISTED_WEIGHT = 1.0
+MENTIONED_WEIGHT = 0.5
+TF_K1 = 1.2
+# Compact when dead doc numbers outnumber live ones (and there are at least this many)
+COMPACT_MIN_DEAD = 1000
+
+Postings = Tuple[array, array]  # (doc numbers, weights)
+
+
+class ResumeIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._skills: Dict[str, Postings] = {}
+        self._terms: Dict[str, Postings] = {}
+        self._ids: List[Optional[str]] = []              # doc number -> resume id (None once removed)
+        self._meta: List[Optional[Tuple[str, float]]] = []  # doc number -> (name, modified_at)
+        self._docs: Dict[str, int] = {}                  # resume id -> doc number
+        self._alive = bytearray()                        # doc number -> 1 while indexed
+        self._dead = 0
+        self.display: Dict[str, str] = {skill_key(name): name for name in TAXONOMY}
+        self.phrases = PhraseTable(TAXONOMY)
+        self.generation = 0  # position in the shared change log this index reflects (multi-worker)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def modified_at(self, resume_id: str) -> Optional[float]:
+        doc = self._docs.get(resume_id)
+        return self._meta[doc][1] if doc is not None else None
+
+    # ----------------------------------------------------------------- updates
+
+    def add(self, resume_id: str, data: Dict[str, Any], modified_at: float):
+        """Index (or re-index) one saved resume dict."""
+        listed = listed_skills(data)
+        tokens = tokenize(resume_text(data), stopwords=True)
+        skills = {key: LISTED_WEIGHT for key in listed}
+        for key in self.phrases.scan(tokens):
+            skills.setdefault(key, MENTIONED_WEIGHT)
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            if token not in STOPWORDS:
+                counts[token] = counts.get(token, 0) + 1
+        name = (data.get("personal_info") or {}).get("name") or "Untitled"
+
+        with self._lock:
+            self._remove(resume_id)
+            doc = len(self._ids)
+            self._ids.append(resume_id)
+            self._alive.append(1)
+            self._meta.append((name, modified_at))
+            self._docs[resume_id] = doc
+            for key, written in listed.items():
+                self.display.setdefault(key, written)
+            for key, weight in skills.items():
+                self._append(self._skills, key, doc, weight)
+            for token, count in counts.items():
+                self._append(self._terms, token, doc, count)
+
+    def remove(self, resume_id: str):
+        with self._lock:
+            self._remove(resume_id)
+            if self._dead >= COMPACT_MIN_DEAD and self._dead > len(self._docs):
+                self._compact()
+
+    @staticmethod
+    def _append(table: Dict[str, Postings], key: str, doc: int, weight: float):
+        postings = table.get(key)
+        if postings is None:
+            postings = table[key] = (array("I"), array("f"))
+        postings[0].append(doc)
+        postings[1].append(weight)
+
+    def _remove(self, resume_id: str):
+        doc = self._docs.pop(resume_id, None)
+        if doc is not None:
+            self._ids[doc] = None
+            self._alive[doc] = 0
+            self._meta[doc] = None
+            self._dead += 1
+
+    def _compact(self):
+        """Renumber live docs densely and drop dead entries from every posting list."""
+        alive = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+        renumber = np.cumsum(alive) - 1
+        for table in (self._skills, self._terms):
+            for key in list(table):
+                docs = np.array(table[key][0], dtype=np.uint32)
+                keep = alive[docs]
+                if not keep.any():
+                    del table[key]
+                    continue
+                new_docs, new_weights = array("I"), array("f")
+                new_docs.frombytes(renumber[docs[keep]].astype(np.uint32).tobytes())
+                new_weights.frombytes(np.array(table[key][1], dtype=np.float32)[keep].tobytes())
+                table[key] = (new_docs, new_weights)
+        self._ids = [rid for rid in self._ids if rid is not None]
+        self._meta = [meta for meta in self._meta if meta is not None]
+        self._docs = {rid: doc for doc, rid in enumerate(self._ids)}
+        self._alive = bytearray(b"\x01" * len(self._ids))
+        print(f"🧹 Compacted resume index: dropped {self._dead} removed entries")
+        self._dead = 0
+
+    # ------------------------------------------------------------------ search
+
+    def search(self, all_of: Optional[List[str]] = None, any_of: Optional[List[str]] = None,
+               text: str = "", limit: int = 20) -> Dict[str, Any]:
+        """
+        Resumes with every skill in `all_of` and at least one in `any_of`,
+        ranked by idf-weighted skill and `text` term matches. With no skills
+        given, any resume matching a text term is a hit.
+        """
+        started = time.perf_counter()
+        required = [k for k in dict.fromkeys(skill_key(s) for s in all_of or []) if k]
+        optional = [k for k in dict.fromkeys(skill_key(s) for s in any_of or []) if k]
+        words = list(dict.fromkeys(tokenize(text)))
+
+        with self._lock:
+            n_docs = len(self._ids)
+            live = max(1, len(self._docs))
+            mask = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+            scores = np.zeros(n_docs)
+            has = {}  # skill key -> sorted doc numbers, for matched_skills
+
+            for key in required + [k for k in optional if k not in required]:
+                postings = self._skills.get(key)
+                docs = np.array(postings[0], dtype=np.intp) if postings else np.zeros(0, dtype=np.intp)
+                has[key] = docs
+                if postings:
+                    idf = math.log(1 + live / len(docs))
+                    scores[docs] += np.array(postings[1], dtype=np.float64) * idf
+            for key in required:
+                hit = np.zeros(n_docs, dtype=bool)
+                hit[has[key]] = True
+                mask &= hit
+            if optional:
+                hit = np.zeros(n_docs, dtype=bool)
+                for key in optional:
+                    hit[has[key]] = True
+                mask &= hit
+
+            text_hit = np.zeros(n_docs, dtype=bool)
+            for word in words:
+                postings = self._terms.get(word)
+                if not postings:
+                    continue
+                docs = np.array(postings[0], dtype=np.intp)
+                tf = np.array(postings[1], dtype=np.float64)
+                scores[docs] += math.log(1 + live / len(docs)) * tf * (TF_K1 + 1) / (tf + TF_K1)
+                text_hit[docs] = True
+            if not required and not optional:
+                mask &= text_hit  # a ranked text-only query: at least one term must match
+
+            hits = np.flatnonzero(mask) if (required or optional or words) else np.zeros(0, dtype=np.intp)
+            if limit < len(hits):
+                hits = hits[np.argpartition(-scores[hits], limit - 1)[:limit]]
+            hits = hits[np.argsort(-scores[hits], kind="stable")]
+
+            results = []
+            for doc in hits:
+                name, modified_at = self._meta[doc]
+                matched = [self.display.get(key, key) for key, docs in has.items()
+                           if len(docs) and docs[min(np.searchsorted(docs, doc), len(docs) - 1)] == doc]
+                results.append({
+                    "id": self._ids[doc],
+                    "name": name,
+                    "modified_at": modified_at,
+                    "score": round(float(scores[doc]), 4),
+                    "matched_skills": matched,
+                })
+            total = int(mask.sum()) if (required or optional or words) else 0
+
+        took = time.perf_counter() - started
+        metrics.registry.observe("resume_search_seconds", took)
+        return {"total": total, "took_ms": round(took * 1000, 2), "results": results}
+
+    # ------------------------------------------------------------- persistence
+
+    def sync(self, root: str) -> int:
+        """Re-read files in `root` that are new or changed, and drop removed ones. Returns the number of changes."""
+        on_disk: Dict[str, str] = {}
+        if os.path.isdir(root):
+            for filename in os.listdir(root):
+                if filename.endswith(".json"):
+                    on_disk[filename[:-len(".json")]] = os.path.join(root, filename)
+        changes = 0
+        for resume_id in [rid for rid in self._docs if rid not in on_disk]:
+            self.remove(resume_id)
+            changes += 1
+        for resume_id, path in on_disk.items():
+            changes += self.sync_one(resume_id, path)
+        return changes
+
+    def sync_one(self, resume_id: str, path: str) -> int:
+        """Re-read one resume file if it changed, or drop it if it is gone. Returns 1 if the index changed."""
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            if resume_id not in self._docs:
+                return 0
+            self.remove(resume_id)
+            return 1
+        except OSError as e:
+            print(f"⚠️  Could not index {path}: {e}")
+            return 0
+        if self.modified_at(resume_id) == mtime:
+            return 0
+        try:
+            with open(path, "r") as f:
+                self.add(resume_id, json.load(f), mtime)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not index {path}: {e}")
+            return 0
+        return 1
+
+    def save(self, path: str):
+        with self._lock:
+            state = {"version": SNAPSHOT_VERSION, "skills": self._skills, "terms": self._terms, "ids": self._ids,
+                     "alive": self._alive, "meta": self._meta, "dead": self._dead, "display": self.display}
+            tmp_path = f"{path}.{os.getpid()}.tmp"  # workers may snapshot at the same time
+            with open(tmp_path, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "ResumeIndex":
+        """The snapshot at `path`, or an empty index if it is missing or unreadable."""
+        index = cls()
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+            if state.get("version") != SNAPSHOT_VERSION:
+                return index
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"⚠️  Ignoring unreadable resume index snapshot {path}: {e}")
+            return index
+        index._skills, index._terms = state["skills"], state["terms"]
+        index._ids, index._alive, index._meta, index._dead = state["ids"], state["alive"], state["meta"], state["dead"]
+        index._docs = {rid: doc for doc, rid in enumerate(index._ids) if rid is not None}
+        index.display.update(state["display"])
+        return index
+
+
+_indexes: Dict[str, ResumeIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def snapshot_path(root: str) -> str:
+    return os.getenv("RESUME_INDEX_SNAPSHOT") or f"{os.path.normpath(root)}.index.pickle"
+
+
+def get_index(root: str) -> ResumeIndex:
+    """
+    The index of `root`, loaded from its snapshot and synced with the files
+    on first use, and caught up with other workers' changes to `root`.
+    """
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is not None and shared():
+            _catch_up(index, root)
+        if index is None:
+            started = time.perf_counter()
+            path = snapshot_path(root)
+            index = ResumeIndex.load(path)
+            # Read the log position first: changes logged during the sync are replayed next time
+            index.generation = _latest(root) if shared() else 0
+            changes = index.sync(root)
+            if changes:
+                index.save(path)
+            _indexes[root] = index
+            print(f"🔎 Resume index ready: {len(index)} resumes ({changes} re-read) "
+                  f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return index
+
+
+def note_change(root: str, resume_id: str):
+    """
+    Log that `resume_id` in `root` was saved or deleted, so the other workers'
+    indexes re-read it. Call before applying the change to this worker's index.
+    """
+    if not shared():
+        return
+    changes = _changes()
+    seq = _latest(root) + 1
+    while not changes.add(f"{root}|{seq}", resume_id):
+        if changes.get(f"{root}|{seq}") is None:
+            return  # the shared store is failing; other workers pick the change up on their next full sync
+        seq += 1  # taken by another worker's change
+    if seq > _latest(root):
+        changes.set(f"{root}|latest", seq)
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is not None and index.generation == seq - 1:
+            index.generation = seq  # nothing else happened in between: our own change needs no re-read
+
+
+def _catch_up(index: ResumeIndex, root: str):
+    """Re-read the resumes logged after `index.generation`, or everything if the log has a gap."""
+    changes = _changes()
+    latest = _latest(root)
+    if latest == index.generation:
+        return
+    logged: List[str] = []
+    seq = index.generation + 1
+    while True:
+        resume_id = changes.get(f"{root}|{seq}")
+        if resume_id is None:
+            break
+        logged.append(resume_id)
+        seq += 1
+    reached = seq - 1
+    if reached < latest or latest < index.generation:
+        # Entries were evicted or expired (or the log restarted): the log can't say what changed
+        index.sync(root)
+        index.generation = latest
+    else:
+        for resume_id in dict.fromkeys(logged):
+            index.sync_one(resume_id, os.path.join(root, f"{resume_id}.json"))
+        index.generation = reached
+
+
+def _latest(root: str) -> int:
+    return _changes().get(f"{root}|latest") or 0
+
+
+def _changes():
+    return get_cache("resume_index_changes", max_entries=4096)
+
+
+def loaded_index(root: str) -> Optional[ResumeIndex]:
+    """The index of `root` if it has been loaded; saves before that are picked up by the first sync."""
+    return _indexes.get(root)
@@ -0,0 +1,154 @@
+"""
+Text: tokenization and skill normalization shared by the search modules.
+
+Skills are compared by a normalized key: lowercase tokens joined by spaces,
+with common aliases folded to one name ("golang" -> "go", "k8s" ->
+"kubernetes", "postgres" -> "postgresql"). Tokens keep the punctuation that
+is part of technology names (c++, c#, node.js).
+
+Resumes are read as plain dicts (Resume.model_dump() or a saved resume
+file), since saved drafts do not always validate as a Resume.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could did do does
+during each few for from had has have having he her here his how i if in into is it its just more
+most must no nor not of on once only or other our out over own same she should so some such than
+that the their them then there these they this those through to too under until up very was we
+were what when where which while who whom why will with would you your
+""".split())
+
+# Common skills, so raw job text can be scanned for them without an LLM parse
+TAXONOMY = [
+    "Python", "Java", "JavaScript", "TypeScript", "Go", "Rust", "C", "C++", "C#", "Ruby", "PHP",
+    "Kotlin", "Swift", "Scala", "R", "SQL", "Bash", "HTML", "CSS",
+    "React", "Angular", "Vue", "Next.js", "Node.js", "Express", "Django", "Flask", "FastAPI",
+    "Spring", "Rails", ".NET", "GraphQL", "REST", "gRPC",
+    "PostgreSQL", "MySQL", "MongoDB", "Redis", "Elasticsearch", "Cassandra", "DynamoDB", "SQLite",
+    "Kafka", "RabbitMQ", "Spark", "Hadoop", "Airflow", "Snowflake", "dbt",
+    "AWS", "GCP", "Azure", "Docker", "Kubernetes", "Terraform", "Ansible", "Jenkins", "CI/CD",
+    "Git", "Linux", "Nginx", "Prometheus", "Grafana",
+    "Machine Learning", "Deep Learning", "NLP", "Computer Vision", "TensorFlow", "PyTorch",
+    "scikit-learn", "Pandas", "NumPy", "LLM",
+    "Microservices", "Distributed Systems", "System Design", "Agile", "Scrum",
+    "Communication", "Leadership", "Mentoring",
+]
+
+# alias key -> canonical key (both normalized)
+ALIASES: Dict[str, str] = {
+    "golang": "go", "k8s": "kubernetes", "postgres": "postgresql", "psql": "postgresql",
+    "js": "javascript", "ts": "typescript", "node": "node.js", "nodejs": "node.js",
+    "reactjs": "react", "react.js": "react", "vue.js": "vue", "vuejs": "vue", "nextjs": "next.js",
+    "py": "python", "python3": "python", "mongo": "mongodb", "elastic": "elasticsearch",
+    "amazon web services": "aws", "google cloud": "gcp", "google cloud platform": "gcp",
+    "microsoft azure": "azure", "sklearn": "scikit-learn", "scikit learn": "scikit-learn",
+    "ml": "machine learning", "dl": "deep learning", "natural language processing": "nlp",
+    "cv": "computer vision", "large language models": "llm", "llms": "llm",
+    "ci cd": "ci/cd", "cicd": "ci/cd", "continuous integration": "ci/cd",
+    "restful": "rest", "rest api": "rest", "rest apis": "rest", "restful apis": "rest",
+    "micro services": "microservices", "dotnet": ".net", "ruby on rails": "rails",
+    "tf": "terraform", "gh actions": "github actions",
+    "spring boot": "spring", "expressjs": "express", "express.js": "express",
+}
+
+# Phrases that are skills only in a skill list: in running text they are mostly ordinary words
+# or other abbreviations ("go to market", "R&D", "C-level", "send your CV", "REST of the team").
+# PhraseTable never matches them; skill_key still folds them, so listed skills match exactly.
+AMBIGUOUS = frozenset({
+    "cv", "ml", "dl", "tf", "ts", "js", "py",
+    "go", "r", "c", "spring", "express", "rest",
+})
+
+
+def tokenize(text: Optional[str], stopwords: bool = False) -> List[str]:
+    """Lowercase tokens of `text`; stopwords are dropped unless asked for."""
+    tokens = TOKEN.findall((text or "").lower())
+    return tokens if stopwords else [t for t in tokens if t not in STOPWORDS]
+
+
+def skill_key(name: Optional[str]) -> str:
+    """Normalized comparison key of a skill name ("" if it has no tokens)."""
+    text = (name or "").lower()
+    if text.strip() in (".net", "ci/cd"):
+        return text.strip()
+    key = " ".join(TOKEN.findall(text))
+    return ALIASES.get(key, key)
+
+
+class PhraseTable:
+    """
+    Skill phrases for scanning text: every name, its key, and every alias, mapped
+    to the skill key. AMBIGUOUS phrases are left out; their skills are still found
+    through unambiguous phrases ("golang", "rest api", "spring boot").
+    """
+
+    def __init__(self, names: Iterable[str]):
+        table = {skill_key(name): skill_key(name) for name in names}
+        table.update(ALIASES)
+        self.keys = {phrase: key for phrase, key in table.items() if phrase and phrase not in AMBIGUOUS}
+        # first token -> longest phrase starting with it, so most tokens cost one lookup
+        self.starts: Dict[str, int] = {}
+        for phrase in self.keys:
+            first, n = phrase.split(" ")[0], phrase.count(" ") + 1
+            self.starts[first] = max(self.starts.get(first, 0), n)
+
+    def scan(self, tokens: List[str]) -> List[str]:
+        """Skill keys in `tokens` (longest phrase first, in order of appearance, unique)."""
+        found: Dict[str, None] = {}
+        keys, starts = self.keys, self.starts
+        i, end = 0, len(tokens)
+        while i < end:
+            longest = starts.get(tokens[i])
+            if longest is None:
+                i += 1
+                continue
+            for n in range(min(longest, end - i), 0, -1):
+                key = keys.get(" ".join(tokens[i:i + n]))
+                if key is not None:
+                    found[key] = None
+                    i += n
+                    break
+            else:
+                i += 1
+        return list(found)
+
+
+def extract_skills(text: Optional[str], phrases: PhraseTable) -> List[str]:
+    """Skill keys mentioned in `text`."""
+    return phrases.scan(tokenize(text, stopwords=True))
+
+
+def resume_text(data: Dict[str, Any]) -> str:
+    """Everything in a resume dict that says what the candidate has done or knows."""
+    parts: List[str] = [data.get("summary") or ""]
+    for category in data.get("skills") or []:
+        parts.extend(category.get("skills") or [])
+    for section in ("experience", "education", "projects", "certifications"):
+        for item in data.get(section) or []:
+            if section in ("projects", "certifications"):
+                parts.append(item.get("name") or "")
+            parts.extend(item.get("technologies") or [])
+            parts.extend(item.get("details") or [])
+    for section in data.get("custom_sections") or []:
+        for item in section.get("items") or []:
+            parts.append(item.get("name") or "")
+            parts.extend(item.get("details") or [])
+    return "\n".join(str(p) for p in parts if p)
+
+
+def listed_skills(data: Dict[str, Any]) -> Dict[str, str]:
+    """{skill key: name as written} for the resume's skill lists and project technologies."""
+    names: Dict[str, str] = {}
+    for category in data.get("skills") or []:
+        for name in category.get("skills") or []:
+            names.setdefault(skill_key(name), name)
+    for project in data.get("projects") or []:
+        for name in project.get("technologies") or []:
+            names.setdefault(skill_key(name), name)
+    names.pop("", None)
+    return names
@@ -0,0 +1,248 @@
+"""
+Cache: bounded caches for agent outputs.
+
+Values must be JSON-serializable (dicts, lists, strings) so cached agent
+outputs stay independent of the Pydantic objects they were built from.
+Lookups are counted per cache name in the metrics registry (hit rate).
+
+Two backends, picked by CACHE_BACKEND:
+- "memory": an LRU dict per process (the default for a single worker).
+- "sqlite": one SQLite database in WAL mode (CACHE_DB_PATH) shared by every
+  process on the host. This is the default when uvicorn runs several
+  workers (WEB_CONCURRENCY > 1), so each worker sees the others' results
+  and the hit rate is not split N ways.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Union
+
+from pydantic import BaseModel
+
+from src.utils import metrics
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable content hash of the given parts (Pydantic models are hashed by their JSON form)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, BaseModel):
+            part = part.model_dump(mode="json")
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()[:32]
+
+
+class MemoryCache:
+    """Thread-safe LRU cache with a per-entry TTL."""
+
+    def __init__(self, name: str, max_entries: int = 10_000, ttl_seconds: float = 24 * 3600):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] < now:
+                del self._data[key]
+                entry = None
+            if entry is not None:
+                self._data.move_to_end(key)
+        metrics.record_cache(self.name, entry is not None)
+        return entry[1] if entry is not None else None
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        expires = time.monotonic() + (ttl_seconds if ttl_seconds is not None else self.ttl_seconds)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def add(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> bool:
+        """Set `key` only if it has no live entry. Returns True if it was set."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] >= now:
+                return False
+            self._data[key] = (now + (ttl_seconds if ttl_seconds is not None else self.ttl_seconds), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class SQLiteCache:
+    """
+    MemoryCache's interface over a table in a SQLite database shared by
+    every process on the host. WAL mode lets readers run alongside the one
+    writer. Expiry uses wall-clock time, since monotonic clocks differ
+    between processes. Every EVICT_EVERY sets, expired rows are dropped and
+    the oldest rows are trimmed back to `max_entries`. A database error is
+    logged and treated as a miss, so the cache never fails a request.
+    """
+
+    EVICT_EVERY = 100
+
+    def __init__(self, name: str, path: str, max_entries: int = 10_000, ttl_seconds: float = 24 * 3600):
+        self.name = name
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()  # one connection per thread
+        self._sets = 0
+        self._warned = False
+        self._conn()  # create the schema now, so a bad path shows up at start-up
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # Superseded by cache_entries, which also records when each entry was written
+            conn.execute("DROP TABLE IF EXISTS entries")
+            conn.execute("CREATE TABLE IF NOT EXISTS cache_entries (cache TEXT NOT NULL, key TEXT NOT NULL, "
+                         "value TEXT NOT NULL, expires REAL NOT NULL, created REAL NOT NULL, "
+                         "PRIMARY KEY (cache, key)) WITHOUT ROWID")
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_entries_expires ON cache_entries (cache, expires)")
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_entries_created ON cache_entries (cache, created)")
+            self._local.conn = conn
+        return conn
+
+    def _failed(self, e: sqlite3.Error):
+        metrics.registry.inc("resume_cache_errors_total", cache=self.name)
+        if not self._warned:
+            self._warned = True
+            print(f"⚠️  Shared cache '{self.name}' at {self.path} failed ({e}); continuing without it")
+
+    def get(self, key: str) -> Optional[Any]:
+        if self.max_entries <= 0:
+            metrics.record_cache(self.name, False)
+            return None
+        try:
+            row = self._conn().execute("SELECT value FROM cache_entries WHERE cache = ? AND key = ? AND expires >= ?",
+                                       (self.name, key, time.time())).fetchone()
+        except sqlite3.Error as e:
+            self._failed(e)
+            row = None
+        metrics.record_cache(self.name, row is not None)
+        return json.loads(row[0]) if row is not None else None
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        self._write(key, value, ttl_seconds, replace=True)
+
+    def add(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> bool:
+        """Set `key` only if it has no live entry, atomically across processes. Returns True if it was set."""
+        return self._write(key, value, ttl_seconds, replace=False)
+
+    def _write(self, key: str, value: Any, ttl_seconds: Optional[float], replace: bool) -> bool:
+        if self.max_entries <= 0:
+            return False
+        now = time.time()
+        expires = now + (ttl_seconds if ttl_seconds is not None else self.ttl_seconds)
+        condition = "" if replace else " WHERE cache_entries.expires < ?"
+        params = (self.name, key, json.dumps(value), expires, now) + (() if replace else (now,))
+        try:
+            cursor = self._conn().execute(
+                "INSERT INTO cache_entries (cache, key, value, expires, created) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (cache, key) DO UPDATE SET value = excluded.value, expires = excluded.expires, "
+                f"created = excluded.created{condition}", params)
+            written = cursor.rowcount == 1
+            self._sets += 1
+            if self._sets % self.EVICT_EVERY == 0:
+                self._evict(now)
+        except sqlite3.Error as e:
+            self._failed(e)
+            return False
+        return written
+
+    def _evict(self, now: float):
+        conn = self._conn()
+        conn.execute("DELETE FROM cache_entries WHERE cache = ? AND expires < ?", (self.name, now))
+        # Trim by write time, not expiry: one cache can mix TTLs (short idempotency claims among day-long results)
+        conn.execute("DELETE FROM cache_entries WHERE cache = ? AND key IN (SELECT key FROM cache_entries "
+                     "WHERE cache = ? ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                     (self.name, self.name, self.max_entries))
+
+    def delete(self, key: str):
+        try:
+            self._conn().execute("DELETE FROM cache_entries WHERE cache = ? AND key = ?", (self.name, key))
+        except sqlite3.Error as e:
+            self._failed(e)
+
+    def clear(self):
+        try:
+            self._conn().execute("DELETE FROM cache_entries WHERE cache = ?", (self.name,))
+        except sqlite3.Error as e:
+            self._failed(e)
+
+    def __len__(self) -> int:
+        try:
+            row = self._conn().execute("SELECT COUNT(*) FROM cache_entries WHERE cache = ? AND expires >= ?",
+                                       (self.name, time.time())).fetchone()
+        except sqlite3.Error as e:
+            self._failed(e)
+            return 0
+        return row[0]
+
+
+Cache = Union[MemoryCache, SQLiteCache]
+
+_caches: Dict[str, Cache] = {}
+_caches_lock = threading.Lock()
+
+
+def cache_backend() -> str:
+    """CACHE_BACKEND, else "sqlite" when uvicorn runs several workers (WEB_CONCURRENCY), else "memory"."""
+    backend = os.getenv("CACHE_BACKEND")
+    if backend:
+        return backend
+    return "sqlite" if int(os.getenv("WEB_CONCURRENCY", "1")) > 1 else "memory"
+
+
+def shared() -> bool:
+    """Whether get_cache caches are seen by every worker process."""
+    return cache_backend() == "sqlite"
+
+
+def get_cache(name: str, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None) -> Cache:
+    """Named cache, created on first use (size from CACHE_MAX_ENTRIES, backend from cache_backend())."""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            max_entries = max_entries or int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+            ttl_seconds = ttl_seconds or float(os.getenv("CACHE_TTL_SECONDS", str(24 * 3600)))
+            backend = cache_backend()
+            if backend == "sqlite":
+                path = os.getenv("CACHE_DB_PATH", os.path.join(tempfile.gettempdir(), "resume-cache.sqlite3"))
+                cache = SQLiteCache(name, path, max_entries=max_entries, ttl_seconds=ttl_seconds)
+            elif backend == "memory":
+                cache = MemoryCache(name, max_entries=max_entries, ttl_seconds=ttl_seconds)
+            else:
+                raise ValueError(f"Unknown CACHE_BACKEND '{backend}' (expected memory or sqlite)")
+            _caches[name] = cache
+        return cache
@@ -0,0 +1,158 @@
+"""
+CircuitBreaker: fail fast when a dependency (Groq, GCS, Supabase) is down.
+
+Each dependency has one process-wide breaker:
+- closed:    calls go through; consecutive failures are counted
+- open:      after `failure_threshold` consecutive failures, calls fail
+             immediately with CircuitOpenError for `recovery_seconds`
+- half_open: after the recovery time a limited number of probe calls are let
+             through; a success closes the circuit, a failure re-opens it
+
+Callers decide what counts as a failure (a 429 means the provider is up, a
+timeout or 5xx means it is not). State is exported as the
+`resume_circuit_state` gauge (0 closed, 1 half open, 2 open) and by /health.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple, Type
+
+from src.utils import metrics
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+    def __init__(self, dependency: str, retry_in: float):
+        super().__init__(f"{dependency} circuit is open; retry in {retry_in:.1f}s")
+        self.dependency = dependency
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_seconds: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+        metrics.registry.set_gauge("resume_circuit_state", _STATE_VALUES[CLOSED], dependency=name)
+
+    def _transition(self, state: str):
+        # Called with the lock held
+        if state == self.state:
+            return
+        self.state = state
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+        self._half_open_calls = 0
+        metrics.registry.set_gauge("resume_circuit_state", _STATE_VALUES[state], dependency=self.name)
+        metrics.registry.inc("resume_circuit_transitions_total", dependency=self.name, state=state)
+        print(f"🔌 Circuit '{self.name}' is now {state}")
+
+    def retry_in(self) -> float:
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.opened_at + self.recovery_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        """True if a call may go out now (takes a probe slot when half open)."""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.recovery_seconds:
+                    return False
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    return False
+                self._half_open_calls += 1
+            return True
+
+    def check(self):
+        """Raise CircuitOpenError unless a call may go out now."""
+        if not self.allow():
+            metrics.registry.inc("resume_circuit_rejected_total", dependency=self.name)
+            raise CircuitOpenError(self.name, self.retry_in())
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._transition(CLOSED)
+
+    def release(self):
+        """The call's outcome says nothing about the dependency; give back its half-open probe slot."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._half_open_calls = max(0, self._half_open_calls - 1)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self._transition(OPEN)
+
+    @contextmanager
+    def guard(self, failures: Tuple[Type[BaseException], ...] = (Exception,)):
+        """
+        Run a block against the dependency: fail fast if the circuit is open,
+        otherwise record the outcome. Only exceptions in `failures` count.
+        """
+        self.check()
+        try:
+            yield
+        except failures:
+            self.record_failure()
+            raise
+        except BaseException:
+            # Not the dependency's fault (e.g. bad input)
+            self.release()
+            raise
+        else:
+            self.record_success()
+
+    def snapshot(self) -> Dict[str, Any]:
+        retry_in = self.retry_in()
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "retry_in_s": round(retry_in, 1),
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, failure_threshold: Optional[int] = None,
+                recovery_seconds: Optional[float] = None) -> CircuitBreaker:
+    """Process-wide breaker for a dependency (defaults from CIRCUIT_FAILURE_THRESHOLD / CIRCUIT_RECOVERY_SECONDS)."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=failure_threshold or int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+                recovery_seconds=recovery_seconds or float(os.getenv("CIRCUIT_RECOVERY_SECONDS", "30")),
+            )
+        return breaker
+
+
+def all_breakers() -> Dict[str, Dict[str, Any]]:
+    """State of every breaker, for /health."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.snapshot() for b in breakers}
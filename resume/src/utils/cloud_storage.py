@@ -1,18 +1,67 @@
 import os
 import json
 import datetime
-import google.auth
-from google.auth.transport import requests
-from google.cloud import storage
-from google.api_core.exceptions import GoogleAPIError
-from google.auth import identity_pool
-from supabase import create_client, Client
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Optional
+from src.utils import metrics
+from src.utils.circuit_breaker import get_breaker, CircuitOpenError
+
+# google-cloud-storage, google-auth and supabase take ~350ms to import, so they are
+# imported inside the functions that use them rather than at service start-up.
+if TYPE_CHECKING:
+    from supabase import Client
 
 # Configuration from environment variables
 BUCKET_NAME = os.getenv("GCS_BUCKET_NAME", "user-resumes-storage-01")
 PROJECT_ID = os.getenv("GOOGLE_CLOUD_PROJECT", "project-353fe44f-aa79-48fc-91d")
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+# Upper bound on a single GCS request (the SDK default retries for minutes)
+GCS_TIMEOUT_S = float(os.getenv("GCS_TIMEOUT_S", "30"))
+
+# While a circuit is open, uploads and syncs are queued here (bounded, oldest dropped)
+# and replayed after the next successful call to that dependency, a batch at a time so
+# one request's background task is not stuck replaying the whole backlog.
+_deferred = deque(maxlen=int(os.getenv("DEFERRED_UPLOADS_MAX", "500")))
+DEFERRED_FLUSH_BATCH = int(os.getenv("DEFERRED_FLUSH_BATCH", "10"))
+_deferred_lock = threading.Lock()
+
+
+def _defer(kind: str, *args):
+    with _deferred_lock:
+        _deferred.append((kind, args))
+        size = len(_deferred)
+    metrics.registry.set_gauge("resume_deferred_uploads", size)
+    print(f"📥 Deferred {kind} ({size} queued) until the dependency recovers")
+
+
+def flush_deferred(batch: int = DEFERRED_FLUSH_BATCH):
+    """
+    Replay up to `batch` of the oldest queued uploads/syncs; the rest wait for the
+    next successful call. Anything that hits an open circuit again is re-queued.
+    """
+    with _deferred_lock:
+        pending = [_deferred.popleft() for _ in range(min(batch, len(_deferred)))]
+        size = len(_deferred)
+    metrics.registry.set_gauge("resume_deferred_uploads", size)
+    for kind, args in pending:
+        try:
+            if kind == "upload":
+                upload_resume_to_gcs(*args, flush=False)
+            else:
+                sync_resume_gcs_path(*args, flush=False)
+        except Exception as e:
+            print(f"⚠️  Deferred {kind} failed: {e}")
+
+
+def deferred_count() -> int:
+    with _deferred_lock:
+        return len(_deferred)
+
+gcs_breaker = get_breaker("gcs")
+supabase_breaker = get_breaker("supabase")
+
 
 def get_gcs_credentials():
     """
@@ -21,6 +70,8 @@ def get_gcs_credentials():
     - Workload Identity Federation (Railway) via GOOGLE_APPLICATION_CREDENTIALS_JSON
     - Local ADC via 'gcloud auth application-default login'
     """
+    import google.auth
+    from google.auth import identity_pool
     # Check for Workload Identity Federation credentials (Railway)
     creds_json_str = os.getenv("GOOGLE_APPLICATION_CREDENTIALS_JSON")
     if creds_json_str:
@@ -170,33 +221,45 @@ def get_gcs_credentials():
     print("✅ Using Application Default Credentials (ADC)")
     return credentials
 
-def get_supabase_client() -> Client:
+def get_supabase_client() -> "Client":
     """Returns a Supabase client."""
+    from supabase import create_client
     if not SUPABASE_URL or not SUPABASE_KEY:
         raise ValueError("SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY environment variables are not set.")
     return create_client(SUPABASE_URL, SUPABASE_KEY)
 
 
-def upload_resume_to_gcs(user_id: str, resume_id: str, pdf_content: bytes) -> str:
+def upload_resume_to_gcs(user_id: str, resume_id: str, pdf_content: bytes, flush: bool = True) -> Optional[str]:
     """
     Uploads the PDF to GCS using Keyless Authentication (ADC).
+    If the GCS circuit is open the upload is queued instead and None is returned.
     """
+    from google.cloud import storage
+    from google.api_core.exceptions import GoogleAPIError
+    destination_blob_name = f"resumes/{user_id}/{resume_id}.pdf"
     try:
-        # Initialize client with credentials from environment or ADC
-        credentials = get_gcs_credentials()
-        client = storage.Client(project=PROJECT_ID, credentials=credentials)
-        bucket = client.bucket(BUCKET_NAME)
-        
-        destination_blob_name = f"resumes/{user_id}/{resume_id}.pdf"
-        blob = bucket.blob(destination_blob_name)
+        # Credential loading is inside the breaker: its ADC fallback is what hangs when GCS auth is broken
+        with gcs_breaker.guard():
+            # Initialize client with credentials from environment or ADC
+            credentials = get_gcs_credentials()
+            client = storage.Client(project=PROJECT_ID, credentials=credentials)
+            bucket = client.bucket(BUCKET_NAME)
+            blob = bucket.blob(destination_blob_name)
 
-        # Upload the PDF content
-        blob.upload_from_string(pdf_content, content_type='application/pdf')
+            # Upload the PDF content
+            with metrics.stage("gcs_upload"):
+                blob.upload_from_string(pdf_content, content_type='application/pdf', timeout=GCS_TIMEOUT_S)
 
         # Sync to Supabase
-        sync_resume_gcs_path(user_id, resume_id, destination_blob_name)
+        with metrics.stage("supabase_sync"):
+            sync_resume_gcs_path(user_id, resume_id, destination_blob_name, flush=False)
 
+        if flush:
+            flush_deferred()
         return destination_blob_name
+    except CircuitOpenError:
+        _defer("upload", user_id, resume_id, pdf_content)
+        return None
     except GoogleAPIError as e:
         print(f"GCS Error during upload: {e}")
         raise e
@@ -204,18 +267,24 @@ def upload_resume_to_gcs(user_id: str, resume_id: str, pdf_content: bytes) -> st
         print(f"Unexpected Error during upload: {e}")
         raise e
 
-def sync_resume_gcs_path(user_id: str, resume_id: str, gcs_path: str):
+def sync_resume_gcs_path(user_id: str, resume_id: str, gcs_path: str, flush: bool = True):
     """
     Updates the gcs_path column in the Supabase resumes table.
+    If the Supabase circuit is open the update is queued instead.
     """
     try:
-        supabase = get_supabase_client()
-        supabase.table("resumes") \
-            .update({"gcs_path": gcs_path}) \
-            .eq("id", resume_id) \
-            .eq("user_id", user_id) \
-            .execute()
+        with supabase_breaker.guard():
+            supabase = get_supabase_client()
+            supabase.table("resumes") \
+                .update({"gcs_path": gcs_path}) \
+                .eq("id", resume_id) \
+                .eq("user_id", user_id) \
+                .execute()
         print(f"Successfully synced GCS path to Supabase for resume {resume_id}")
+        if flush:
+            flush_deferred()
+    except CircuitOpenError:
+        _defer("sync", user_id, resume_id, gcs_path)
     except Exception as e:
         print(f"Supabase Sync Error: {e}")
         raise e
@@ -224,33 +293,37 @@ def get_signed_url(user_id: str, resume_id: str) -> str:
     """
     Generates a V4 Signed URL using Service Account Impersonation.
     Works with ADC (gcloud auth application-default login) without requiring a JSON key file.
+    Fails fast with CircuitOpenError while the GCS circuit is open.
     """
+    from google.cloud import storage
+    # Get service account email from environment
+    service_account_email = os.getenv("GCS_SERVICE_ACCOUNT_EMAIL")
+    if not service_account_email:
+        raise ValueError("GCS_SERVICE_ACCOUNT_EMAIL environment variable is required for signed URLs")
     try:
-        # Get credentials from environment or ADC
-        credentials = get_gcs_credentials()
-        
-        # Get service account email from environment
-        service_account_email = os.getenv("GCS_SERVICE_ACCOUNT_EMAIL")
-        if not service_account_email:
-            raise ValueError("GCS_SERVICE_ACCOUNT_EMAIL environment variable is required for signed URLs")
-        
-        # Initialize storage client
-        client = storage.Client(project=PROJECT_ID, credentials=credentials)
-        bucket = client.bucket(BUCKET_NAME)
-        blob_path = f"resumes/{user_id}/{resume_id}.pdf"
-        blob = bucket.blob(blob_path)
+        with gcs_breaker.guard():
+            # Get credentials from environment or ADC
+            credentials = get_gcs_credentials()
+            
+            # Initialize storage client
+            client = storage.Client(project=PROJECT_ID, credentials=credentials)
+            bucket = client.bucket(BUCKET_NAME)
+            blob_path = f"resumes/{user_id}/{resume_id}.pdf"
+            blob = bucket.blob(blob_path)
 
-        # Generate Signed URL using IAM signBlob API (Service Account Impersonation)
-        # This works with ADC without needing a JSON key file
-        url = blob.generate_signed_url(
-            version="v4",
-            expiration=datetime.timedelta(minutes=15),
-            method="GET",
-            service_account_email=service_account_email,
-            response_disposition=f"attachment; filename=resume_{resume_id}.pdf"
-        )
+            # Generate Signed URL using IAM signBlob API (Service Account Impersonation)
+            # This works with ADC without needing a JSON key file
+            url = blob.generate_signed_url(
+                version="v4",
+                expiration=datetime.timedelta(minutes=15),
+                method="GET",
+                service_account_email=service_account_email,
+                response_disposition=f"attachment; filename=resume_{resume_id}.pdf"
+            )
 
         return url
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error generating signed URL: {e}")
         if "IAM Service Account Credentials API" in str(e):
@@ -0,0 +1,88 @@
+"""
+Deadline: end-to-end latency budget for a request.
+
+A Deadline is opened per request (X-Latency-Budget-Ms header or
+PROCESS_BUDGET_MS) and carried in a contextvar, so every stage and LLM call
+of the request sees the same clock. Optional stages ask `allows(stage)`
+before starting and are skipped when the remaining budget is smaller than
+what that stage takes on average. LLM calls cap their own timeout to the
+remaining budget. Whatever was skipped or cut short is recorded, and the
+request returns its best partial result flagged as degraded.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from src.utils import metrics
+
+# Assumed duration of a stage that has never been observed in this process: start
+# it, and let the LLM call timeouts (capped to the remaining budget) cut it short
+DEFAULT_STAGE_ESTIMATE_S = 0.0
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's latency budget ran out before this work could finish."""
+
+
+class Deadline:
+    def __init__(self, budget_seconds: float):
+        self.budget_seconds = budget_seconds
+        self.started = time.monotonic()
+        self.expires = self.started + budget_seconds
+        self._skipped: List[str] = []
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        return self.expires - time.monotonic()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def allows(self, stage: str) -> bool:
+        """True if the remaining budget covers the typical (mean) duration of `stage`."""
+        estimate = metrics.registry.mean("resume_stage_seconds", stage=stage)
+        return self.remaining() > (estimate if estimate is not None else DEFAULT_STAGE_ESTIMATE_S)
+
+    def skip(self, what: str):
+        """Record that `what` (a stage or stage:item) was skipped or cut short."""
+        with self._lock:
+            if what not in self._skipped:
+                self._skipped.append(what)
+                metrics.registry.inc("resume_degraded_total", what=what.split(":", 1)[0])
+
+    @property
+    def skipped(self) -> List[str]:
+        with self._lock:
+            return list(self._skipped)
+
+    def summary(self) -> Optional[Dict[str, Any]]:
+        """The `degraded` block for a response, or None if nothing was skipped."""
+        skipped = self.skipped
+        if not skipped:
+            return None
+        return {
+            "skipped": skipped,
+            "budget_ms": round(self.budget_seconds * 1000),
+            "elapsed_ms": round((time.monotonic() - self.started) * 1000, 1),
+        }
+
+
+_current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(budget_seconds: Optional[float]):
+    """Open a deadline for the current context; a falsy budget means no deadline."""
+    deadline = Deadline(budget_seconds) if budget_seconds else None
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
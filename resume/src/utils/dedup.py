@@ -0,0 +1,100 @@
+"""
+Dedup: local near-duplicate detection for resume bullets.
+
+The expander and enhancer prompts ask for unique bullets, but models still
+repeat themselves ("Built REST APIs with FastAPI..." twice with one word
+changed). Instead of another full enhancement round, bullets are compared
+locally. Only the later bullet of each near-duplicate pair is sent back to
+the LLM, in one targeted call (EnhancerAgent.rewrite_duplicates).
+
+Each bullet becomes a set of shingles: its content words, lowercased and
+crudely stemmed, ignoring stopwords and punctuation. (Word pairs were tried
+and miss paraphrases that only swap a preposition.) Two bullets are
+near-duplicates when the Jaccard similarity of their shingle sets reaches
+DEDUP_THRESHOLD and they share at least DEDUP_MIN_SHARED words. Candidate
+pairs come from an inverted shingle -> bullets map, so only bullets that
+share a shingle are compared. A resume's bullets are checked in well under a
+millisecond.
+"""
+
+import os
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from src.schemas.resume_schema import Resume
+from src.search.text import tokenize
+
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.5"))
+# Short bullets reach the threshold on a word or two ("Wrote tests" ~ "Improved tests"); require this many in common
+DEDUP_MIN_SHARED = 3
+
+
+def _stem(word: str) -> str:
+    # Crude suffix stripping, enough for "built APIs serving" ~ "build API served"
+    for suffix, min_len in (("ing", 6), ("ed", 5), ("es", 5), ("s", 4)):
+        if word.endswith(suffix) and len(word) >= min_len and not word.endswith("ss"):
+            return word[:-len(suffix)]
+    return word
+
+
+def shingles(text: str) -> FrozenSet[str]:
+    return frozenset(_stem(word) for word in tokenize(text))
+
+
+def similarity(a: str, b: str) -> float:
+    """Jaccard similarity of the two texts' shingle sets."""
+    sa, sb = shingles(a), shingles(b)
+    if not sa or not sb:
+        return 1.0 if a.strip().lower() == b.strip().lower() else 0.0
+    return len(sa & sb) / len(sa | sb)
+
+
+def bullets(resume: Resume) -> Dict[str, str]:
+    """Experience and project bullets keyed like the enhancer's patches ("e0.1", "p2.0"), in resume order."""
+    keyed: Dict[str, str] = {}
+    for i, exp in enumerate(resume.experience):
+        for j, detail in enumerate(exp.details):
+            keyed[f"e{i}.{j}"] = detail
+    for i, proj in enumerate(resume.projects):
+        for j, detail in enumerate(proj.details):
+            keyed[f"p{i}.{j}"] = detail
+    return keyed
+
+
+def find_duplicates(texts: Dict[str, str], threshold: Optional[float] = None) -> List[Tuple[str, str, float]]:
+    """
+    (earlier key, later key, similarity) for every pair at or above
+    `threshold`, in input order. The later key is the one to rewrite.
+    """
+    threshold = DEDUP_THRESHOLD if threshold is None else threshold
+    keys = list(texts)
+    sets = [shingles(texts[key]) for key in keys]
+    seen: Dict[str, List[int]] = {}  # shingle -> earlier bullets containing it
+    pairs = []
+    for later, shingle_set in enumerate(sets):
+        shared: Dict[int, int] = {}
+        for shingle in shingle_set:
+            for earlier in seen.get(shingle, ()):
+                shared[earlier] = shared.get(earlier, 0) + 1
+            seen.setdefault(shingle, []).append(later)
+        for earlier, common in shared.items():
+            score = common / (len(sets[earlier]) + len(shingle_set) - common)
+            if score >= threshold and common >= DEDUP_MIN_SHARED:
+                pairs.append((keys[earlier], keys[later], round(score, 3)))
+        if not shingle_set:
+            # No content words; only an exact repeat counts
+            text = texts[keys[later]].strip().lower()
+            pairs.extend((keys[e], keys[later], 1.0) for e in range(later)
+                         if not sets[e] and texts[keys[e]].strip().lower() == text)
+    order = {key: i for i, key in enumerate(keys)}
+    pairs.sort(key=lambda p: (order[p[1]], order[p[0]]))
+    return pairs
+
+
+def offending(pairs: List[Tuple[str, str, float]]) -> Dict[str, List[str]]:
+    """{bullet to rewrite: [earlier bullets it duplicates]}; a bullet that is itself rewritten is not a reference."""
+    flagged: Dict[str, List[str]] = {}
+    for earlier, later, _ in pairs:
+        if earlier in flagged:
+            continue
+        flagged.setdefault(later, []).append(earlier)
+    return flagged
@@ -0,0 +1,152 @@
+"""
+Hedging: duplicate slow LLM calls to cut tail latency.
+
+If a call has not returned after the hedge threshold (a fixed delay, or the
+observed p95 call latency for that agent/model once enough samples exist), a
+second identical call is fired and whichever finishes first wins. Hedges are
+capped at a fraction of all calls so a slow provider is not hit with twice the
+load. The losing call cannot be cancelled (the Groq SDK is synchronous); it is
+left to finish in the background and its result is discarded.
+
+Hedges run on their own small pool (LLM_HEDGE_THREADS), separate from the
+primary calls' pool (LLM_CALL_THREADS), and a call is not hedged when no hedge
+thread is free, so hedges can never queue behind or starve primary calls.
+"""
+
+import contextvars
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.utils import metrics
+
+
+class HedgePolicy:
+    def __init__(self, after_seconds: Optional[float] = None, quantile: float = 0.95,
+                 max_ratio: float = 0.05, min_samples: int = 20):
+        """
+        after_seconds: fixed hedge delay; None uses the observed `quantile` latency
+        max_ratio:     hedges allowed as a fraction of calls
+        min_samples:   calls observed before the adaptive threshold is trusted
+        """
+        self.after_seconds = after_seconds
+        self.quantile = quantile
+        self.max_ratio = max_ratio
+        self.min_samples = min_samples
+        self.calls = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    def threshold(self, model: str) -> Optional[float]:
+        """Seconds to wait before hedging a call to `model` from the current stage, or None to not hedge."""
+        if self.after_seconds is not None:
+            return self.after_seconds
+        labels = {"agent": metrics.current_stage(), "model": model}
+        if metrics.registry.histogram_count("resume_llm_call_seconds", **labels) < self.min_samples:
+            return None
+        return metrics.registry.quantile("resume_llm_call_seconds", self.quantile, **labels)
+
+    def record_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def try_hedge(self) -> bool:
+        """Take one unit of hedge budget if the hedge rate is still under the cap."""
+        with self._lock:
+            # +1 lets the very first slow call hedge before the ratio has meaning
+            if self.hedges + 1 > self.max_ratio * self.calls + 1:
+                return False
+            self.hedges += 1
+            return True
+
+
+CALL_THREADS = int(os.getenv("LLM_CALL_THREADS", "64"))
+HEDGE_THREADS = int(os.getenv("LLM_HEDGE_THREADS", "8"))
+
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_pool_lock = threading.Lock()
+# Free hedge threads; a hedge is only fired when it can start right away
+_hedge_threads = threading.BoundedSemaphore(HEDGE_THREADS)
+
+
+def _executor(kind: str) -> ThreadPoolExecutor:
+    with _pool_lock:
+        pool = _pools.get(kind)
+        if pool is None:
+            size = HEDGE_THREADS if kind == "hedge" else CALL_THREADS
+            pool = _pools[kind] = ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"llm-{kind}")
+        return pool
+
+
+def _submit(kind: str, fn: Callable[[], Any]) -> Future:
+    # Calls keep the caller's stage/trace/usage context
+    return _executor(kind).submit(contextvars.copy_context().run, fn)
+
+
+def _discard_callback(on_discarded: Callable[[Any], None]) -> Callable[[Future], None]:
+    context = contextvars.copy_context()
+
+    def callback(future: Future):
+        if future.exception() is None:
+            context.run(on_discarded, future.result())
+    return callback
+
+
+def _when_both_done(first: Future, second: Future, callback: Callable[[], None]):
+    remaining = [2]
+    lock = threading.Lock()
+
+    def done(_: Future):
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            callback()
+    first.add_done_callback(done)
+    second.add_done_callback(done)
+
+
+def hedged_call(fn: Callable[[], Any], after_seconds: float, allow_hedge: Callable[[], bool],
+                on_discarded: Optional[Callable[[Any], None]] = None,
+                on_hedge_finished: Optional[Callable[[], None]] = None) -> Tuple[Any, bool]:
+    """
+    Run `fn`, firing a duplicate if it has not returned within `after_seconds`,
+    a hedge thread is free and `allow_hedge()` agrees. Returns (result, hedged).
+    If the first call to finish failed, the other one is awaited.
+    `on_discarded` receives the result of a losing call that still succeeded
+    (e.g. to account its tokens). `on_hedge_finished` is called once both calls
+    have finished, to give back whatever `allow_hedge()` reserved.
+    """
+    primary = _submit("call", fn)
+    done, _ = wait([primary], timeout=after_seconds)
+    if done:
+        return primary.result(), False
+    if not _hedge_threads.acquire(blocking=False):
+        metrics.registry.inc("resume_llm_hedges_skipped_total", reason="threads")
+        return primary.result(), False
+    if not allow_hedge():
+        _hedge_threads.release()
+        return primary.result(), False
+
+    hedge = _submit("hedge", fn)
+    hedge.add_done_callback(lambda _: _hedge_threads.release())
+    if on_hedge_finished is not None:
+        _when_both_done(primary, hedge, on_hedge_finished)
+    pending = {primary, hedge}
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        succeeded = [f for f in done if f.exception() is None]
+        if succeeded:
+            winner = succeeded[0]
+            metrics.registry.inc("resume_llm_hedges_total", agent=metrics.current_stage(),
+                                 winner="hedge" if winner is hedge else "primary")
+            if on_discarded is not None:
+                for loser in succeeded[1:]:
+                    on_discarded(loser.result())
+                for loser in pending:
+                    loser.add_done_callback(_discard_callback(on_discarded))
+            return winner.result(), True
+        error = next(iter(done)).exception()
+    raise error
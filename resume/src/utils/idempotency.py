@@ -0,0 +1,156 @@
+"""
+Idempotency: Idempotency-Key support for /process and /generate.
+
+The Node proxy and browsers retry /process when it is slow, and every retry
+used to start the whole LLM pipeline again next to the original. A client
+that sends an `Idempotency-Key` header gets one computation per key:
+
+- The first request with a key (the leader) starts the computation as its
+  own task, so it keeps running if that client gives up and retries.
+- A request with the same key while that task runs attaches to it and gets
+  the same result, or the same error.
+- A request with the same key after it succeeded gets the stored result
+  (bounded store, IDEMPOTENCY_TTL_SECONDS). Failures are not stored, so a
+  retry after an error runs again.
+- A key reused with a different request (by fingerprint) is rejected with
+  IdempotencyConflict.
+
+Keys are scoped by endpoint and user. Stored values are JSON-serializable,
+like everything else kept in src.utils.cache. With several workers the
+store is shared (see cache.py). The leader then also claims the key there
+with a pending marker, so a retry that lands on another worker waits for
+the stored result instead of running again. If the leader's worker dies,
+the marker expires after IDEMPOTENCY_PENDING_SECONDS. Calls into the shared
+store run on the threadpool, so a busy database never blocks the event loop.
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from src.utils import metrics
+from src.utils.cache import Cache, SQLiteCache, get_cache
+
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+# Stored /generate results carry the PDF, so keep this modest
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "1000"))
+# How long a claim by a running computation lasts (it is replaced by the result, or dropped on failure)
+IDEMPOTENCY_PENDING_SECONDS = float(os.getenv("IDEMPOTENCY_PENDING_SECONDS", "300"))
+PENDING_POLL_S = 0.1
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a different request."""
+
+
+def scoped_key(key: str, endpoint: str, user_id: Optional[str] = None) -> str:
+    """The store key for a client key on `endpoint`; raises ValueError for an unusable key."""
+    key = key.strip()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise ValueError(f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+    return f"{endpoint}|{user_id or ''}|{key}"
+
+
+class IdempotencyStore:
+    def __init__(self, name: str = "idempotency", max_entries: int = IDEMPOTENCY_MAX_ENTRIES,
+                 ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS, results: Optional[Cache] = None):
+        self.name = name
+        self.results: Cache = results or get_cache(name, max_entries=max_entries, ttl_seconds=ttl_seconds)
+        # key -> (request fingerprint, result of the running computation). A thread-safe future, so
+        # requests served on another event loop (e.g. the threads of a TestClient) can attach too.
+        # The lock guards only this map; it is never held across store I/O.
+        self._inflight: Dict[str, Tuple[str, concurrent.futures.Future]] = {}
+        self._lock = threading.Lock()
+
+    async def _io(self, fn: Callable[..., Any], *args) -> Any:
+        """Call a store method, off the event loop when the store is the shared database."""
+        if isinstance(self.results, SQLiteCache):
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    async def run(self, key: str, request_fingerprint: str,
+                  compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, str]:
+        """
+        The result of `compute` for `key`, computed at most once while in
+        flight or stored. Returns (value, outcome), where outcome is "new",
+        "attached" or "replayed".
+        """
+        waited = False
+        while True:
+            # In flight is checked before the store, and a computation stores its result before
+            # leaving the in-flight map, so one finishing in between is found in one or the other
+            with self._lock:
+                inflight = self._inflight.get(key)
+            if inflight is not None:
+                self._check(inflight[0], request_fingerprint)
+                self._record("attached")
+                # shield: a retrying client that disconnects must not cancel the shared computation
+                return await asyncio.shield(asyncio.wrap_future(inflight[1])), "attached"
+
+            stored = await self._io(self.results.get, key)
+            if stored is None:
+                claim = {"fingerprint": request_fingerprint, "pending": True}
+                if not await self._io(self.results.add, key, claim, IDEMPOTENCY_PENDING_SECONDS):
+                    stored = await self._io(self.results.get, key)  # another request claimed it first
+                # Also lead when the store keeps nothing (disabled, or the shared database failing)
+                if stored is None:
+                    result: concurrent.futures.Future = concurrent.futures.Future()
+                    with self._lock:
+                        inflight = self._inflight.setdefault(key, (request_fingerprint, result))
+                    if inflight[1] is result:
+                        break
+                    continue  # a request in this process started it meanwhile: attach to that
+            if stored is not None:
+                self._check(stored["fingerprint"], request_fingerprint)
+                if not stored.get("pending"):
+                    self._record("attached" if waited else "replayed")
+                    return stored["value"], "attached" if waited else "replayed"
+            # Claimed by another request (or its claim just lapsed): wait for its result, or take over
+            waited = True
+            await asyncio.sleep(PENDING_POLL_S)
+
+        self._record("new")
+        task = asyncio.ensure_future(self._compute(key, request_fingerprint, compute, result))
+        # Nobody may be awaiting the task when it fails (every client gave up); don't warn about that
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return await asyncio.shield(task), "new"
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+    async def _compute(self, key: str, request_fingerprint: str, compute: Callable[[], Awaitable[Any]],
+                       result: concurrent.futures.Future) -> Any:
+        try:
+            value = await compute()
+        except BaseException as e:
+            try:
+                await self._io(self.results.delete, key)
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                result.set_exception(e)
+            raise
+        try:
+            await self._io(self.results.set, key, {"fingerprint": request_fingerprint, "value": value})
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            result.set_result(value)
+        return value
+
+    def _check(self, expected: str, actual: str):
+        if expected != actual:
+            self._record("conflict")
+            raise IdempotencyConflict("Idempotency-Key was already used with a different request")
+
+    def _record(self, outcome: str):
+        metrics.registry.inc("resume_idempotency_requests_total", store=self.name, outcome=outcome)
+
+
+store = IdempotencyStore()
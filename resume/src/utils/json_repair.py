@@ -0,0 +1,131 @@
+"""
+JSON repair: fast local fixes for almost-valid LLM JSON output.
+
+Handles the failure modes we actually see from the models:
+- markdown code fences (```json ... ```)
+- prose before or after the JSON value ("Here is the JSON: {...} Hope this helps")
+- truncated output (unterminated string, missing closing brackets, trailing comma)
+
+Anything more broken than that is left to a re-ask.
+"""
+
+import json
+import re
+from typing import Any, Tuple
+
+
+class JSONRepairError(ValueError):
+    """Raised when text cannot be turned into JSON locally."""
+
+
+_FENCE_RE = re.compile(r"^```[a-zA-Z]*\s*|\s*```$")
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def strip_code_fences(text: str) -> str:
+    text = text.strip()
+    if text.startswith("```"):
+        text = _FENCE_RE.sub("", text).strip()
+    return text
+
+
+def _scan(text: str, start: int) -> Tuple[int, list, bool]:
+    """
+    Walk a JSON value starting at `start`. Returns (end index or -1, open bracket
+    stack, inside-string flag) so the caller can either cut trailing garbage or
+    close a truncated value.
+    """
+    stack = []
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append(ch)
+        elif ch in "}]":
+            if not stack or _CLOSERS[stack[-1]] != ch:
+                return i, stack, False  # mismatched closer: cut here
+            stack.pop()
+            if not stack:
+                return i + 1, stack, False
+    return -1, stack, in_string
+
+
+def _close_truncated(fragment: str, stack: list, in_string: bool) -> str:
+    if in_string:
+        fragment += '"'
+    fragment = fragment.rstrip()
+    # Drop a dangling separator or a key with no value ("a": 1, "b":
+    fragment = re.sub(r',\s*$', "", fragment)
+    fragment = re.sub(r',?\s*"[^"]*"\s*:\s*$', "", fragment)
+    return fragment + "".join(_CLOSERS[b] for b in reversed(stack))
+
+
+def _strip_trailing_commas(fragment: str) -> str:
+    """Drop commas right before a closer ([1, 2,] / {"a": 1,}), leaving string contents alone."""
+    out = []
+    in_string = False
+    escaped = False
+    pending = -1  # index in `out` of a comma that may turn out to be trailing
+    for ch in fragment:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+            pending = -1
+        elif ch == ",":
+            pending = len(out)
+        elif ch in "}]":
+            if pending != -1:
+                out[pending] = ""
+            pending = -1
+        elif not ch.isspace():
+            pending = -1
+        out.append(ch)
+    return "".join(out)
+
+
+def repair_json_text(text: str) -> str:
+    """Best-effort local repair. Returns text that should parse as JSON."""
+    text = strip_code_fences(text)
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        raise JSONRepairError("no JSON object or array found")
+    start = min(starts)
+    end, stack, in_string = _scan(text, start)
+    if end != -1 and not stack:
+        fragment = text[start:end]
+    else:
+        fragment = _close_truncated(text[start:] if end == -1 else text[start:end], stack, in_string)
+    return _strip_trailing_commas(fragment)
+
+
+def loads_with_repair(text: str) -> Tuple[Any, bool]:
+    """
+    Parse LLM output as JSON, repairing locally if needed.
+    Returns (value, repaired) and raises JSONRepairError if both attempts fail.
+    """
+    cleaned = strip_code_fences(text)
+    try:
+        return json.loads(cleaned), False
+    except json.JSONDecodeError:
+        pass
+    try:
+        return json.loads(repair_json_text(cleaned)), True
+    except json.JSONDecodeError as e:
+        raise JSONRepairError(f"unrepairable JSON: {e}") from e
@@ -1,7 +1,10 @@
 import os
 import json
 import sys
+import threading
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, Type, TypeVar
 
 # Add parent directory to path to import config (Optional fallback)
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
@@ -10,52 +13,355 @@ try:
 except ImportError:
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-from groq import Groq
+from pydantic import BaseModel, ValidationError
+from src.utils import metrics, usage
+from src.utils.json_repair import loads_with_repair, JSONRepairError
+from src.utils.rate_limiter import get_rate_limiter, backoff_delay
+from src.utils.cache import fingerprint
+from src.utils.single_flight import SingleFlight
+from src.utils.hedging import HedgePolicy, hedged_call
+from src.utils.deadline import DeadlineExceeded, current_deadline
+from src.utils.circuit_breaker import get_breaker
+
+# The Groq SDK (and the httpx/pydantic models behind it) is imported on first
+# call rather than at service start-up; see src/utils/startup.py.
+if TYPE_CHECKING:
+    from groq import RateLimitError
+
+# Retries for 429s and transient upstream failures (on top of the first attempt)
+MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "4"))
+# Output tokens reserved against the tokens/min bucket before the real count is known
+EXPECTED_OUTPUT_TOKENS = 512
+# Per-call deadline (seconds) passed to the SDK; a timed-out call is retried like other transient errors
+CALL_TIMEOUT_S = float(os.getenv("LLM_CALL_TIMEOUT_S", "30"))
+
+# Groq pricing, USD per 1M (input, output) tokens
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+}
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+SMALL_MODEL = "llama-3.1-8b-instant"
+
+# Task classes for routing. Mechanical extraction/classification goes to the
+# small fast model; anything the user reads verbatim is written by the large one.
+TASK_EXTRACT = "extract"
+TASK_CLASSIFY = "classify"
+TASK_WRITE = "write"
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class StructuredOutputError(ValueError):
+    """The model did not return JSON matching the requested schema, even after repair and a re-ask."""
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """Estimated USD cost of a call (unknown models are priced like the default model)."""
+    input_price, output_price = MODEL_PRICING.get(model, MODEL_PRICING[DEFAULT_MODEL])
+    return (input_tokens / 1_000_000) * input_price + (output_tokens / 1_000_000) * output_price
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def _retry_after_seconds(error: "RateLimitError") -> Optional[float]:
+    """Parse Groq's retry-after header (seconds) from a 429."""
+    try:
+        value = error.response.headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (AttributeError, ValueError):
+        return None
+
 
 class LLMClient:
-    def __init__(self, model_name: str = "llama-3.3-70b-versatile"):
-        if not GROQ_API_KEY:
+    def __init__(self, model_name: str = DEFAULT_MODEL, task_models: Optional[Dict[str, str]] = None):
+        # Read the environment again here, so a key set after import (benchmarks, tests) counts
+        self._api_key = GROQ_API_KEY or os.getenv("GROQ_API_KEY")
+        if not self._api_key:
             raise ValueError("GROQ_API_KEY not found in environment or config.py")
-        self.client = Groq(api_key=GROQ_API_KEY)
+        self._client: Any = None
+        self._client_lock = threading.Lock()
         self.model_name = model_name
+        # Per-task routing (LLM_MODEL_EXTRACT / LLM_MODEL_CLASSIFY / LLM_MODEL_WRITE override);
+        # LLM_ROUTING=0 sends everything to model_name.
+        if os.getenv("LLM_ROUTING", "1") == "0":
+            self.task_models = {}
+        else:
+            self.task_models = {
+                TASK_EXTRACT: os.getenv("LLM_MODEL_EXTRACT", SMALL_MODEL),
+                TASK_CLASSIFY: os.getenv("LLM_MODEL_CLASSIFY", SMALL_MODEL),
+                TASK_WRITE: os.getenv("LLM_MODEL_WRITE", model_name),
+            }
+            self.task_models.update(task_models or {})
+        # Process-wide totals; per-request numbers live in src.utils.usage scopes
+        self._stats_lock = threading.Lock()
         self.total_input_tokens = 0
         self.total_output_tokens = 0
         self.call_count = 0
+        self.usage_by_model: Dict[str, Dict[str, int]] = {}
+        # Identical concurrent prompts share one upstream call (LLM_SINGLE_FLIGHT=0 disables)
+        self.single_flight = SingleFlight("llm") if os.getenv("LLM_SINGLE_FLIGHT", "1") != "0" else None
+        self.call_timeout = CALL_TIMEOUT_S
+        self.hedging = self._hedge_policy_from_env()
+        # Shared with every LLMClient in the process: Groq is one dependency
+        self.breaker = get_breaker("groq")
+
+    @property
+    def client(self):
+        """Groq SDK client, built on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from groq import Groq
+                    # Retries are handled here (with the shared limiter), not inside the SDK
+                    self._client = Groq(api_key=self._api_key, max_retries=0)
+        return self._client
 
-    def generate(self, system_prompt: str, user_prompt: str, temperature: float = 0.7) -> str:
+    @client.setter
+    def client(self, value):
+        self._client = value
+
+    @staticmethod
+    def _hedge_policy_from_env() -> Optional[HedgePolicy]:
+        """
+        LLM_HEDGE_AFTER_MS hedges after a fixed delay; LLM_HEDGING=1 hedges after the
+        observed p95 per agent/model. LLM_HEDGE_MAX_RATIO caps hedges per call (default 5%).
+        """
+        after_ms = os.getenv("LLM_HEDGE_AFTER_MS")
+        if not after_ms and os.getenv("LLM_HEDGING", "0") != "1":
+            return None
+        return HedgePolicy(
+            after_seconds=float(after_ms) / 1000 if after_ms else None,
+            max_ratio=float(os.getenv("LLM_HEDGE_MAX_RATIO", "0.05")),
+        )
+
+    def model_for(self, task: str) -> str:
+        """Model used for a task class (extract / classify / write)."""
+        return self.task_models.get(task, self.model_name)
+
+    def generate(self, system_prompt: str, user_prompt: str, temperature: float = 0.7,
+                 task: str = TASK_WRITE, model: Optional[str] = None, json_mode: bool = False) -> str:
         """
         Generate a response from the LLM.
+
+        The model is picked by `task` unless `model` is given explicitly.
+        `json_mode` asks Groq for a JSON object response (the prompt must mention JSON).
+        Calls go through the process-wide rate limiter; 429s back off (honouring
+        retry-after) and transient failures are retried with jittered backoff.
+        Concurrent calls with an identical model/prompt/temperature are coalesced
+        into one upstream request; only the caller that made it is charged.
         """
+        model = model or self.model_for(task)
+        if self.single_flight is None:
+            return self._complete(system_prompt, user_prompt, temperature, model, json_mode)
+        key = fingerprint(model, system_prompt, user_prompt, temperature, json_mode)
         try:
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=temperature
+            response, _ = self.single_flight.do(
+                key, lambda: self._complete(system_prompt, user_prompt, temperature, model, json_mode)
             )
-            
-            # Track token usage
-            if hasattr(response, 'usage'):
-                self.total_input_tokens += response.usage.prompt_tokens
-                self.total_output_tokens += response.usage.completion_tokens
-                self.call_count += 1
-            
-            return response.choices[0].message.content
-        except Exception as e:
-            print(f"Groq Generation Error: {e}")
+        except DeadlineExceeded:
+            deadline = current_deadline()
+            if deadline is None or not deadline.expired():
+                # Coalesced onto another request's call whose (shorter) budget ran out
+                return self._complete(system_prompt, user_prompt, temperature, model, json_mode)
             raise
-    
+        return response
+
+    def _complete(self, system_prompt: str, user_prompt: str, temperature: float, model: str, json_mode: bool) -> str:
+        """
+        One upstream completion with rate limiting and retries. Under a request
+        deadline the call timeout is capped to the remaining budget, and no
+        attempt or retry is started once the budget cannot cover it. While the
+        Groq circuit is open, CircuitOpenError is raised without calling out.
+        """
+        from groq import RateLimitError, APIConnectionError, APITimeoutError, InternalServerError, APIStatusError
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        estimated_tokens = estimate_tokens(system_prompt + user_prompt) + EXPECTED_OUTPUT_TOKENS
+        limiter = get_rate_limiter()
+        extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+        deadline = current_deadline()
+
+        for attempt in range(MAX_RETRIES + 1):
+            delay = 0.0
+            if deadline is not None and deadline.expired():
+                deadline.skip(metrics.current_stage())
+                raise DeadlineExceeded(f"request budget exhausted before {model} call")
+            self.breaker.check()
+            with limiter.slot(estimated_tokens) as slot:
+                start = time.perf_counter()
+                timeout = self.call_timeout if deadline is None else max(0.001, min(self.call_timeout, deadline.remaining()))
+                try:
+                    response = self._create(model, messages, temperature, extra, limiter, timeout, estimated_tokens)
+                except RateLimitError as e:
+                    # Groq answered, so it is up: a 429 is not a circuit failure
+                    self.breaker.record_success()
+                    retry_after = _retry_after_seconds(e)
+                    slot.rate_limited(retry_after)
+                    metrics.record_llm_error(model, type(e).__name__)
+                    if attempt == MAX_RETRIES:
+                        print(f"Groq Generation Error: {e}")
+                        raise
+                    # The limiter already pauses everyone for retry-after; add jitter on top
+                    delay = backoff_delay(attempt)
+                except (APIConnectionError, APITimeoutError, InternalServerError) as e:
+                    metrics.record_llm_error(model, type(e).__name__)
+                    if deadline is not None and deadline.expired():
+                        # Our budget ran out, which says nothing about Groq's health
+                        self.breaker.release()
+                        deadline.skip(metrics.current_stage())
+                        raise DeadlineExceeded(f"{model} call cut short by the request budget") from e
+                    self.breaker.record_failure()
+                    if attempt == MAX_RETRIES:
+                        print(f"Groq Generation Error: {e}")
+                        raise
+                    delay = backoff_delay(attempt)
+                except Exception as e:
+                    if isinstance(e, APIStatusError):
+                        # A 4xx is our request's fault; Groq itself is healthy
+                        self.breaker.record_success()
+                    else:
+                        self.breaker.release()
+                    metrics.record_llm_error(model, type(e).__name__)
+                    print(f"Groq Generation Error: {e}")
+                    raise
+                else:
+                    self.breaker.record_success()
+                    # Track token usage
+                    input_tokens = output_tokens = 0
+                    if hasattr(response, 'usage'):
+                        input_tokens = response.usage.prompt_tokens
+                        output_tokens = response.usage.completion_tokens
+                    slot.succeeded(input_tokens + output_tokens)
+                    self._record_usage(model, time.perf_counter() - start, input_tokens, output_tokens)
+                    return response.choices[0].message.content
+
+            if deadline is not None and deadline.remaining() <= delay:
+                deadline.skip(metrics.current_stage())
+                raise DeadlineExceeded(f"no budget left to retry {model} call")
+            metrics.registry.inc("resume_llm_retries_total", agent=metrics.current_stage())
+            print(f"⏳ Groq call failed (attempt {attempt + 1}/{MAX_RETRIES + 1}), retrying in {delay:.2f}s...")
+            time.sleep(delay)
+
+    def _create(self, model: str, messages: list, temperature: float, extra: dict, limiter, timeout: float,
+                estimated_tokens: int):
+        """One completion request with a per-call deadline, hedged if a policy is configured."""
+        def call():
+            return self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                timeout=timeout,
+                **extra
+            )
+
+        if self.hedging is None:
+            return call()
+        self.hedging.record_call()
+        threshold = self.hedging.threshold(model)
+        if threshold is None:
+            return call()
+
+        def allow_hedge() -> bool:
+            # A hedge is a real request: it needs hedge budget and its own limiter slot (requests,
+            # tokens and concurrency), without waiting for one
+            return self.hedging.try_hedge() and limiter.try_reserve(estimated_tokens)
+
+        response, _ = hedged_call(call, threshold, allow_hedge,
+                                  on_discarded=lambda r: self._record_discarded(model, r, limiter, estimated_tokens),
+                                  on_hedge_finished=limiter.concurrency.release)
+        return response
+
+    def _record_discarded(self, model: str, response, limiter, estimated_tokens: int):
+        """Tokens spent on the losing side of a hedge: charged, but kept out of the latency histogram."""
+        input_tokens = getattr(getattr(response, "usage", None), "prompt_tokens", 0)
+        output_tokens = getattr(getattr(response, "usage", None), "completion_tokens", 0)
+        if limiter.tokens is not None:
+            limiter.tokens.adjust(estimated_tokens - input_tokens - output_tokens)
+        cost = estimate_cost(model, input_tokens, output_tokens)
+        with self._stats_lock:
+            self.total_input_tokens += input_tokens
+            self.total_output_tokens += output_tokens
+        metrics.registry.inc("resume_llm_hedge_discarded_tokens_total", input_tokens + output_tokens, model=model)
+        metrics.registry.inc("resume_llm_cost_usd_total", cost, agent=metrics.current_stage(), model=model)
+        usage.record_call(model, metrics.current_stage(), 0.0, input_tokens, output_tokens, cost)
+
+    def generate_json(self, system_prompt: str, user_prompt: str, schema: Type[M],
+                      temperature: float = 0.1, task: str = TASK_WRITE) -> M:
+        """
+        Generate a response constrained to `schema` (a Pydantic model).
+
+        Requests Groq JSON mode with the schema in the system prompt, then
+        parses locally, repairing fenced/truncated/trailing-garbage JSON. If the
+        output still does not validate, one targeted re-ask (showing the model
+        its output and the error) is sent to the large model.
+        Raises StructuredOutputError if that fails too.
+        """
+        schema_name = schema.__name__
+        json_schema = json.dumps(schema.model_json_schema(), separators=(",", ":"))
+        system_with_schema = (
+            f"{system_prompt}\n\nRespond with a single JSON object that validates against this JSON Schema:\n{json_schema}"
+        )
+        response = self.generate(system_with_schema, user_prompt, temperature, task=task, json_mode=True)
+        try:
+            return self._parse_structured(response, schema)
+        except StructuredOutputError as e:
+            error = e
+
+        metrics.registry.inc("resume_llm_json_total", schema=schema_name, outcome="reasked")
+        print(f"⚠️  {schema_name} output invalid ({str(error).splitlines()[0]}). Re-asking {self.model_name}...")
+        reask_prompt = (
+            f"{user_prompt}\n\nYour previous response was:\n{response[:4000]}\n\n"
+            f"It was rejected: {error}\nReturn ONLY the corrected JSON object."
+        )
+        response = self.generate(system_with_schema, reask_prompt, temperature, model=self.model_name, json_mode=True)
+        try:
+            return self._parse_structured(response, schema)
+        except StructuredOutputError:
+            metrics.registry.inc("resume_llm_json_total", schema=schema_name, outcome="failed")
+            raise
+
+    def _parse_structured(self, response: str, schema: Type[M]) -> M:
+        schema_name = schema.__name__
+        try:
+            data, repaired = loads_with_repair(response)
+            result = schema.model_validate(data)
+        except (JSONRepairError, ValidationError) as e:
+            raise StructuredOutputError(str(e)[:500]) from e
+        metrics.registry.inc("resume_llm_json_total", schema=schema_name, outcome="repaired" if repaired else "ok")
+        return result
+
+    def _record_usage(self, model: str, latency: float, input_tokens: int, output_tokens: int):
+        """Record one call into the global totals, the metrics registry and the request's usage scope."""
+        cost = estimate_cost(model, input_tokens, output_tokens)
+        with self._stats_lock:
+            self.total_input_tokens += input_tokens
+            self.total_output_tokens += output_tokens
+            self.call_count += 1
+            per_model = self.usage_by_model.setdefault(model, {"calls": 0, "input_tokens": 0, "output_tokens": 0})
+            per_model["calls"] += 1
+            per_model["input_tokens"] += input_tokens
+            per_model["output_tokens"] += output_tokens
+        metrics.record_llm_call(model, latency, input_tokens, output_tokens, cost)
+        usage.record_call(model, metrics.current_stage(), latency, input_tokens, output_tokens, cost)
+
     def get_usage_stats(self):
-        """Return token usage statistics."""
-        total_tokens = self.total_input_tokens + self.total_output_tokens
-        return {
-            "calls": self.call_count,
-            "input_tokens": self.total_input_tokens,
-            "output_tokens": self.total_output_tokens,
-            "total_tokens": total_tokens
-        }
+        """Return token usage statistics (process-wide, across all requests)."""
+        with self._stats_lock:
+            total_tokens = self.total_input_tokens + self.total_output_tokens
+            return {
+                "calls": self.call_count,
+                "input_tokens": self.total_input_tokens,
+                "output_tokens": self.total_output_tokens,
+                "total_tokens": total_tokens,
+                "by_model": {m: dict(v) for m, v in self.usage_by_model.items()}
+            }
     
     def print_usage_stats(self):
         """Print formatted token usage statistics."""
@@ -67,12 +373,14 @@ class LLMClient:
         print(f"Input Tokens:    {stats['input_tokens']:,}")
         print(f"Output Tokens:   {stats['output_tokens']:,}")
         print(f"Total Tokens:    {stats['total_tokens']:,}")
-        print(f"\nEstimated Cost (Llama 3.3 70B):")
-        # Groq pricing: $0.59 per 1M input tokens, $0.79 per 1M output tokens
-        input_cost = (stats['input_tokens'] / 1_000_000) * 0.59
-        output_cost = (stats['output_tokens'] / 1_000_000) * 0.79
-        total_cost = input_cost + output_cost
-        print(f"  Input:  ${input_cost:.4f}")
-        print(f"  Output: ${output_cost:.4f}")
+        print(f"\nEstimated Cost (per model):")
+        total_cost = 0.0
+        for model, model_stats in stats['by_model'].items():
+            input_cost = estimate_cost(model, model_stats['input_tokens'], 0)
+            output_cost = estimate_cost(model, 0, model_stats['output_tokens'])
+            total_cost += input_cost + output_cost
+            print(f"  {model} ({model_stats['calls']} calls)")
+            print(f"    Input:  ${input_cost:.4f}")
+            print(f"    Output: ${output_cost:.4f}")
         print(f"  Total:  ${total_cost:.4f}")
         print("="*60 + "\n")
@@ -0,0 +1,263 @@
+"""
+Metrics: lightweight in-process instrumentation for the resume service.
+
+Counters, gauges and latency histograms are kept in a single thread-safe
+registry and rendered in the Prometheus text format for the /metrics endpoint.
+Each HTTP request also gets a RequestTrace (held in a contextvar) that collects
+per-stage timings and per-call LLM usage, emitted as one JSON log line when the
+request finishes.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+# Latency buckets (seconds) shared by every histogram in the registry
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate quantile from bucket counts (upper bound of the bucket)."""
+        if self.count == 0:
+            return None
+        target = q * self.count
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if self.buckets[i] >= target:
+                return bound
+        return LATENCY_BUCKETS[-1]
+
+
+class MetricsRegistry:
+    """Thread-safe store for counters, gauges and latency histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram()
+            hist.observe(value)
+
+    def counter_value(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0.0)
+
+    def gauge_value(self, name: str, **labels) -> Optional[float]:
+        with self._lock:
+            return self._gauges.get(name, {}).get(_label_key(labels))
+
+    def histogram_count(self, name: str, **labels) -> int:
+        with self._lock:
+            hist = self._histograms.get(name, {}).get(_label_key(labels))
+            return hist.count if hist else 0
+
+    def mean(self, name: str, **labels) -> Optional[float]:
+        with self._lock:
+            hist = self._histograms.get(name, {}).get(_label_key(labels))
+            return hist.total / hist.count if hist and hist.count else None
+
+    def quantile(self, name: str, q: float, **labels) -> Optional[float]:
+        with self._lock:
+            hist = self._histograms.get(name, {}).get(_label_key(labels))
+            return hist.quantile(q) if hist else None
+
+    def render_prometheus(self) -> str:
+        """Render all series in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self._gauges.items()):
+                lines.append(f"# TYPE {name} gauge")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in series.items():
+                    for bound, count in zip(LATENCY_BUCKETS, hist.buckets):
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', str(bound)))} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {hist.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist.total}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+# Process-wide registry used by the service
+registry = MetricsRegistry()
+
+
+class RequestTrace:
+    """Per-request collection of stage timings and LLM calls."""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.llm_calls: List[Dict[str, Any]] = []
+        self.cache: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def add_stage(self, name: str, seconds: float):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add_llm_call(self, call: Dict[str, Any]):
+        with self._lock:
+            self.llm_calls.append(call)
+
+    def add_cache(self, cache: str, hit: bool):
+        with self._lock:
+            counts = self.cache.setdefault(cache, {"hits": 0, "misses": 0})
+            counts["hits" if hit else "misses"] += 1
+
+    def to_log_record(self, status: int) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "event": "request",
+                "method": self.method,
+                "path": self.path,
+                "status": status,
+                "duration_ms": round((time.perf_counter() - self.started) * 1000, 1),
+                "stages_ms": {k: round(v * 1000, 1) for k, v in self.stages.items()},
+                "llm_calls": len(self.llm_calls),
+                "input_tokens": sum(c["input_tokens"] for c in self.llm_calls),
+                "output_tokens": sum(c["output_tokens"] for c in self.llm_calls),
+                "cost_usd": round(sum(c["cost_usd"] for c in self.llm_calls), 6),
+                "cache": dict(self.cache),
+            }
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+_current_stage: ContextVar[str] = ContextVar("pipeline_stage", default="unscoped")
+
+
+def start_trace(method: str, path: str) -> RequestTrace:
+    trace = RequestTrace(method, path)
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+def current_stage() -> str:
+    return _current_stage.get()
+
+
+def log_request(trace: RequestTrace, status: int):
+    """Emit the structured per-request log line and record request latency."""
+    record = trace.to_log_record(status)
+    registry.observe("resume_http_request_seconds", record["duration_ms"] / 1000,
+                     path=trace.path, method=trace.method, status=status)
+    print(json.dumps(record))
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Time a pipeline stage. LLM calls made inside are attributed to this stage.
+    """
+    token = _current_stage.set(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _current_stage.reset(token)
+        registry.observe("resume_stage_seconds", elapsed, stage=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_stage(name, elapsed)
+
+
+def record_llm_call(model: str, latency: float, input_tokens: int, output_tokens: int, cost_usd: float):
+    """Record one upstream LLM call against the current stage."""
+    agent = _current_stage.get()
+    registry.inc("resume_llm_calls_total", agent=agent, model=model)
+    registry.inc("resume_llm_input_tokens_total", input_tokens, agent=agent, model=model)
+    registry.inc("resume_llm_output_tokens_total", output_tokens, agent=agent, model=model)
+    registry.inc("resume_llm_cost_usd_total", cost_usd, agent=agent, model=model)
+    registry.observe("resume_llm_call_seconds", latency, agent=agent, model=model)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_llm_call({
+            "agent": agent,
+            "model": model,
+            "latency_ms": round(latency * 1000, 1),
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cost_usd": cost_usd,
+        })
+
+
+def record_llm_error(model: str, error: str):
+    registry.inc("resume_llm_errors_total", agent=_current_stage.get(), model=model, error=error)
+
+
+def record_cache(cache: str, hit: bool):
+    """Record a cache lookup; hit rate = hits / (hits + misses)."""
+    registry.inc("resume_cache_requests_total", cache=cache, result="hit" if hit else "miss")
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_cache(cache, hit)
@@ -0,0 +1,204 @@
+"""
+RateLimiter: process-wide client-side limits for Groq calls.
+
+Combines two token buckets (requests/min and tokens/min) with AIMD adaptive
+concurrency: the in-flight limit grows by ~1 per window of successful calls
+and halves on a 429, and a `retry-after` from Groq pauses every caller in the
+process rather than just the one that was rejected. Throughput then settles
+at the provider ceiling instead of oscillating into 429 storms.
+"""
+
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from src.utils import metrics
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `per_minute / 60` per second."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, amount: float) -> float:
+        """Take `amount` if available. Returns 0 on success, else seconds to wait."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.rate
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Block until `amount` is available. Returns the time spent waiting."""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(amount)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    def adjust(self, amount: float):
+        """Return (positive) or charge (negative) tokens after the real cost is known."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on in-flight calls with a shared pause for retry-after."""
+
+    def __init__(self, initial: int = 8, minimum: int = 1, maximum: int = 64, decrease_factor: float = 0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> float:
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    self._cond.wait(self.paused_until - now)
+                elif self.in_flight >= int(self.limit):
+                    self._cond.wait(0.5)
+                else:
+                    self.in_flight += 1
+                    return time.monotonic() - start
+
+    def try_acquire(self) -> bool:
+        """Take an in-flight slot only if one is free right now (and no retry-after pause is on)."""
+        with self._cond:
+            if time.monotonic() < self.paused_until or self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self):
+        with self._cond:
+            # Additive increase: +1 per `limit` successful calls
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+        metrics.registry.set_gauge("resume_llm_concurrency_limit", self.limit)
+
+    def on_overload(self, retry_after: Optional[float] = None):
+        with self._cond:
+            # Multiplicative decrease
+            self.limit = max(self.minimum, self.limit * self.decrease_factor)
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+        metrics.registry.set_gauge("resume_llm_concurrency_limit", self.limit)
+
+
+class _Slot:
+    def __init__(self, limiter: "RateLimiter", estimated_tokens: int):
+        self._limiter = limiter
+        self.estimated_tokens = estimated_tokens
+
+    def succeeded(self, actual_tokens: int):
+        if self._limiter.tokens is not None:
+            self._limiter.tokens.adjust(self.estimated_tokens - actual_tokens)
+        self._limiter.concurrency.on_success()
+
+    def rate_limited(self, retry_after: Optional[float]):
+        metrics.registry.inc("resume_llm_rate_limited_total")
+        self._limiter.concurrency.on_overload(retry_after)
+
+
+class RateLimiter:
+    """requests/min + tokens/min buckets in front of AIMD concurrency."""
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 initial_concurrency: int = 8, max_concurrency: int = 64):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.concurrency = AdaptiveConcurrency(initial=initial_concurrency, maximum=max_concurrency)
+
+    @contextmanager
+    def slot(self, estimated_tokens: int):
+        """
+        Wait for request, token and concurrency budget, then hold one in-flight
+        slot for the duration of the call. Queue time is recorded as a metric.
+        """
+        waited = 0.0
+        if self.requests is not None:
+            waited += self.requests.acquire(1)
+        if self.tokens is not None:
+            waited += self.tokens.acquire(estimated_tokens)
+        waited += self.concurrency.acquire()
+        metrics.registry.observe("resume_llm_queue_seconds", waited, agent=metrics.current_stage())
+        try:
+            yield _Slot(self, estimated_tokens)
+        finally:
+            self.concurrency.release()
+
+    def try_reserve(self, estimated_tokens: int) -> bool:
+        """
+        Non-blocking slot(): take a request, the tokens and an in-flight slot
+        only if all are available now. The caller releases the in-flight slot
+        (concurrency.release()) once its call is done.
+        """
+        if self.requests is not None and self.requests.try_acquire(1) > 0:
+            return False
+        if self.tokens is not None and self.tokens.try_acquire(estimated_tokens) > 0:
+            if self.requests is not None:
+                self.requests.adjust(1)
+            return False
+        if not self.concurrency.try_acquire():
+            if self.requests is not None:
+                self.requests.adjust(1)
+            if self.tokens is not None:
+                self.tokens.adjust(estimated_tokens)
+            return False
+        return True
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 20.0) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Process-wide limiter configured from GROQ_RPM / GROQ_TPM / GROQ_MAX_CONCURRENCY (0 disables a bucket).
+    Those are account-wide limits: with uvicorn --workers N (WEB_CONCURRENCY) each worker gets 1/N of them.
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+            max_concurrency = max(1, int(os.getenv("GROQ_MAX_CONCURRENCY", "64")) // workers)
+            _limiter = RateLimiter(
+                requests_per_minute=float(os.getenv("GROQ_RPM", "1000")) / workers,
+                tokens_per_minute=float(os.getenv("GROQ_TPM", "300000")) / workers,
+                initial_concurrency=min(int(os.getenv("GROQ_INITIAL_CONCURRENCY", "8")), max_concurrency),
+                max_concurrency=max_concurrency,
+            )
+        return _limiter
@@ -0,0 +1,78 @@
+"""
+SingleFlight: coalesce identical in-flight calls.
+
+The first caller for a key (the leader) runs the call; callers arriving with
+the same key while it is in flight (followers) block until it finishes and get
+the same result, or the same exception. A follower waits no longer than its
+own request's deadline. Nothing is kept once the call returns; caching
+finished results is the job of src.utils.cache.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.utils import metrics
+from src.utils.deadline import DeadlineExceeded, current_deadline
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    def __init__(self, name: str = "llm"):
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run `fn` once per in-flight `key`. Returns (value, shared), where shared is True for followers."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                self.followers += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+        self._record("leader" if leader else "follower")
+
+        if not leader:
+            deadline = current_deadline()
+            if deadline is None:
+                call.done.wait()
+            elif not call.done.wait(max(0.0, deadline.remaining())):
+                deadline.skip(metrics.current_stage())
+                raise DeadlineExceeded(f"request budget ran out waiting for a shared {self.name} call")
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value = fn()
+            return call.value, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def coalescing_ratio(self) -> float:
+        """Share of calls that were served by another caller's upstream request."""
+        with self._lock:
+            total = self.leaders + self.followers
+            return self.followers / total if total else 0.0
+
+    def _record(self, role: str):
+        metrics.registry.inc("resume_singleflight_calls_total", flight=self.name, role=role, agent=metrics.current_stage())
+        metrics.registry.set_gauge("resume_singleflight_coalescing_ratio", self.coalescing_ratio(), flight=self.name)
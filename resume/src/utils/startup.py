@@ -0,0 +1,126 @@
+"""
+Startup: cold-start profiling and background warm-up for the API service.
+
+The service imports its heavy SDKs (Groq, google-cloud-storage, supabase,
+numpy/scipy for job matching)
+lazily, so `/` answers as soon as FastAPI is up. `warm_up()` then imports
+them in a background thread after start-up, so the first real request does
+not pay for them either.
+
+    python -m src.utils.startup            # slowest imports of `server`
+    python -m src.utils.startup --json     # same, machine readable
+
+The profile runs `python -X importtime` in a fresh interpreter, so it
+measures a real cold start rather than this process's module cache.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.utils import metrics
+
+# Imported on first use by the service; warmed in the background after start-up
+HEAVY_MODULES = ["groq", "google.cloud.storage", "google.auth", "supabase", "numpy", "scipy.sparse"]
+
+SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def profile_imports(module: str = "server", top: int = 15) -> Dict[str, Any]:
+    """
+    Import `module` in a fresh interpreter with -X importtime. Returns the
+    total import time, the `top` slowest imports by cumulative time, and
+    which HEAVY_MODULES the import pulled in.
+    """
+    env = dict(os.environ)
+    env.setdefault("GROQ_API_KEY", "startup-profile")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SERVICE_ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    imports: List[Dict[str, Any]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # the header row
+        imports.append({
+            "module": parts[2].strip(),
+            "self_ms": int(parts[0]) / 1000,
+            "cumulative_ms": int(parts[1]) / 1000,
+        })
+
+    loaded = {entry["module"] for entry in imports}
+    total = next((entry["cumulative_ms"] for entry in imports if entry["module"] == module), 0.0)
+    return {
+        "module": module,
+        "total_ms": total,
+        "slowest": sorted(imports, key=lambda e: e["cumulative_ms"], reverse=True)[:top],
+        "heavy_loaded": [name for name in HEAVY_MODULES if name in loaded],
+    }
+
+
+def record_cold_start(started: float):
+    """Export seconds since `started` (a perf_counter taken at the top of server.py)."""
+    elapsed = time.perf_counter() - started
+    metrics.registry.set_gauge("resume_cold_start_seconds", elapsed)
+    print(f"🚀 Service ready in {elapsed * 1000:.0f}ms")
+
+
+def warm_up(hooks: Optional[List[Callable[[], Any]]] = None):
+    """Import HEAVY_MODULES and run `hooks` (e.g. building the LLM client). Failures are logged, not raised."""
+    import importlib
+
+    start = time.perf_counter()
+    for name in HEAVY_MODULES:
+        module_start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"⚠️  Warm-up could not import {name}: {e}")
+            continue
+        metrics.registry.set_gauge("resume_warmup_seconds", time.perf_counter() - module_start, module=name)
+    for hook in hooks or []:
+        try:
+            hook()
+        except Exception as e:
+            print(f"⚠️  Warm-up hook {getattr(hook, '__name__', hook)} failed: {e}")
+    print(f"🔥 Warm-up finished in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+
+def start_warm_up(hooks: Optional[List[Callable[[], Any]]] = None) -> threading.Thread:
+    thread = threading.Thread(target=warm_up, args=(hooks,), name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the service's cold-start imports")
+    parser.add_argument("module", nargs="?", default="server")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="Print the profile as JSON")
+    args = parser.parse_args()
+
+    profile = profile_imports(args.module, args.top)
+    if args.json:
+        print(json.dumps(profile, indent=2))
+        return
+    print(f"\nimport {profile['module']}: {profile['total_ms']:.1f}ms")
+    print(f"{'cumulative':>12} {'self':>9}  module")
+    for entry in profile["slowest"]:
+        print(f"{entry['cumulative_ms']:>10.1f}ms {entry['self_ms']:>7.1f}ms  {entry['module']}")
+    if profile["heavy_loaded"]:
+        print(f"\n⚠️  Imported eagerly: {', '.join(profile['heavy_loaded'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,3 +15,21 @@ def latextxt(text):
         "\\": "\\textbackslash{}"
     }
     return "".join(chars.get(c, c) for c in str(text))
+
+
+def latexurl(url):
+    if not url:
+        return ""
+    # \href targets sit inside macro arguments and tabular cells, where a bare
+    # % starts a comment and # or & break the surrounding command
+    chars = {
+        "%": "\\%",
+        "#": "\\#",
+        "&": "\\&",
+        " ": "\\%20",
+        "{": "\\%7B",
+        "}": "\\%7D",
+        "^": "\\%5E",
+        "\\": "\\%5C"
+    }
+    return "".join(chars.get(c, c) for c in str(url).strip())
@@ -0,0 +1,142 @@
+"""
+Usage: request-scoped accounting of LLM token usage, latency and cost.
+
+LLMClient records every call into the UsageScope active in the current
+context (a contextvar), so concurrent requests sharing one client never mix
+their numbers. When a scope carrying a user id closes, its totals are rolled
+up into the process-wide UsageLedger for quota checks and capacity planning.
+The ledger is not shared between uvicorn workers: each enforces the quota on
+its own totals, so N workers allow up to N x USER_TOKEN_QUOTA per user.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {"calls": 0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0, "llm_latency_ms": 0.0}
+
+
+def _add(totals: Dict[str, Any], calls: int, input_tokens: int, output_tokens: int, cost_usd: float, latency_ms: float):
+    totals["calls"] += calls
+    totals["input_tokens"] += input_tokens
+    totals["output_tokens"] += output_tokens
+    totals["cost_usd"] += cost_usd
+    totals["llm_latency_ms"] += latency_ms
+
+
+class UsageScope:
+    """Token and latency totals for one unit of work (usually one request)."""
+
+    def __init__(self, user_id: Optional[str] = None):
+        self.user_id = user_id
+        self.totals = _empty_totals()
+        self.by_stage: Dict[str, Dict[str, Any]] = {}
+        self.by_model: Dict[str, Dict[str, Any]] = {}
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def record(self, model: str, stage: str, latency: float, input_tokens: int, output_tokens: int,
+               cost_usd: float) -> bool:
+        """Add one call. Returns False, recording nothing, once the scope has closed."""
+        latency_ms = latency * 1000
+        with self._lock:
+            if self.closed:
+                return False
+            _add(self.totals, 1, input_tokens, output_tokens, cost_usd, latency_ms)
+            _add(self.by_stage.setdefault(stage, _empty_totals()), 1, input_tokens, output_tokens, cost_usd, latency_ms)
+            _add(self.by_model.setdefault(model, _empty_totals()), 1, input_tokens, output_tokens, cost_usd, latency_ms)
+        return True
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+
+    def summary(self) -> Dict[str, Any]:
+        def rounded(totals):
+            out = dict(totals)
+            out["total_tokens"] = out["input_tokens"] + out["output_tokens"]
+            out["cost_usd"] = round(out["cost_usd"], 6)
+            out["llm_latency_ms"] = round(out["llm_latency_ms"], 1)
+            return out
+
+        with self._lock:
+            result = rounded(self.totals)
+            result["by_stage"] = {k: rounded(v) for k, v in self.by_stage.items()}
+            result["by_model"] = {k: rounded(v) for k, v in self.by_model.items()}
+            return result
+
+
+class UsageLedger:
+    """Cumulative per-user totals. Cheap to update: one dict entry per user."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, user_id: str, scope: UsageScope):
+        t = scope.totals
+        with self._lock:
+            totals = self._users.setdefault(user_id, dict(_empty_totals(), requests=0))
+            totals["requests"] += 1
+            _add(totals, t["calls"], t["input_tokens"], t["output_tokens"], t["cost_usd"], t["llm_latency_ms"])
+
+    def add_call(self, user_id: str, input_tokens: int, output_tokens: int, cost_usd: float):
+        """Charge one call that finished after its request (e.g. the losing side of a hedge)."""
+        with self._lock:
+            totals = self._users.setdefault(user_id, dict(_empty_totals(), requests=0))
+            _add(totals, 1, input_tokens, output_tokens, cost_usd, 0.0)
+
+    def get(self, user_id: str) -> Dict[str, Any]:
+        with self._lock:
+            totals = dict(self._users.get(user_id) or dict(_empty_totals(), requests=0))
+        totals["total_tokens"] = totals["input_tokens"] + totals["output_tokens"]
+        totals["cost_usd"] = round(totals["cost_usd"], 6)
+        totals["llm_latency_ms"] = round(totals["llm_latency_ms"], 1)
+        return totals
+
+    def exceeds(self, user_id: str, max_tokens: int) -> bool:
+        """Quota check: True once a user's cumulative tokens pass max_tokens."""
+        with self._lock:
+            totals = self._users.get(user_id)
+            return bool(totals) and totals["input_tokens"] + totals["output_tokens"] >= max_tokens
+
+
+# Per-process (per-worker) per-user rollup
+ledger = UsageLedger()
+
+_current_scope: ContextVar[Optional[UsageScope]] = ContextVar("usage_scope", default=None)
+
+
+def current_usage() -> Optional[UsageScope]:
+    return _current_scope.get()
+
+
+def record_call(model: str, stage: str, latency: float, input_tokens: int, output_tokens: int, cost_usd: float):
+    """
+    Record an LLM call into the active scope, if any. A call that outlives its
+    request's scope is charged to the user's ledger entry instead.
+    """
+    scope = _current_scope.get()
+    if scope is not None and not scope.record(model, stage, latency, input_tokens, output_tokens, cost_usd):
+        if scope.user_id:
+            ledger.add_call(scope.user_id, input_tokens, output_tokens, cost_usd)
+
+
+@contextmanager
+def usage_scope(user_id: Optional[str] = None):
+    """
+    Open a usage scope for the current context. On exit, totals are rolled up
+    into the ledger when a user id is known.
+    """
+    scope = UsageScope(user_id)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+        scope.close()
+        if user_id:
+            ledger.add(user_id, scope)
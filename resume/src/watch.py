@@ -0,0 +1,174 @@
+"""
+ResumeWatcher: `python main.py --watch` regenerates the resume on every edit.
+
+The one-shot CLI runs intake, expansion, analysis, categorization,
+enhancement and a full compile each time. The watcher keeps one process up,
+so the LLM client (and its HTTP connections), the Jinja environment and the
+per-item agent caches stay warm between edits. It polls the profile and the
+template directory for mtime changes, and on each change diffs the new
+Resume against the previous one, field by field:
+
+- Only fields no agent reads changed (personal_info, education,
+  certifications, languages): they are copied onto the last processed
+  resume and no agent runs.
+- Anything else changed: the pipeline runs. Its per-item caches send only
+  the changed items to the LLM, so an edited bullet re-expands and
+  re-enhances that one item, and an edited JD re-parses the JD.
+- Only the template changed: the last processed resume is re-rendered.
+
+Each cycle ends with a render and a line of per-stage timings. A cycle that
+fails (invalid profile, template error, pipeline or compile error) is
+reported and the watcher keeps going with the last good PDF.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from src.generators.resume_generator import ResumeGenerator
+from src.pipeline import ResumePipeline
+from src.schemas.resume_schema import Resume
+from src.utils import metrics
+from src.utils.llm_client import LLMClient
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# Resume field -> pipeline stages that read it (see ResumePipeline.run)
+FIELD_STAGES: Dict[str, List[str]] = {
+    "experience": ["expand", "enhance"],
+    "projects": ["expand", "enhance"],
+    "custom_sections": ["expand"],
+    "skills": ["categorize", "analyze", "expand", "enhance"],
+    "job_description": ["jd_parse", "analyze", "enhance"],
+    "summary": ["enhance"],
+}
+
+# Editors often write a file in several steps; wait this long for it to settle
+DEBOUNCE_S = 0.2
+
+
+def changed_fields(previous: Optional[Resume], current: Resume) -> Set[str]:
+    """Top-level Resume fields that differ (all of them when there is no previous run)."""
+    if previous is None:
+        return set(Resume.model_fields)
+    before, after = previous.model_dump(), current.model_dump()
+    return {name for name in after if before.get(name) != after[name]}
+
+
+class ResumeWatcher:
+    def __init__(self, profile_path: str, llm: LLMClient, generator: Optional[ResumeGenerator] = None,
+                 output_path: Optional[str] = None, interval: float = 1.0):
+        self.profile_path = profile_path
+        self.pipeline = ResumePipeline(llm)
+        self.generator = generator or ResumeGenerator()
+        self.output_path = output_path or os.path.join(self.generator.output_dir, "my_resume.pdf")
+        self.interval = interval
+        self.previous_input: Optional[Resume] = None
+        self.processed: Optional[Resume] = None
+        self.cycles = 0
+        self._mtimes: Dict[str, float] = {}
+
+    def watched_files(self) -> List[str]:
+        files = [self.profile_path]
+        if os.path.isdir(TEMPLATE_DIR):
+            files += [os.path.join(TEMPLATE_DIR, name) for name in sorted(os.listdir(TEMPLATE_DIR))
+                      if name.endswith(".j2")]
+        return files
+
+    def changed_files(self) -> List[str]:
+        """Watched files whose mtime changed since the last call (first call: all that exist)."""
+        changed = []
+        for path in self.watched_files():
+            try:
+                mtime = os.stat(path).st_mtime
+            except FileNotFoundError:
+                mtime = -1.0
+            if self._mtimes.get(path) != mtime:
+                self._mtimes[path] = mtime
+                if mtime >= 0:
+                    changed.append(path)
+        return changed
+
+    def run(self):
+        print(f"👀 Watching {self.profile_path} and {TEMPLATE_DIR} (Ctrl+C to stop)")
+        try:
+            while True:
+                try:
+                    changed = self.changed_files()
+                    if changed:
+                        time.sleep(DEBOUNCE_S)
+                        changed += [path for path in self.changed_files() if path not in changed]
+                        self.cycle(changed)
+                except Exception as e:
+                    # e.g. the template directory vanished mid-listing; try again next tick
+                    print(f"⚠️  Watch error: {type(e).__name__}: {e}")
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            print("\n👋 Stopped watching.")
+
+    def cycle(self, changed_files: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Regenerate after `changed_files` changed. Returns what was done, or None if
+        the profile is unusable or regenerating failed (the last PDF is kept).
+        """
+        self.cycles += 1
+        trace = metrics.start_trace("WATCH", self.profile_path)
+        names = ", ".join(os.path.basename(path) for path in changed_files)
+        print(f"\n🔄 [{time.strftime('%H:%M:%S')}] Cycle {self.cycles}: {names} changed")
+
+        try:
+            with open(self.profile_path, "r") as f:
+                resume = Resume.model_validate(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not load {self.profile_path}: {e}")
+            print("   Fix the file and save again; the last PDF is left as it was.")
+            return None
+
+        try:
+            return self._regenerate(resume, trace)
+        except Exception as e:
+            # A template syntax error, a failed pipeline call or a compile error must not end the session
+            print(f"❌ Cycle {self.cycles} failed: {type(e).__name__}: {e}")
+            print(f"   Fix it and save again; {self.output_path} is left as it was.")
+            return None
+
+    def _regenerate(self, resume: Resume, trace: metrics.RequestTrace) -> Dict[str, Any]:
+        fields = changed_fields(self.previous_input, resume)
+        stages = sorted({stage for name in fields for stage in FIELD_STAGES.get(name, [])})
+        recomputed: Dict[str, List[str]] = {}
+        if self.processed is None or stages:
+            if self.processed is None:
+                print("   First run -> full pipeline")
+            else:
+                print(f"   Changed: {', '.join(sorted(fields))} -> pipeline (affects {', '.join(stages)}; "
+                      "unchanged items come from cache)")
+            result = self.pipeline.run(resume)
+            self.processed = result.resume
+            recomputed = {stage: items for stage, items in result.recomputed.items() if items}
+            if result.analysis and result.analysis.get("missing_skills"):
+                print(f"   Missing skills for the JD: {', '.join(result.analysis['missing_skills'])}")
+        elif fields:
+            print(f"   Changed: {', '.join(sorted(fields))} -> no agents affected, re-rendering")
+            self.processed = self.processed.model_copy(update={name: getattr(resume, name) for name in fields})
+        else:
+            print("   Profile unchanged -> re-rendering")
+        self.previous_input = resume
+
+        pdf = self.generator.render_pdf(self.processed)
+        if pdf is None:
+            print("❌ PDF generation failed (see the compile log above).")
+        else:
+            with open(self.output_path, "wb") as f:
+                f.write(pdf)
+            print(f"📄 Wrote {self.output_path}")
+
+        self._print_timings(trace, recomputed)
+        return {"fields": fields, "stages": stages, "recomputed": recomputed, "pdf": pdf is not None}
+
+    def _print_timings(self, trace: metrics.RequestTrace, recomputed: Dict[str, List[str]]):
+        record = trace.to_log_record(200)
+        timings = " · ".join(f"{name} {ms:.0f}ms" for name, ms in record["stages_ms"].items())
+        print(f"⏱️  {timings or 'no stages'} · total {record['duration_ms']:.0f}ms · {record['llm_calls']} LLM call(s)")
+        if recomputed:
+            print("   Sent to the LLM: " + "; ".join(f"{stage}: {', '.join(items)}" for stage, items in recomputed.items()))
@@ -0,0 +1,24 @@
+import sys
+import os
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_pipeline import run_benchmark
+
+
+def test_offline_benchmark_runs_without_groq(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", os.environ.get("GROQ_API_KEY") or "offline-benchmark")
+    monkeypatch.setenv("CACHE_MAX_ENTRIES", "0")
+    results = run_benchmark(
+        endpoints=["process"],
+        sizes=["small", "medium"],
+        concurrencies=[2],
+        requests=4,
+        per_size=1,
+    )
+    assert len(results) == 2
+    for result in results:
+        assert result["errors"] == 0
+        assert result["throughput_rps"] > 0
+        assert result["p50_ms"] <= result["p99_ms"]
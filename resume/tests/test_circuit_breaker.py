@@ -0,0 +1,108 @@
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from groq import APIConnectionError
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "offline-test")
+
+from src.utils import llm_client as llm_module
+from src.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.utils.llm_client import LLMClient
+
+
+def test_breaker_opens_after_consecutive_failures_and_recovers():
+    breaker = CircuitBreaker("test-dep", failure_threshold=2, recovery_seconds=0.05)
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            with breaker.guard():
+                raise ValueError("down")
+    assert breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.check()
+    assert excinfo.value.dependency == "test-dep"
+
+    time.sleep(0.06)
+    # Half open: exactly one probe goes out, and its success closes the circuit
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = CircuitBreaker("test-dep", failure_threshold=1, recovery_seconds=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow() and breaker.state == "half_open"
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+class UnreachableGroq:
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        self.calls += 1
+        raise APIConnectionError(request=httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions"))
+
+
+def test_llm_client_fails_fast_once_groq_circuit_opens(monkeypatch):
+    monkeypatch.setattr(llm_module, "backoff_delay", lambda attempt: 0.0)
+    llm = LLMClient()
+    llm.single_flight = None
+    llm.client = UnreachableGroq()
+    llm.breaker = CircuitBreaker("groq-test", failure_threshold=2, recovery_seconds=60)
+
+    with pytest.raises(CircuitOpenError):
+        llm.generate("s", "u")
+    assert llm.client.calls == 2
+
+    # Later calls never reach the network while the circuit is open
+    with pytest.raises(CircuitOpenError):
+        llm.generate("s", "u2")
+    assert llm.client.calls == 2
+
+
+def test_open_groq_circuit_fails_process_with_503(monkeypatch):
+    from fastapi.testclient import TestClient
+    import server
+
+    breaker = CircuitBreaker("groq-503-test", failure_threshold=1, recovery_seconds=60)
+    breaker.record_failure()
+    monkeypatch.setattr(server.get_llm(), "breaker", breaker)
+    monkeypatch.setattr(server.get_llm(), "client", UnreachableGroq())
+
+    resume = {
+        "personal_info": {"name": "Open Circuit", "email": "open@example.com"},
+        "experience": [{"company": "Down Co", "role": "Dev", "start_date": "2020", "end_date": "2022",
+                        "details": ["Built the billing API", "Cut page load time in half"]}],
+        "skills": [{"category": "Skills", "skills": ["Python", "SQL"]}],
+        "job_description": f"Python developer for an outage drill {time.time()}",
+    }
+    response = TestClient(server.app).post("/process", json=resume)
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert server.get_llm().client.calls == 0
+
+
+def test_deferred_uploads_are_replayed_in_batches(monkeypatch):
+    from src.utils import cloud_storage
+
+    replayed = []
+    monkeypatch.setattr(cloud_storage, "sync_resume_gcs_path", lambda *args, **kwargs: replayed.append(args))
+    monkeypatch.setattr(cloud_storage, "_deferred", type(cloud_storage._deferred)(maxlen=500))
+    for n in range(25):
+        cloud_storage._defer("sync", "user", f"resume-{n}", f"resumes/user/resume-{n}.pdf")
+
+    cloud_storage.flush_deferred(batch=10)
+    assert [args[1] for args in replayed] == [f"resume-{n}" for n in range(10)]
+    assert cloud_storage.deferred_count() == 15
@@ -0,0 +1,57 @@
+import sys
+import os
+import time
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "offline-test")
+
+from benchmarks.corpus import make_resume
+from benchmarks.fake_llm import FakeGroqClient
+from src.pipeline import ResumePipeline
+from src.utils.cache import get_cache
+from src.utils.deadline import Deadline, deadline_scope, current_deadline
+from src.utils.llm_client import LLMClient
+
+
+def test_deadline_tracks_remaining_budget_and_skips():
+    deadline = Deadline(0.2)
+    assert 0 < deadline.remaining() <= 0.2
+    assert deadline.summary() is None
+    deadline.skip("enhance:e0")
+    deadline.skip("enhance:e0")
+    time.sleep(0.21)
+    assert deadline.expired()
+    assert not deadline.allows("enhance")
+    summary = deadline.summary()
+    assert summary["skipped"] == ["enhance:e0"]
+    assert summary["budget_ms"] == 200
+
+
+def test_deadline_scope_is_optional():
+    with deadline_scope(None) as deadline:
+        assert deadline is None and current_deadline() is None
+    with deadline_scope(1.0) as deadline:
+        assert current_deadline() is deadline
+    assert current_deadline() is None
+
+
+def test_pipeline_returns_partial_resume_within_budget():
+    for name in ("jd_parse", "expand", "analyze", "categorize", "enhance"):
+        get_cache(name).clear()
+    llm = LLMClient()
+    llm.single_flight = None
+    llm.client = FakeGroqClient(latency_ms=300)
+    resume = make_resume("small", seed=7)
+
+    start = time.perf_counter()
+    with deadline_scope(0.5):
+        result = ResumePipeline(llm).run(resume)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1.0
+    assert result.degraded is not None
+    assert any(item.startswith("enhance") for item in result.degraded["skipped"])
+    # The partial resume still carries everything that did finish
+    assert result.resume.personal_info == resume.personal_info
+    assert len(result.resume.experience) == len(resume.experience)
@@ -0,0 +1,73 @@
+import sys
+import os
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agents.enhancer_agent import EnhancerAgent
+from src.schemas.enhancement_schema import EnhancementPatch, BulletPatch
+from src.schemas.resume_schema import Resume, PersonalInfo, ExperienceItem, ProjectItem
+from src.utils import dedup
+from src.utils.cache import MemoryCache
+
+
+class RewritingLLM:
+    """Rewrites every REWRITE key it is shown; counts calls."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate_json(self, system_prompt, user_prompt, schema, temperature=0.1, task=None):
+        self.prompts.append(user_prompt)
+        section = user_prompt.split("REWRITE", 1)[1].split("JOB DESCRIPTION", 1)[0]
+        keys = [line.strip()[1:].split("]", 1)[0] for line in section.splitlines() if line.strip().startswith("[")]
+        return EnhancementPatch(patches=[BulletPatch(key=key, text=f"Distinct outcome number {i} for {key}")
+                                         for i, key in enumerate(keys)])
+
+
+def make_resume():
+    return Resume(
+        personal_info=PersonalInfo(name="Dup User", email="dup@example.com"),
+        experience=[
+            ExperienceItem(company="A", role="Dev", start_date="2020", end_date="2021",
+                           details=["Built REST APIs with FastAPI serving 1M requests per day",
+                                    "Mentored 4 junior engineers on code review practices"]),
+            ExperienceItem(company="B", role="Dev", start_date="2021", end_date="2022",
+                           details=["Built REST APIs using FastAPI, serving 1M requests daily",
+                                    "Reduced p99 latency by 40% by adding Redis caching"]),
+        ],
+        projects=[ProjectItem(name="Cache", details=["Cut p99 latency 40% through Redis caching",
+                                                      "Wrote tests"])],
+    )
+
+
+def test_near_duplicates_are_found_and_distinct_bullets_are_not():
+    pairs = dedup.find_duplicates(dedup.bullets(make_resume()))
+    assert [(a, b) for a, b, _ in pairs] == [("e0.0", "e1.0"), ("e1.1", "p0.0")]
+    # Half the words in common, but only two of them: too short to call a duplicate
+    assert dedup.similarity("Unit: Wrote tests", "Unit: Improved tests") == 0.5
+    assert dedup.find_duplicates({"a": "Unit: Wrote tests", "b": "Unit: Improved tests"}) == []
+
+
+def test_only_offending_bullets_are_rewritten_in_one_call():
+    llm = RewritingLLM()
+    enhancer = EnhancerAgent(llm)
+    # A private cache: the benchmark module sizes process-wide caches to 0 when imported
+    enhancer.dedup_cache = MemoryCache("dedup")
+    resume = make_resume()
+    flagged = enhancer.duplicate_bullets(resume)
+    assert flagged == {"e1.0": ["e0.0"], "p0.0": ["e1.1"]}
+
+    enhancer.rewrite_duplicates(resume, flagged, "Backend role")
+    assert len(llm.prompts) == 1
+    assert enhancer.deduplicated == ["e1.0", "p0.0"]
+    assert resume.experience[1].details[0] == "Distinct outcome number 0 for e1.0"
+    assert resume.projects[0].details == ["Distinct outcome number 1 for p0.0", "Wrote tests"]
+    assert resume.experience[0].details == make_resume().experience[0].details
+    assert enhancer.duplicate_bullets(resume) == {}
+
+    # The same duplicates again come from the cache
+    again = make_resume()
+    enhancer.rewrite_duplicates(again, enhancer.duplicate_bullets(again), "Backend role")
+    assert len(llm.prompts) == 1
+    assert again.projects[0].details[0] == "Distinct outcome number 1 for p0.0"
@@ -0,0 +1,50 @@
+import sys
+import os
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agents.enhancer_agent import EnhancerAgent
+from src.schemas.enhancement_schema import EnhancementPatch, BulletPatch
+from src.schemas.resume_schema import Resume, PersonalInfo, ExperienceItem, ProjectItem, CertificationItem
+
+
+def make_resume():
+    return Resume(
+        personal_info=PersonalInfo(name="Test User", email="test@example.com"),
+        experience=[ExperienceItem(company="Co", role="Dev", start_date="2020", end_date="2022",
+                                   details=["Wrote code.", "Fixed bugs."])],
+        projects=[ProjectItem(name="Tool", technologies=["Python"], details=["Built a tool."])],
+        certifications=[CertificationItem(name="Cert", issuer="Org", date="2021")],
+        summary="Developer.",
+    )
+
+
+def test_compact_sections_only_contains_rewriteable_content():
+    sections = EnhancerAgent(llm=None)._compact_sections(make_resume())
+    assert "[e0.1] Fixed bugs." in sections
+    assert "[p0.0] Built a tool." in sections
+    assert "SUMMARY: Developer." in sections
+    assert "Cert" not in sections
+    assert "test@example.com" not in sections
+
+
+def test_apply_patch_replaces_keyed_bullets_only():
+    resume = make_resume()
+    patch = EnhancementPatch(
+        summary="Backend developer.",
+        patches=[
+            BulletPatch(key="e0.1", text="Fixed 40 production bugs."),
+            BulletPatch(key="[p0.0]", text="Built a CLI tool in Python."),
+            BulletPatch(key="e5.0", text="Ignored: no such item."),
+        ],
+    )
+    enhancer = EnhancerAgent(llm=None)
+    values = enhancer._patch_values(resume, patch, set(enhancer._items(resume)))
+    enhanced = enhancer.apply_values(resume.model_copy(deep=True), values)
+    assert enhanced.experience[0].details == ["Wrote code.", "Fixed 40 production bugs."]
+    assert enhanced.projects[0].details == ["Built a CLI tool in Python."]
+    assert enhanced.summary == "Backend developer."
+    assert enhanced.certifications == resume.certifications
+    # The input resume is left untouched
+    assert resume.experience[0].details[1] == "Fixed bugs."
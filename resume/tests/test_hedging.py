@@ -0,0 +1,94 @@
+import sys
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "offline-test")
+
+from src.utils import hedging
+from src.utils.hedging import HedgePolicy, hedged_call
+from src.utils.llm_client import LLMClient
+
+
+def test_slow_primary_is_beaten_by_hedge():
+    delays = iter([1.0, 0.01])
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            delay = next(delays)
+        time.sleep(delay)
+        return delay
+
+    discarded = []
+    start = time.perf_counter()
+    result, hedged = hedged_call(call, 0.05, lambda: True, on_discarded=discarded.append)
+    assert hedged and result == 0.01
+    assert time.perf_counter() - start < 0.5
+    time.sleep(1.1)
+    assert discarded == [1.0]
+
+
+def test_fast_call_is_not_hedged():
+    calls = []
+    result, hedged = hedged_call(lambda: calls.append(1) or "ok", 0.5, lambda: True)
+    assert (result, hedged) == ("ok", False)
+    assert len(calls) == 1
+
+
+def test_hedge_releases_its_reservation_after_both_calls():
+    delays = iter([0.3, 0.01])
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            delay = next(delays)
+        time.sleep(delay)
+        return delay
+
+    finished = threading.Event()
+    result, hedged = hedged_call(call, 0.05, lambda: True, on_hedge_finished=finished.set)
+    assert hedged and result == 0.01
+    assert not finished.is_set()  # the slow primary still holds the hedge's slot
+    assert finished.wait(1.0)
+
+
+def test_no_hedge_without_a_free_hedge_thread(monkeypatch):
+    monkeypatch.setattr(hedging, "_hedge_threads", threading.BoundedSemaphore(1))
+    hedging._hedge_threads.acquire()
+    allowed = []
+    result, hedged = hedged_call(lambda: time.sleep(0.1) or "ok", 0.01, lambda: allowed.append(1) or True)
+    assert (result, hedged) == ("ok", False)
+    assert allowed == []  # no limiter slot was reserved either
+
+
+def test_hedge_budget_caps_hedge_rate():
+    policy = HedgePolicy(after_seconds=0.1, max_ratio=0.1)
+    for _ in range(20):
+        policy.record_call()
+    granted = sum(policy.try_hedge() for _ in range(10))
+    assert granted == 3  # 10% of 20 calls, plus one
+
+
+class TimeoutRecordingGroq:
+    def __init__(self):
+        self.kwargs = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        self.kwargs.append(kwargs)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))],
+            usage=SimpleNamespace(prompt_tokens=1, completion_tokens=1),
+        )
+
+
+def test_every_call_carries_a_deadline():
+    llm = LLMClient()
+    llm.client = TimeoutRecordingGroq()
+    llm.call_timeout = 7.5
+    assert llm.generate("s", "u") == "ok"
+    assert llm.client.kwargs[0]["timeout"] == 7.5
@@ -0,0 +1,78 @@
+import sys
+import os
+import asyncio
+
+import pytest
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "offline-test")
+
+import server
+from src.utils.idempotency import IdempotencyConflict, IdempotencyStore, scoped_key
+from tests.test_process_and_generate import FAKE_PDF, RecordingGenerator, _client, _request
+
+
+def test_retries_attach_to_the_running_computation_then_replay():
+    store = IdempotencyStore("idempotency_test")
+    store.results.clear()
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return {"answer": 42}
+
+    async def scenario():
+        first, retry = await asyncio.gather(store.run("k1", "fp", compute), store.run("k1", "fp", compute))
+        later = await store.run("k1", "fp", compute)
+        return first, retry, later
+
+    first, retry, later = asyncio.run(scenario())
+    assert len(runs) == 1
+    assert first == ({"answer": 42}, "new")
+    assert retry == ({"answer": 42}, "attached")
+    assert later == ({"answer": 42}, "replayed")
+    assert store.in_flight() == 0
+
+    with pytest.raises(IdempotencyConflict):
+        asyncio.run(store.run("k1", "other-fp", compute))
+
+
+def test_failures_are_not_stored():
+    store = IdempotencyStore("idempotency_test")
+    store.results.clear()
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream down")
+        return "ok"
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(store.run("k2", "fp", flaky))
+    assert asyncio.run(store.run("k2", "fp", flaky)) == ("ok", "new")
+
+    with pytest.raises(ValueError):
+        scoped_key("   ", "/process")
+
+
+def test_generate_replays_pdf_and_rejects_reused_key(monkeypatch):
+    client = _client(monkeypatch)
+    uploads = []
+    monkeypatch.setattr(server, "upload_resume_to_gcs", lambda *args: uploads.append(args))
+    body = _request()
+    headers = {"Idempotency-Key": "gen-retry-1"}
+
+    first = client.post("/generate", json=body, headers=headers)
+    retry = client.post("/generate", json=body, headers=headers)
+    assert first.status_code == retry.status_code == 200
+    assert first.content == retry.content == FAKE_PDF
+    assert "idempotent-replayed" not in first.headers
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert len(RecordingGenerator.rendered) == 1
+    assert len(uploads) == 1
+
+    body["resume_id"] = "r2"
+    assert client.post("/generate", json=body, headers=headers).status_code == 422
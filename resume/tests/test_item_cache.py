@@ -0,0 +1,101 @@
+import sys
+import os
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agents.enhancer_agent import EnhancerAgent
+from src.agents.expander_agent import ExpanderAgent
+from src.schemas.enhancement_schema import EnhancementPatch, BulletPatch
+from src.schemas.resume_schema import Resume, PersonalInfo, ExperienceItem, ProjectItem
+from src.utils.cache import MemoryCache, fingerprint
+
+
+class PatchingLLM:
+    """Rewrites every bullet it is shown by prefixing it, and records the prompts."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate_json(self, system_prompt, user_prompt, schema, temperature=0.1, task=None):
+        self.prompts.append(user_prompt)
+        patches = []
+        for line in user_prompt.splitlines():
+            line = line.strip()
+            if line.startswith("[") and "] " in line:
+                key, text = line[1:].split("] ", 1)
+                patches.append(BulletPatch(key=key, text=f"Improved: {text}"))
+        return EnhancementPatch(patches=patches)
+
+    def generate(self, system_prompt, user_prompt, temperature=0.7, task=None):
+        self.prompts.append(user_prompt)
+        return "Generated bullet one\nGenerated bullet two\nGenerated bullet three"
+
+
+def make_resume():
+    return Resume(
+        personal_info=PersonalInfo(name="Test User", email="test@example.com"),
+        experience=[
+            ExperienceItem(company="Co", role="Dev", start_date="2020", end_date="2022", details=["Wrote code."]),
+            ExperienceItem(company="Other", role="Dev", start_date="2018", end_date="2020", details=["Fixed bugs."]),
+        ],
+        projects=[ProjectItem(name="Tool", technologies=["Python"], details=["Built a tool."])],
+    )
+
+
+def make_enhancer(llm):
+    enhancer = EnhancerAgent(llm)
+    enhancer.cache = MemoryCache("test_enhance")
+    return enhancer
+
+
+def test_fingerprint_is_stable_and_content_sensitive():
+    assert fingerprint("a", {"x": 1, "y": 2}) == fingerprint("a", {"y": 2, "x": 1})
+    assert fingerprint(make_resume()) != fingerprint(make_resume().model_copy(update={"summary": "x"}))
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache("test_lru", max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_enhance_only_recomputes_edited_item():
+    llm = PatchingLLM()
+    enhancer = make_enhancer(llm)
+    first = enhancer.enhance(make_resume(), "Python backend")
+    assert enhancer.recomputed == ["e0", "e1", "p0"]
+
+    edited = make_resume()
+    edited.experience[1].details = ["Fixed many bugs."]
+    second = enhancer.enhance(edited, "Python backend")
+    assert enhancer.recomputed == ["e1"]
+    assert "[e0.0]" not in llm.prompts[-1] and "[p0.0]" not in llm.prompts[-1]
+    assert second.experience[0].details == first.experience[0].details
+    assert second.experience[1].details == ["Improved: Fixed many bugs."]
+
+    # Resubmitting the enhanced output does not rewrite it again
+    calls = len(llm.prompts)
+    third = enhancer.enhance(second, "Python backend")
+    assert enhancer.recomputed == []
+    assert len(llm.prompts) == calls
+    assert third.experience == second.experience
+
+
+def test_expand_reuses_bullets_for_unchanged_items():
+    llm = PatchingLLM()
+    expander = ExpanderAgent(llm)
+    expander.cache = MemoryCache("test_expand")
+    expander.expand(make_resume())
+    first_calls = len(llm.prompts)
+    assert first_calls == 3
+
+    edited = make_resume()
+    edited.projects[0].name = "Renamed Tool"
+    expander.expand(edited)
+    assert expander.recomputed == ["projects[0]"]
+    assert len(llm.prompts) == first_calls + 1
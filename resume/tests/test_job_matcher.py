@@ -0,0 +1,75 @@
+import sys
+import os
+
+import pytest
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "offline-test")
+
+pytest.importorskip("scipy")
+
+from fastapi.testclient import TestClient
+
+import server
+from benchmarks.corpus import make_resume, JOB_DESCRIPTION
+from src.schemas.parsed_jd_schema import ParsedJobDescription
+from src.schemas.resume_schema import PersonalInfo, Resume, SkillCategory
+from src.search.job_matcher import JobIndex
+from src.search.text import skill_key
+from src.utils import metrics
+
+JOBS = [
+    "Frontend developer: React, TypeScript and CSS. Figma experience a plus.",
+    JOB_DESCRIPTION,
+    ParsedJobDescription(primary_technical_skills=["Golang", "Kubernetes"], secondary_technical_skills=["Terraform"],
+                         key_responsibilities=["Run our k8s platform"]),
+    "Data scientist with PyTorch, NLP and Spark.",
+]
+
+
+def test_best_posting_ranks_first_with_skill_gaps():
+    matches = JobIndex(JOBS, ids=["fe", "backend", "platform", "ds"]).match(make_resume("medium", seed=1), top_k=2)
+    assert [m["id"] for m in matches][0] == "backend"
+    assert len(matches) == 2
+    best = matches[0]
+    assert {"Python", "FastAPI", "PostgreSQL"} <= set(best["matched_skills"])
+    assert not set(best["matched_skills"]) & set(best["missing_skills"])
+    assert best["score"] >= matches[1]["score"]
+
+
+def test_build_and_match_latency_are_observed_in_seconds(monkeypatch):
+    registry = metrics.MetricsRegistry()
+    monkeypatch.setattr(metrics, "registry", registry)
+    JobIndex(JOBS).match(make_resume("small", seed=2), top_k=1)
+    assert registry.histogram_count("resume_job_index_build_seconds") == 1
+    assert registry.histogram_count("resume_job_match_seconds") == 1
+    # A small index builds and matches well under a second
+    assert registry.quantile("resume_job_index_build_seconds", 1.0) <= 1.0
+    assert registry.quantile("resume_job_match_seconds", 1.0) <= 1.0
+
+
+def test_aliases_fold_to_one_skill():
+    assert skill_key("Golang") == skill_key("go")
+    assert skill_key("K8s") == skill_key("Kubernetes")
+    resume = Resume(personal_info=PersonalInfo(name="A", email="a@b.c"),
+                    skills=[SkillCategory(category="Tools", skills=["go", "k8s"])])
+    match = JobIndex(JOBS).match(resume, top_k=1)[0]
+    assert match["id"] == "2"
+    assert match["matched_skills"] == ["Go", "Kubernetes"]
+    assert match["missing_skills"] == ["Terraform"]
+
+
+def test_endpoint_reuses_the_index():
+    client = TestClient(server.app)
+    postings = [{"id": "backend", "text": JOB_DESCRIPTION},
+                {"id": "platform", "parsed": JOBS[2].model_dump()}]
+    index_id = client.post("/match/jobs/index", json={"jobs": postings}).json()["index_id"]
+    resume = make_resume("small", seed=2).model_dump(mode="json")
+
+    response = client.post("/match/jobs", json={"resume": resume, "index_id": index_id, "top_k": 5})
+    assert response.status_code == 200
+    assert [m["id"] for m in response.json()["matches"]] == ["backend", "platform"]
+    inline = client.post("/match/jobs", json={"resume": resume, "jobs": postings}).json()
+    assert inline["index_id"] == index_id
+    assert client.post("/match/jobs", json={"resume": resume, "index_id": "nope"}).status_code == 404
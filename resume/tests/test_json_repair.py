@@ -0,0 +1,38 @@
+import sys
+import os
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.utils.json_repair import loads_with_repair, JSONRepairError
+
+
+def test_clean_json_is_not_marked_repaired():
+    assert loads_with_repair('{"a": 1}') == ({"a": 1}, False)
+    assert loads_with_repair('```json\n{"a": 1}\n```') == ({"a": 1}, False)
+
+
+def test_trailing_garbage_and_prose_are_cut():
+    value, repaired = loads_with_repair('Here you go: {"skills": ["Go", "SQL"]} Let me know!')
+    assert value == {"skills": ["Go", "SQL"]}
+    assert repaired
+
+
+def test_truncated_output_is_closed():
+    value, _ = loads_with_repair('{"categories": [{"category": "Cloud", "skills": ["AWS", "Dock')
+    assert value == {"categories": [{"category": "Cloud", "skills": ["AWS", "Dock"]}]}
+    value, _ = loads_with_repair('{"a": [1, 2,], "b": ')
+    assert value == {"a": [1, 2]}
+
+
+def test_unrepairable_raises():
+    with pytest.raises(JSONRepairError):
+        loads_with_repair("I cannot help with that.")
+
+
+def test_trailing_comma_strip_leaves_strings_alone():
+    value, repaired = loads_with_repair('{"note": "a, }", "tags": ["x, ]", "y",], "n": 1,} trailing')
+    assert value == {"note": "a, }", "tags": ["x, ]", "y"], "n": 1}
+    assert repaired
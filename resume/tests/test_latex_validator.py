@@ -0,0 +1,47 @@
+import sys
+import os
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import make_resume
+from src.generators import latex_validator
+from src.generators.resume_generator import ResumeGenerator
+from src.utils import metrics
+from src.utils.template_utils import latexurl
+
+
+def test_unsupported_unicode_is_repaired_and_counted():
+    resume = make_resume("small", seed=2)
+    resume.summary = "Café owner 🚀 → engineer, 日本 ≥ 5 yrs\nLed teams"
+    before = metrics.registry.counter_value("resume_latex_repairs_total", rule="unicode_dropped")
+
+    repaired, fired = latex_validator.repair(resume)
+
+    assert repaired.summary == "Café owner -> engineer, >= 5 yrs Led teams"
+    assert fired == {"unicode_dropped": 3, "unicode_transliterated": 2, "whitespace_collapsed": 1}
+    assert metrics.registry.counter_value("resume_latex_repairs_total", rule="unicode_dropped") == before + 3
+    assert "🚀" in resume.summary  # the caller's resume is untouched
+
+
+def test_clean_resume_passes_through():
+    resume = make_resume("medium", seed=2)
+    repaired, fired = latex_validator.repair(resume)
+    assert repaired is resume
+    assert fired == {}
+
+
+def test_urls_are_escaped_in_rendered_tex():
+    assert latexurl(" https://x.dev/a b?q=1&r=2#top ") == "https://x.dev/a\\%20b?q=1\\&r=2\\#top"
+    resume = make_resume("small", seed=3)
+    resume.personal_info.website = "https://me.dev/100%#cv"
+    tex = ResumeGenerator().render_tex(resume)
+    assert "\\href{https://me.dev/100\\%\\#cv}" in tex
+    assert latex_validator.check_tex(tex) == []
+
+
+def test_broken_tex_is_rejected_without_compiling():
+    assert latex_validator.check_tex("\\textbf{open \\{ brace") == ["unbalanced_braces"]
+    assert latex_validator.check_tex("ok % comment with {\n\\section{A}") == []
+    assert ResumeGenerator().compile_pdf("\\begin{document}{\\end{document}") is None
+    assert metrics.registry.counter_value("resume_pdf_compiles_total", result="rejected", backend="latex") >= 1
@@ -0,0 +1,51 @@
+import sys
+import os
+
+import pytest
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import make_resume
+from src.generators import layout
+from src.generators.resume_generator import ResumeGenerator
+
+
+def _long_resume():
+    # Comfortably more than one page at the default layout, but fits once tightened
+    resume = make_resume("medium", seed=5)
+    for item in resume.experience + resume.projects:
+        item.details = [f"Delivered improvement {i} to the platform, cutting latency and cost for every team" for i in range(5)]
+    return resume
+
+
+def test_estimate_shrinks_with_each_level():
+    resume = _long_resume()
+    estimates = [layout.estimate_height(resume, params, layout.LATEX_METRICS) for params in layout.LEVELS]
+    assert estimates == sorted(estimates, reverse=True)
+    assert layout.apply(resume, layout.LEVELS[-1]).experience[0].details == resume.experience[0].details[:2]
+    assert len(resume.experience[0].details) == 5  # the caller's resume is untouched
+
+
+def test_default_layout_renders_the_regular_template():
+    tex = ResumeGenerator().render_tex(make_resume("small", seed=1))
+    assert "\\documentclass[letterpaper,12pt]{article}" in tex
+    assert "\\titlespacing" not in tex
+
+
+def test_one_page_fit_needs_at_most_two_compiles():
+    pytest.importorskip("reportlab")
+    generator = ResumeGenerator(backend="native")
+    fit = generator.render_pdf_one_page(_long_resume())
+    assert fit.pages == 1
+    assert fit.compiles == 1
+    assert fit.level > 0
+
+
+def test_overflow_falls_back_once(monkeypatch):
+    pytest.importorskip("reportlab")
+    # An estimator that is far too optimistic picks the default layout, which overflows
+    monkeypatch.setattr(layout, "FIT_SAFETY", 10.0)
+    fit = ResumeGenerator(backend="native").render_pdf_one_page(_long_resume())
+    assert fit.compiles == 2
+    assert fit.level > 0
@@ -0,0 +1,43 @@
+import sys
+import os
+import json
+from types import SimpleNamespace
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "offline-test")
+
+from src.utils.llm_client import LLMClient, TASK_EXTRACT, SMALL_MODEL, DEFAULT_MODEL
+
+
+class ScriptedGroq:
+    """Answers per model from a fixed script and records which models were called."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.models = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        self.models.append(model)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=self.answers[model]))],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5),
+        )
+
+
+def test_extraction_routes_to_small_model():
+    llm = LLMClient()
+    llm.client = ScriptedGroq({SMALL_MODEL: '{"ok": true}', DEFAULT_MODEL: '{"ok": true}'})
+    assert json.loads(llm.generate("s", "u", task=TASK_EXTRACT)) == {"ok": True}
+    assert llm.client.models == [SMALL_MODEL]
+
+
+def test_generate_json_reasks_large_model_once():
+    from src.schemas.parsed_jd_schema import JDSkillList
+
+    llm = LLMClient()
+    llm.client = ScriptedGroq({SMALL_MODEL: '{"skills": "Python"}', DEFAULT_MODEL: '{"skills": ["Python"]}'})
+    result = llm.generate_json("Return JSON.", "Extract skills", JDSkillList, task=TASK_EXTRACT)
+    assert result.skills == ["Python"]
+    assert llm.client.models == [SMALL_MODEL, DEFAULT_MODEL]
@@ -0,0 +1,46 @@
+import sys
+import os
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import metrics
+
+
+def test_stage_attributes_llm_calls_to_trace():
+    trace = metrics.start_trace("POST", "/process")
+    with metrics.stage("jd_parse"):
+        metrics.record_llm_call("test-model", 0.2, 100, 50, 0.0001)
+    metrics.record_cache("parsed_jd", hit=False)
+
+    record = trace.to_log_record(200)
+    assert "jd_parse" in record["stages_ms"]
+    assert record["llm_calls"] == 1
+    assert record["input_tokens"] == 100
+    assert record["output_tokens"] == 50
+    assert record["cache"]["parsed_jd"] == {"hits": 0, "misses": 1}
+
+
+def test_prometheus_rendering():
+    registry = metrics.MetricsRegistry()
+    registry.inc("demo_total", agent="expand")
+    registry.observe("demo_seconds", 0.3, stage="expand")
+
+    text = registry.render_prometheus()
+    assert 'demo_total{agent="expand"} 1.0' in text
+    assert 'demo_seconds_bucket{stage="expand",le="0.5"} 1' in text
+    assert 'demo_seconds_count{stage="expand"} 1' in text
+    assert registry.quantile("demo_seconds", 0.95, stage="expand") == 0.5
+
+
+def test_unmatched_paths_share_one_label():
+    os.environ.setdefault("GROQ_API_KEY", "offline-test")
+    from fastapi.testclient import TestClient
+    import server
+
+    before = metrics.registry.histogram_count("resume_http_request_seconds", path="unmatched", method="GET", status=404)
+    client = TestClient(server.app)
+    for path in ("/wp-login.php", "/.env", "/admin/config"):
+        assert client.get(path).status_code == 404
+    assert metrics.registry.histogram_count("resume_http_request_seconds", path="unmatched", method="GET",
+                                            status=404) == before + 3
@@ -0,0 +1,33 @@
+import sys
+import os
+
+import pytest
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("reportlab")
+
+from benchmarks.corpus import make_resume
+from src.generators.native_pdf import NativePdfRenderer
+from src.generators.resume_generator import ResumeGenerator
+
+
+def test_native_backend_renders_pdf_without_tex():
+    resume = make_resume("medium", seed=4)
+    pdf = ResumeGenerator(backend="native").render_pdf(resume)
+    assert pdf.startswith(b"%PDF")
+    assert pdf.rstrip().endswith(b"%%EOF")
+
+
+def test_long_resume_flows_onto_more_pages():
+    renderer = NativePdfRenderer()
+    resume = make_resume("large", seed=4)
+    resume.experience[0].details = ["Shipped a feature " * 30] * 40
+    renderer.render(resume)
+    assert renderer.pages > 1
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        ResumeGenerator(backend="word")
@@ -0,0 +1,110 @@
+import sys
+import os
+import threading
+import time
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.pipeline import ResumePipeline
+from src.schemas.enhancement_schema import EnhancementPatch, BulletPatch
+from src.schemas.parsed_jd_schema import ParsedJobDescription, JDSkillList
+from src.schemas.resume_schema import Resume, PersonalInfo, ExperienceItem, ProjectItem, SkillCategory, SkillCategoryList
+from src.utils.cache import get_cache
+
+
+class SlowProjectLLM:
+    """Expanding the project is slow; records the order in which calls finish."""
+
+    def __init__(self, project_delay=0.5):
+        self.project_delay = project_delay
+        self.events = []
+        self._lock = threading.Lock()
+
+    def _log(self, event):
+        with self._lock:
+            self.events.append(event)
+
+    def generate(self, system_prompt, user_prompt, temperature=0.7, task=None):
+        if "Project Name:" in user_prompt:
+            time.sleep(self.project_delay)
+            self._log("expand_project")
+            return "Built the API\nAdded caching\nWrote tests\nShipped it"
+        self._log("expand_experience")
+        return "Led the migration\nCut costs\nMentored engineers\nOwned on-call\nImproved tests"
+
+    def generate_json(self, system_prompt, user_prompt, schema, temperature=0.1, task=None):
+        if schema is ParsedJobDescription:
+            return ParsedJobDescription(primary_technical_skills=["Python"])
+        if schema is JDSkillList:
+            return JDSkillList(skills=["Python", "Kubernetes"])
+        if schema is SkillCategoryList:
+            return SkillCategoryList(categories=[SkillCategory(category="Languages", skills=["Python"])])
+        self._log("enhance:" + ",".join(sorted({line[1:3] for line in user_prompt.split() if line.startswith("[") and "." in line})))
+        patches = []
+        for line in user_prompt.splitlines():
+            line = line.strip()
+            if line.startswith("[") and "] " in line:
+                key, text = line[1:].split("] ", 1)
+                patches.append(BulletPatch(key=key, text=f"JD: {text}"))
+        return EnhancementPatch(patches=patches)
+
+
+def make_resume():
+    return Resume(
+        personal_info=PersonalInfo(name="Pipeline User", email="pipe@example.com"),
+        experience=[ExperienceItem(company="Pipe Co", role="Dev", start_date="2020", end_date="2022")],
+        projects=[ProjectItem(name="Pipe Tool", technologies=["Python"])],
+        skills=[SkillCategory(category="Skills", skills=["Python"])],
+        job_description="Python developer wanted.",
+    )
+
+
+def clear_caches():
+    for name in ("jd_parse", "expand", "analyze", "categorize", "enhance", "dedup"):
+        get_cache(name).clear()
+
+
+def test_items_are_enhanced_while_others_still_expand():
+    clear_caches()
+    llm = SlowProjectLLM()
+    source = make_resume()
+    result = ResumePipeline(llm, max_workers=4).run(source)
+
+    names = llm.events
+    # The experience item is enhanced on its own before the slow project finishes expanding
+    assert names.index("enhance:e0") < names.index("expand_project")
+    assert names[-1] == "enhance:p0"
+
+    assert result.resume.experience[0].details[0] == "JD: Led the migration"
+    assert result.resume.projects[0].details == ["JD: Built the API", "JD: Added caching", "JD: Wrote tests", "JD: Shipped it"]
+    assert result.resume.skills == [SkillCategory(category="Languages", skills=["Python"])]
+    assert result.analysis["missing_skills"] == ["Kubernetes"]
+    assert result.recomputed["expand"] == ["experience[0]", "projects[0]"]
+    assert result.recomputed["enhance"] == ["e0", "p0"]
+    # The caller's resume is left untouched
+    assert source.experience[0].details == []
+
+
+def test_single_worker_does_not_deadlock():
+    clear_caches()
+    result = ResumePipeline(SlowProjectLLM(project_delay=0), max_workers=1).run(make_resume())
+    assert len(result.resume.projects[0].details) == 4
+
+
+class FailingProjectLLM(SlowProjectLLM):
+    def generate(self, system_prompt, user_prompt, temperature=0.7, task=None):
+        if "Project Name:" in user_prompt:
+            raise RuntimeError("model returned garbage")
+        return super().generate(system_prompt, user_prompt, temperature, task)
+
+
+def test_failed_expansion_keeps_original_bullets():
+    clear_caches()
+    source = make_resume()
+    source.projects[0].details = ["Wrote the first version"]
+    result = ResumePipeline(FailingProjectLLM(), max_workers=4).run(source)
+
+    assert result.resume.projects[0].details == ["JD: Wrote the first version"]
+    assert result.resume.experience[0].details[0] == "JD: Led the migration"
+    assert result.degraded == {"failed": ["expand:projects[0]"]}
@@ -0,0 +1,69 @@
+import sys
+import os
+import email
+import json
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "offline-test")
+
+from fastapi.testclient import TestClient
+
+import server
+from benchmarks.corpus import make_resume
+from benchmarks.fake_llm import FakeGroqClient
+
+FAKE_PDF = b"%PDF-1.4 fake"
+
+
+class RecordingGenerator:
+    """Stands in for ResumeGenerator (no pdflatex here) and remembers what it was handed."""
+    rendered = []
+
+    def render_pdf(self, resume):
+        RecordingGenerator.rendered.append(resume)
+        return FAKE_PDF
+
+
+def _client(monkeypatch):
+    RecordingGenerator.rendered = []
+    monkeypatch.setattr(server, "ResumeGenerator", RecordingGenerator)
+    monkeypatch.setattr(server, "upload_resume_to_gcs", lambda *args: None)
+    monkeypatch.setattr(server.get_llm(), "client", FakeGroqClient())
+    return TestClient(server.app)
+
+
+def _request():
+    resume = make_resume("small", seed=3)
+    return {"resume": resume.model_dump(mode="json"), "user_id": "u1", "resume_id": "r1"}
+
+
+def test_returns_pdf_rendered_from_processed_resume(monkeypatch):
+    client = _client(monkeypatch)
+    response = client.post("/process-and-generate", json=_request())
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content == FAKE_PDF
+    # The generator got the pipeline's output, not the raw request
+    assert len(RecordingGenerator.rendered) == 1
+    assert RecordingGenerator.rendered[0].summary != _request()["resume"]["summary"]
+
+
+def test_multipart_carries_json_and_pdf(monkeypatch):
+    client = _client(monkeypatch)
+    response = client.post("/process-and-generate?format=multipart", json=_request())
+    assert response.status_code == 200
+    raw = b"Content-Type: " + response.headers["content-type"].encode() + b"\r\n\r\n" + response.content
+    message = email.message_from_bytes(raw)
+    json_part, pdf_part = message.get_payload()
+    processed = json.loads(json_part.get_payload(decode=True))
+    assert processed["resume"]["summary"] == RecordingGenerator.rendered[0].summary
+    assert processed["usage"] is not None and "recomputed" in processed
+    assert pdf_part.get_content_type() == "application/pdf"
+    assert pdf_part.get_payload(decode=True) == FAKE_PDF
+
+
+def test_rejects_unknown_format(monkeypatch):
+    client = _client(monkeypatch)
+    response = client.post("/process-and-generate?format=zip", json=_request())
+    assert response.status_code == 422
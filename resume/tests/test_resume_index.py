@@ -0,0 +1,131 @@
+import sys
+import os
+import json
+
+import pytest
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "offline-test")
+
+pytest.importorskip("numpy")
+
+from fastapi.testclient import TestClient
+
+import server
+from src.search import resume_index
+from src.search.resume_index import ResumeIndex
+from src.search.text import TAXONOMY, PhraseTable, extract_skills, listed_skills
+
+
+def _resume(name, skills, bullet="Built services"):
+    return {"personal_info": {"name": name, "email": f"{name}@x.dev"},
+            "skills": [{"category": "Tools", "skills": skills}],
+            "experience": [{"company": "Acme", "role": "Engineer", "start_date": "2020", "end_date": "Present",
+                            "details": [bullet]}]}
+
+
+def _index():
+    index = ResumeIndex()
+    index.add("ana", _resume("Ana", ["Golang", "Kubernetes", "AWS"]), 1.0)
+    index.add("bo", _resume("Bo", ["Python", "K8s"], "Ran payments on Golang microservices"), 2.0)
+    index.add("cy", _resume("Cy", ["Python", "GCP"], "Cut payments latency"), 3.0)
+    return index
+
+
+def test_boolean_and_ranked_queries():
+    index = _index()
+    hits = index.search(all_of=["kubernetes", "go"])
+    # Bo only mentions Go in a bullet, so ranks below Ana who lists it
+    assert [r["id"] for r in hits["results"]] == ["ana", "bo"]
+    assert hits["results"][0]["matched_skills"] == ["Kubernetes", "Go"]
+    assert {r["id"] for r in index.search(any_of=["AWS", "GCP"])["results"]} == {"ana", "cy"}
+    assert [r["id"] for r in index.search(all_of=["Python"], text="payments latency")["results"]] == ["cy", "bo"]
+    assert index.search(all_of=["Rust"])["total"] == 0
+
+
+def test_ambiguous_words_are_not_skills_in_running_text():
+    phrases = PhraseTable(TAXONOMY)
+    text = ("Please send your CV. You will go to market with our R&D team, report to C-level "
+            "executives and join the Spring hiring round.")
+    assert extract_skills(text, phrases) == []
+    assert extract_skills("Golang services behind a REST API, built with Spring Boot and TS", phrases) == \
+        ["go", "rest", "spring"]
+    # In a skill list the short names still count
+    assert set(listed_skills(_resume("Ana", ["Go", "R", "C", "JS"]))) == {"go", "r", "c", "javascript"}
+
+
+def test_updates_and_removals_are_incremental(monkeypatch):
+    monkeypatch.setattr(resume_index, "COMPACT_MIN_DEAD", 2)
+    index = _index()
+    index.add("ana", _resume("Ana", ["Rust"]), 4.0)
+    assert index.search(all_of=["Rust"])["results"][0]["id"] == "ana"
+    assert index.search(all_of=["AWS"])["total"] == 0
+    index.remove("cy")  # third dead entry: compacts
+    assert len(index) == 2
+    assert index.search(all_of=["Python"])["results"][0]["id"] == "bo"
+
+
+def test_snapshot_reload_rereads_only_changed_files(tmp_path):
+    root = tmp_path / "saved"
+    root.mkdir()
+    for rid, skills in (("ana", ["Go"]), ("bo", ["Python"])):
+        (root / f"{rid}.json").write_text(json.dumps(_resume(rid, skills)))
+    index = resume_index.get_index(str(root))
+    assert len(index) == 2
+    assert os.path.exists(resume_index.snapshot_path(str(root)))
+
+    (root / "bo.json").unlink()
+    (root / "cy.json").write_text(json.dumps(_resume("cy", ["Go"])))
+    reloaded = ResumeIndex.load(resume_index.snapshot_path(str(root)))
+    assert reloaded.sync(str(root)) == 2
+    assert [r["id"] for r in reloaded.search(all_of=["go"])["results"]] == ["ana", "cy"]
+
+
+def test_workers_reread_only_logged_changes(tmp_path, monkeypatch):
+    from src.utils.cache import SQLiteCache
+
+    changes = SQLiteCache("resume_index_changes", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(resume_index, "shared", lambda: True)
+    monkeypatch.setattr(resume_index, "_changes", lambda: changes)
+    root = tmp_path / "saved"
+    root.mkdir()
+    for rid in ("ana", "bo"):
+        (root / f"{rid}.json").write_text(json.dumps(_resume(rid, ["Python"])))
+    index = resume_index.get_index(str(root))
+
+    def no_full_sync(root):
+        raise AssertionError("full re-sync")
+    monkeypatch.setattr(index, "sync", no_full_sync)
+    reads = []
+    sync_one = index.sync_one
+    monkeypatch.setattr(index, "sync_one", lambda rid, path: reads.append(rid) or sync_one(rid, path))
+
+    # This worker's own save: applied directly, nothing to re-read
+    (root / "cy.json").write_text(json.dumps(_resume("cy", ["Go"])))
+    resume_index.note_change(str(root), "cy")
+    index.add("cy", _resume("cy", ["Go"]), os.stat(root / "cy.json").st_mtime)
+    assert resume_index.get_index(str(root)) is index and reads == []
+
+    # Another worker's delete: only that file is looked at
+    (root / "bo.json").unlink()
+    changes.add(f"{root}|2", "bo")
+    changes.set(f"{root}|latest", 2)
+    assert len(resume_index.get_index(str(root))) == 2
+    assert reads == ["bo"] and index.generation == 2
+
+
+def test_endpoints_keep_the_index_current(tmp_path, monkeypatch):
+    root = tmp_path / "saved_resumes"
+    root.mkdir()
+    monkeypatch.setattr(server, "SAVED_RESUMES_DIR", str(root))
+    client = TestClient(server.app)
+    client.post("/resumes", json={"id": "ana", **_resume("Ana", ["Go", "Kubernetes"])})
+
+    found = client.get("/resumes/search", params={"skills": "kubernetes,golang"}).json()
+    assert [r["id"] for r in found["results"]] == ["ana"]
+    client.post("/resumes", json={"id": "bo", **_resume("Bo", ["Kubernetes"])})
+    assert client.get("/resumes/search", params={"skills": "Kubernetes"}).json()["total"] == 2
+    client.delete("/resumes/ana")
+    assert client.get("/resumes/search", params={"skills": "Kubernetes"}).json()["total"] == 1
+    assert client.get("/resumes/search").status_code == 400
@@ -0,0 +1,91 @@
+import sys
+import os
+import asyncio
+import subprocess
+import time
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.generators import workspace
+from src.utils.cache import SQLiteCache, cache_backend
+from src.utils.idempotency import IdempotencyStore
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    worker_a, worker_b = SQLiteCache("expand", path), SQLiteCache("expand", path)
+    other = SQLiteCache("enhance", path)
+
+    worker_a.set("k", {"bullets": ["Built it"]})
+    assert worker_b.get("k") == {"bullets": ["Built it"]}
+    assert other.get("k") is None
+
+    assert worker_a.add("claim", 1) is True
+    assert worker_b.add("claim", 2) is False
+    assert worker_b.add("stale", 1, ttl_seconds=-1) is True
+    assert worker_a.get("stale") is None and worker_a.add("stale", 2) is True
+
+    small = SQLiteCache("small", path, max_entries=3)
+    small.EVICT_EVERY = 1
+    for i in range(6):
+        small.set(f"k{i}", i)
+    assert len(small) == 3 and small.get("k5") == 5 and small.get("k0") is None
+
+    # Trimming keeps the newest writes even when they expire first (idempotency claims among results)
+    mixed = SQLiteCache("mixed", path, max_entries=2)
+    mixed.EVICT_EVERY = 1
+    mixed.set("result-1", "done", ttl_seconds=24 * 3600)
+    mixed.set("result-2", "done", ttl_seconds=24 * 3600)
+    assert mixed.add("pending", "claim", ttl_seconds=300) is True
+    assert mixed.get("pending") == "claim" and len(mixed) == 2
+
+
+def test_backend_follows_worker_count(monkeypatch):
+    monkeypatch.delenv("CACHE_BACKEND", raising=False)
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert cache_backend() == "memory"
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    assert cache_backend() == "sqlite"
+    monkeypatch.setenv("CACHE_BACKEND", "memory")
+    assert cache_backend() == "memory"
+
+
+def test_retry_on_another_worker_waits_for_the_claimed_result(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    worker_a = IdempotencyStore("idem", results=SQLiteCache("idem", path))
+    worker_b = IdempotencyStore("idem", results=SQLiteCache("idem", path))
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        await asyncio.sleep(0.3)
+        return {"pdf": "abc"}
+
+    async def scenario():
+        first = asyncio.ensure_future(worker_a.run("key", "fp", compute))
+        await asyncio.sleep(0.05)
+        retry = await worker_b.run("key", "fp", compute)
+        return await first, retry
+
+    first, retry = asyncio.run(scenario())
+    assert len(runs) == 1
+    assert first == ({"pdf": "abc"}, "new")
+    assert retry == ({"pdf": "abc"}, "attached")
+
+
+def test_compile_slots_are_shared_across_processes(tmp_path, monkeypatch):
+    monkeypatch.setattr(workspace, "SLOTS_DIR", str(tmp_path))
+    monkeypatch.setattr(workspace, "COMPILE_CONCURRENCY", 1)
+    env = dict(os.environ, COMPILE_SLOTS_DIR=str(tmp_path), COMPILE_CONCURRENCY="1")
+    holder = subprocess.Popen(
+        [sys.executable, "-c", "import time\nfrom src.generators.workspace import compile_slot\n"
+                               "with compile_slot():\n    print('held', flush=True)\n    time.sleep(0.5)"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), env=env, stdout=subprocess.PIPE, text=True)
+    assert holder.stdout.readline().strip() == "held"
+
+    start = time.perf_counter()
+    with workspace.compile_slot():
+        waited = time.perf_counter() - start
+    holder.wait(timeout=10)
+    assert waited > 0.2
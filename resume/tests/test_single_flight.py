@@ -0,0 +1,105 @@
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "offline-test")
+
+from src.utils.deadline import DeadlineExceeded, deadline_scope
+from src.utils.llm_client import LLMClient, TASK_EXTRACT
+from src.utils.single_flight import SingleFlight
+
+
+class SlowGroq:
+    """Takes a while to answer so concurrent callers overlap; counts upstream calls."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"parsed:{messages[1]['content']}"))],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5),
+        )
+
+
+def test_identical_concurrent_prompts_share_one_upstream_call():
+    llm = LLMClient()
+    llm.client = SlowGroq()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: llm.generate("Parse JDs.", "same JD", 0.1, task=TASK_EXTRACT), range(8)))
+    assert results == ["parsed:same JD"] * 8
+    assert llm.client.calls == 1
+    assert llm.get_usage_stats()["calls"] == 1
+    assert llm.single_flight.coalescing_ratio() > 0
+
+
+def test_different_prompts_are_not_coalesced():
+    llm = LLMClient()
+    llm.client = SlowGroq(delay=0.05)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda n: llm.generate("Parse JDs.", f"JD {n}", 0.1), range(4)))
+    assert results == [f"parsed:JD {n}" for n in range(4)]
+    assert llm.client.calls == 4
+
+
+def test_followers_receive_the_leaders_error():
+    flight = SingleFlight("test")
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("upstream down")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, "k", failing)
+        started.wait()
+        follower = pool.submit(flight.do, "k", lambda: "never called")
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError):
+                future.result()
+    # Nothing is retained after the call finishes
+    assert flight.do("k", lambda: "fresh") == ("fresh", False)
+
+
+def test_followers_stop_waiting_when_their_deadline_runs_out():
+    flight = SingleFlight("test")
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "late"
+
+    def follow():
+        with deadline_scope(0.1) as deadline:
+            try:
+                return flight.do("k", lambda: "never called")
+            finally:
+                follow.skipped = deadline.skipped
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, "k", slow)
+        started.wait()
+        t0 = time.monotonic()
+        follower = pool.submit(follow)
+        with pytest.raises(DeadlineExceeded):
+            follower.result()
+        assert time.monotonic() - t0 < 1.0
+        assert follow.skipped
+        release.set()
+        # The leader is unaffected by a follower giving up
+        assert leader.result() == ("late", False)
@@ -0,0 +1,27 @@
+import sys
+import os
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import metrics
+from src.utils.startup import profile_imports, warm_up
+
+
+def test_server_import_does_not_load_heavy_sdks():
+    profile = profile_imports("server")
+    assert profile["total_ms"] > 0
+    assert profile["slowest"][0]["module"] == "server"
+    # groq / google-cloud / supabase are imported on first use, not at start-up
+    assert profile["heavy_loaded"] == []
+
+
+def test_warm_up_runs_hooks_and_survives_failures():
+    calls = []
+
+    def broken():
+        raise ValueError("no key")
+
+    warm_up([broken, lambda: calls.append("llm")])
+    assert calls == ["llm"]
+    assert metrics.registry.gauge_value("resume_warmup_seconds", module="groq") is not None
@@ -0,0 +1,72 @@
+import sys
+import os
+import threading
+import contextvars
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import usage
+
+
+def test_concurrent_scopes_do_not_mix():
+    results = {}
+
+    def worker(user_id, calls):
+        with usage.usage_scope(user_id) as scope:
+            for _ in range(calls):
+                usage.record_call("model-a", "enhance", 0.01, 100, 10, 0.0)
+            results[user_id] = scope.summary()
+
+    threads = [threading.Thread(target=worker, args=(f"user-{n}", n)) for n in range(1, 6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for n in range(1, 6):
+        summary = results[f"user-{n}"]
+        assert summary["calls"] == n
+        assert summary["input_tokens"] == 100 * n
+        assert summary["by_stage"]["enhance"]["output_tokens"] == 10 * n
+        assert usage.ledger.get(f"user-{n}")["requests"] == 1
+
+
+def test_record_outside_scope_is_ignored():
+    usage.record_call("model-a", "unscoped", 0.01, 1, 1, 0.0)
+    assert usage.current_usage() is None
+
+
+def test_usage_and_quota_require_the_authenticated_proxy(monkeypatch):
+    os.environ.setdefault("GROQ_API_KEY", "offline-test")
+    from fastapi.testclient import TestClient
+    import server
+
+    monkeypatch.setattr(server, "INTERNAL_API_TOKEN", "secret")
+    client = TestClient(server.app)
+    proxied = {"X-User-Id": "alice", "X-Internal-Token": "secret"}
+
+    assert client.get("/usage/alice", headers={"X-User-Id": "alice"}).status_code == 401
+    assert client.get("/usage/alice", headers={"X-User-Id": "alice", "X-Internal-Token": "guess"}).status_code == 401
+    assert client.get("/usage/bob", headers=proxied).status_code == 403
+    assert client.get("/usage/alice", headers=proxied).status_code == 200
+
+    monkeypatch.setattr(server, "USER_TOKEN_QUOTA", 1000)
+    job = {"personal_info": {"name": "A", "email": "a@example.com"}, "job_description": "Python developer"}
+    assert client.post("/process", json=job, headers={"X-User-Id": "alice"}).status_code == 401
+    with usage.usage_scope("alice"):
+        usage.record_call("model-a", "enhance", 0.01, 5000, 0, 0.0)
+    assert client.post("/process", json=job, headers=proxied).status_code == 429
+
+
+def test_call_after_scope_closed_is_charged_to_the_ledger():
+    with usage.usage_scope("late-user") as scope:
+        usage.record_call("model-a", "enhance", 0.01, 100, 10, 0.0)
+        context = contextvars.copy_context()
+    # e.g. the losing side of a hedge, finishing after the response was sent
+    context.run(usage.record_call, "model-a", "enhance", 0.01, 40, 4, 0.0)
+
+    assert scope.summary()["input_tokens"] == 100
+    totals = usage.ledger.get("late-user")
+    assert totals["requests"] == 1
+    assert totals["calls"] == 2 and totals["input_tokens"] == 140
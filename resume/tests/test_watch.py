@@ -0,0 +1,110 @@
+import sys
+import os
+import json
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.watch import ResumeWatcher, changed_fields
+from src.schemas.resume_schema import Resume, PersonalInfo, ExperienceItem, SkillCategory
+
+
+class CountingLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, system_prompt, user_prompt, temperature=0.7, task=None):
+        self.calls += 1
+        return "Led the migration\nCut costs\nMentored engineers"
+
+    def generate_json(self, system_prompt, user_prompt, schema, temperature=0.1, task=None):
+        raise AssertionError("no JD, so no structured calls expected")
+
+
+class StubGenerator:
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.rendered = []
+
+    def render_pdf(self, resume):
+        self.rendered.append(resume)
+        return b"%PDF-stub"
+
+
+class BrokenTemplateGenerator(StubGenerator):
+    """Raises like a template with a syntax error until `fixed` is set."""
+
+    def __init__(self, output_dir):
+        super().__init__(output_dir)
+        self.fixed = False
+
+    def render_pdf(self, resume):
+        if not self.fixed:
+            from jinja2 import TemplateSyntaxError
+            raise TemplateSyntaxError("unexpected '}'", lineno=12)
+        return super().render_pdf(resume)
+
+
+def write_profile(path, resume):
+    with open(path, "w") as f:
+        json.dump(resume.model_dump(), f)
+
+
+def make_resume(name="Watch User"):
+    return Resume(
+        personal_info=PersonalInfo(name=name, email="watch@example.com"),
+        experience=[ExperienceItem(company="Watch Co", role="Dev", start_date="2020", end_date="2022",
+                                   details=["Kept an eye on things"])],
+        skills=[SkillCategory(category="Languages", skills=["Python"])],
+    )
+
+
+def test_changed_fields():
+    before = make_resume()
+    assert changed_fields(None, before) == set(Resume.model_fields)
+    assert changed_fields(before, make_resume(name="Renamed")) == {"personal_info"}
+
+
+def test_cycles_skip_agents_for_presentation_only_edits(tmp_path):
+    profile = tmp_path / "profile.json"
+    write_profile(profile, make_resume())
+    llm = CountingLLM()
+    generator = StubGenerator(str(tmp_path))
+    watcher = ResumeWatcher(str(profile), llm, generator=generator)
+
+    assert watcher.changed_files()[0] == str(profile)
+    first = watcher.cycle([str(profile)])
+    assert first["pdf"] and (tmp_path / "my_resume.pdf").read_bytes() == b"%PDF-stub"
+    calls_after_first = llm.calls
+
+    # Renaming touches no agent input: the processed resume is patched and re-rendered
+    write_profile(profile, make_resume(name="Renamed User"))
+    second = watcher.cycle([str(profile)])
+    assert second["fields"] == {"personal_info"} and second["stages"] == []
+    assert llm.calls == calls_after_first
+    assert generator.rendered[-1].personal_info.name == "Renamed User"
+    assert generator.rendered[-1].experience == generator.rendered[0].experience
+
+    # A broken save keeps the last good state and is retried on the next change
+    profile.write_text("{ not json")
+    assert watcher.cycle([str(profile)]) is None
+    assert len(generator.rendered) == 2
+    assert watcher.previous_input.personal_info.name == "Renamed User"
+
+
+def test_failed_cycle_keeps_watching_and_the_last_pdf(tmp_path):
+    profile = tmp_path / "profile.json"
+    write_profile(profile, make_resume())
+    generator = BrokenTemplateGenerator(str(tmp_path))
+    pdf_path = tmp_path / "my_resume.pdf"
+    pdf_path.write_bytes(b"%PDF-last-good")
+    watcher = ResumeWatcher(str(profile), CountingLLM(), generator=generator)
+
+    assert watcher.cycle([str(profile)]) is None
+    assert pdf_path.read_bytes() == b"%PDF-last-good"
+
+    # Fixing the template re-renders the already processed resume
+    generator.fixed = True
+    result = watcher.cycle([str(profile)])
+    assert result["pdf"] and result["stages"] == []
+    assert pdf_path.read_bytes() == b"%PDF-stub"
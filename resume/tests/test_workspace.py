@@ -0,0 +1,46 @@
+import sys
+import os
+import time
+
+# Add parent dir to path so we can allow imports from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import make_resume
+from src.generators import workspace
+from src.generators.resume_generator import ResumeGenerator
+from src.utils.cache import fingerprint
+
+
+def test_compile_workspaces_are_private_and_removed():
+    with workspace.compile_workspace() as first, workspace.compile_workspace() as second:
+        assert first != second
+        with open(os.path.join(first, "resume.aux"), "w") as f:
+            f.write("aux")
+    assert not os.path.exists(first)
+    assert not os.path.exists(second)
+
+
+def test_garbage_collector_evicts_oldest_until_under_budget(tmp_path):
+    now = time.time()
+    for i in range(5):
+        path = tmp_path / f"{i}.pdf"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (now - 100 + i, now - 100 + i))
+
+    freed = workspace.collect_garbage(str(tmp_path), max_bytes=250)
+    assert freed == 300
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["3.pdf", "4.pdf"]
+
+
+def test_identical_tex_is_served_from_retained_pdf(tmp_path, monkeypatch):
+    monkeypatch.setattr(workspace, "RETAINED_DIR", str(tmp_path))
+    generator = ResumeGenerator(output_dir=str(tmp_path / "output"))
+    resume = make_resume("small", seed=1)
+    tex = generator.render_tex(resume)
+    cached = workspace.retained_path("pdf", f"{fingerprint('pdf', tex)}.pdf")
+    with open(cached, "wb") as f:
+        f.write(b"%PDF-cached")
+
+    # No pdflatex run (or scratch directory) needed for a resume rendered before
+    assert generator.render_pdf(resume) == b"%PDF-cached"
+    assert os.listdir(tmp_path / "output") == []
@@ -52,11 +52,24 @@ async function proxyToResumeService(req, res, endpoint) {
             method: req.method,
             headers: {
                 'Content-Type': 'application/json',
-                ...(req.headers.authorization && { 'Authorization': req.headers.authorization })
+                ...(req.headers.authorization && { 'Authorization': req.headers.authorization }),
+                ...(req.user && { 'X-User-Id': req.user.id }),
+                // Lets the resume service trust X-User-Id (quotas, usage)
+                ...(process.env.INTERNAL_API_TOKEN && { 'X-Internal-Token': process.env.INTERNAL_API_TOKEN })
             },
             ...(req.method !== 'GET' && { body: JSON.stringify(req.body) })
         });
 
+        const contentType = response.headers.get('content-type') || '';
+        if (!contentType.includes('application/json')) {
+            // PDFs and multipart bodies are passed through untouched
+            res.status(response.status);
+            res.set('Content-Type', contentType);
+            const disposition = response.headers.get('content-disposition');
+            if (disposition) res.set('Content-Disposition', disposition);
+            return res.send(Buffer.from(await response.arrayBuffer()));
+        }
+
         const data = await response.json();
         res.status(response.status).json(data);
     } catch (error) {
@@ -291,6 +304,16 @@ app.post('/api/resume/generate', requireAuth, (req, res) => {
     proxyToResumeService(req, res, '/generate');
 });
 
+// Process + render in one hop; ?format=multipart returns the JSON and the PDF together
+app.post('/api/resume/process-and-generate', requireAuth, (req, res) => {
+    const format = req.query.format === 'multipart' ? '?format=multipart' : '';
+    proxyToResumeService(req, res, `/process-and-generate${format}`);
+});
+
+app.get('/api/resume/usage', requireAuth, (req, res) => {
+    proxyToResumeService(req, res, `/usage/${encodeURIComponent(req.user.id)}`);
+});
+
 app.get('/api/resume/status', (req, res) => {
     proxyToResumeService(req, res, '/');
 });
@@ -699,9 +722,13 @@ app.post('/api/generate-resume', requireAuth, async (req, res) => {
         try {
             // Call Python Resume Service
             console.log('🔄 Calling Python Resume Service...');
-            const pythonServiceResponse = await fetch('http://localhost:8000/process', {
+            const pythonServiceResponse = await fetch(`${RESUME_SERVICE_URL}/process`, {
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-User-Id': req.user.id,
+                    ...(process.env.INTERNAL_API_TOKEN && { 'X-Internal-Token': process.env.INTERNAL_API_TOKEN })
+                },
                 body: JSON.stringify(resumePayload)
             });
 